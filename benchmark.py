@@ -0,0 +1,314 @@
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from grafos import AdjacencyListGraph, AdjacencyMatrixGraph, MetricasIncrementais, np
+from main import carregar_grafo
+
+# --- CONFIGURAÇÃO ---
+# Número de arestas distintas de cada grafo sintético
+TAMANHOS = [1_000, 10_000, 100_000, 1_000_000]
+REPETICOES = 3
+SEMENTE = 42
+# Probabilidade de cada nova interação trazer um usuário novo (controla n ≈ p * m)
+PROB_NOVO_USUARIO = 0.2
+# Probabilidade de uma interação ser retribuída (A -> B gera B -> A)
+PROB_RECIPROCA = 0.1
+# Acima disso a matriz n x n não cabe em memória razoável
+LIMITE_VERTICES_MATRIZ = 5_000
+# Trabalho estimado (varreduras do grafo * custo de uma varredura) acima do
+# qual uma operação é pulada, a menos que se use --completo
+ORCAMENTO_TRABALHO = 3e7
+# Diferenças menores que isso são ruído na comparação entre execuções
+MINIMO_SEGUNDOS_COMPARACAO = 0.01
+
+BACKENDS = {'lista': AdjacencyListGraph, 'matriz': AdjacencyMatrixGraph}
+
+
+# --- GERADOR SINTÉTICO ---
+def gerar_arestas(num_arestas, semente=SEMENTE):
+    """
+    Grafo direcionado por ligação preferencial, parecido com as redes de
+    interação do GitHub: quem já comenta muito tende a comentar mais (origem
+    proporcional ao grau de saída) e quem já recebe muito tende a receber mais
+    (destino proporcional ao grau de entrada). Retorna (n, [(u, v, peso)]),
+    com num_arestas arestas distintas e pesos entre os pesos sugeridos da coleta.
+    """
+    rng = random.Random(semente)
+    # Cada vértice aparece uma vez ao nascer e mais uma a cada aresta, então
+    # sortear uma posição destas listas sorteia proporcionalmente ao grau + 1
+    por_saida, por_entrada = [0, 1], [0, 1]
+    n = 2
+    arestas = {}
+
+    def adicionar(u, v):
+        if u != v and (u, v) not in arestas and len(arestas) < num_arestas:
+            arestas[(u, v)] = float(rng.choice((1, 2, 3)))
+            por_saida.append(u)
+            por_entrada.append(v)
+            return True
+        return False
+
+    while len(arestas) < num_arestas:
+        if rng.random() < PROB_NOVO_USUARIO:
+            u = n
+            n += 1
+            por_saida.append(u)
+            por_entrada.append(u)
+        else:
+            u = rng.choice(por_saida)
+        v = rng.choice(por_entrada)
+        if adicionar(u, v) and rng.random() < PROB_RECIPROCA:
+            adicionar(v, u)
+    return n, [(u, v, w) for (u, v), w in arestas.items()]
+
+
+def gravar_csv(arestas, caminho):
+    """Grava as arestas no formato do grafo 1 do coleta.py (peso na coluna 3)."""
+    with open(caminho, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(['origem', 'destino', 'tipo', 'peso_sugerido', 'numero_issue'])
+        for i, (u, v, w) in enumerate(arestas):
+            escritor.writerow([f"usuario{u}", f"usuario{v}", 'issue', w, i])
+
+
+def construir(classe, n, arestas):
+    grafo = classe(n)
+    for u, v, w in arestas:
+        grafo.add_edge(u, v, w)
+    return grafo
+
+
+def _alfa_katz(grafo):
+    """Alfa que garante convergência: metade do inverso da maior soma de pesos por vértice."""
+    maior = 1.0
+    for u in range(grafo.get_vertex_count()):
+        maior = max(maior, sum(w for _, w in grafo.get_successors(u)), sum(w for _, w in grafo.get_predecessors(u)))
+    return 0.5 / maior
+
+
+# Arestas inseridas (e depois removidas) na medição de MetricasIncrementais
+ATUALIZACOES_INCREMENTAIS = 200
+
+
+def _atualizar_incrementalmente(grafo):
+    """
+    Carga inicial de MetricasIncrementais, rajada de inserções com leitura
+    das métricas, e remoção das mesmas arestas (o grafo volta ao original).
+    """
+    metricas = MetricasIncrementais(grafo)
+    rng = random.Random(SEMENTE)
+    n = grafo.get_vertex_count()
+    novas = set()
+    while len(novas) < min(ATUALIZACOES_INCREMENTAIS, n * (n - 1) - grafo.get_edge_count()):
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v and not grafo.has_edge(u, v):
+            novas.add((u, v))
+    for u, v in novas:
+        metricas.add_edge(u, v, 1.0)
+    metricas.calcular_gmce()
+    metricas.calcular_reciprocidade()
+    metricas.calcular_pagerank()
+    for u, v in novas:
+        metricas.remove_edge(u, v)
+    metricas.calcular_pagerank()
+
+
+# --- OPERAÇÕES MEDIDAS ---
+# (nome, função(grafo, pasta_temporária), requer NumPy, varreduras do grafo em função de n)
+AMOSTRAS_ESTIMATIVA = 50
+OPERACOES = [
+    ('calcular_reciprocidade', lambda g, _: g.calcular_reciprocidade(), False, None),
+    ('calcular_densidade', lambda g, _: g.calcular_densidade(), False, None),
+    ('calcular_gmce', lambda g, _: g.calcular_gmce(), False, None),
+    ('calcular_pagerank', lambda g, _: g.calcular_pagerank(), False, None),
+    ('calcular_pagerank_vetorizado', lambda g, _: g.calcular_pagerank_vetorizado(), True, None),
+    ('calcular_pagerank_multiplo', lambda g, _: g.calcular_pagerank_multiplo(dampings=(0.5, 0.85, 0.95)), True, None),
+    ('calcular_hits', lambda g, _: g.calcular_hits(), True, None),
+    ('calcular_katz', lambda g, _: g.calcular_katz(alfas=(_alfa_katz(g),)), True, None),
+    ('estimar_coeficiente_proximidade',
+     lambda g, _: g.estimar_coeficiente_proximidade(amostras=AMOSTRAS_ESTIMATIVA, semente=SEMENTE), False,
+     lambda n: min(n, AMOSTRAS_ESTIMATIVA)),
+    ('calcular_proximidade_por_no', lambda g, _: g.calcular_proximidade_por_no(), False, lambda n: n),
+    ('calcular_coeficiente_proximidade', lambda g, _: g.calcular_coeficiente_proximidade(), False, lambda n: n),
+    ('is_connected', lambda g, _: g.is_connected(), False, None),
+    ('componentes_fracas', lambda g, _: g.componentes_fracas(), False, None),
+    ('componentes_fortes', lambda g, _: g.componentes_fortes(), False, None),
+    ('calcular_intermediacao', lambda g, _: g.calcular_intermediacao(), False, lambda n: n),
+    ('calcular_intermediacao_amostrada',
+     lambda g, _: g.calcular_intermediacao(amostras=AMOSTRAS_ESTIMATIVA, semente=SEMENTE), False,
+     lambda n: min(n, AMOSTRAS_ESTIMATIVA)),
+    ('calcular_comunidades_louvain', lambda g, _: g.calcular_comunidades_louvain(), False, None),
+    ('calcular_comunidades_propagacao', lambda g, _: g.calcular_comunidades_propagacao(), False, None),
+    ('metricas_incrementais', lambda g, _: _atualizar_incrementalmente(g), False, None),
+    ('export_to_gephi', lambda g, pasta: g.export_to_gephi(os.path.join(pasta, 'grafo.gexf')), False, None),
+]
+
+
+def _cronometrar(funcao, repeticoes, antes=None):
+    """Tempos (s) de cada repetição; a saída de texto das métricas é descartada."""
+    amostras = []
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        for _ in range(repeticoes):
+            if antes:
+                antes()
+            inicio = time.perf_counter()
+            funcao()
+            amostras.append(time.perf_counter() - inicio)
+    return amostras
+
+
+def _resumo(amostras):
+    return {'segundos': min(amostras), 'mediana': statistics.median(amostras), 'amostras': amostras}
+
+
+def _versao_codigo():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(tamanhos=TAMANHOS, backends=tuple(BACKENDS), repeticoes=REPETICOES, semente=SEMENTE, completo=False):
+    """
+    Mede carregamento, métricas, is_connected e exportação em cada tamanho e
+    backend. Retorna o relatório: resultados indexados por
+    'arestas/backend/operação', com o menor tempo, a mediana e as amostras.
+    O cache de métricas é esvaziado antes de cada repetição.
+    """
+    relatorio = {
+        'meta': {
+            'commit': _versao_codigo(),
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__ if np is not None else None,
+            'plataforma': platform.platform(),
+            'semente': semente,
+            'repeticoes': repeticoes,
+        },
+        'grafos': {},
+        'resultados': {},
+    }
+    resultados = relatorio['resultados']
+
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as pasta:
+        for tamanho in tamanhos:
+            print(f"\n=== {tamanho} arestas ===")
+            inicio = time.perf_counter()
+            n, arestas = gerar_arestas(tamanho, semente)
+            relatorio['grafos'][str(tamanho)] = {'vertices': n, 'arestas': len(arestas)}
+            print(f"Gerado em {time.perf_counter() - inicio:.2f}s: {n} vértices")
+
+            caminho_csv = os.path.join(pasta, f"sintetico_{tamanho}.csv")
+            gravar_csv(arestas, caminho_csv)
+
+            for backend in backends:
+                classe = BACKENDS[backend]
+                prefixo = f"{tamanho}/{backend}"
+                if classe is AdjacencyMatrixGraph and n > LIMITE_VERTICES_MATRIZ:
+                    print(f"{prefixo}: pulado ({n} vértices > LIMITE_VERTICES_MATRIZ)")
+                    continue
+
+                if classe is AdjacencyListGraph:
+                    resultados[f"{prefixo}/carregar_grafo"] = _resumo(
+                        _cronometrar(lambda: carregar_grafo(caminho_csv, 3), repeticoes))
+                resultados[f"{prefixo}/construir"] = _resumo(
+                    _cronometrar(lambda: construir(classe, n, arestas), repeticoes))
+                grafo = construir(classe, n, arestas)
+
+                # Uma varredura do grafo custa n + m na lista e n² na matriz
+                varredura = n * n if classe is AdjacencyMatrixGraph else n + len(arestas)
+                for nome, operacao, requer_numpy, varreduras in OPERACOES:
+                    chave = f"{prefixo}/{nome}"
+                    if requer_numpy and np is None:
+                        resultados[chave] = {'pulado': 'NumPy não instalado'}
+                        continue
+                    if varreduras and not completo and varreduras(n) * varredura > ORCAMENTO_TRABALHO:
+                        resultados[chave] = {'pulado': 'acima de ORCAMENTO_TRABALHO (use --completo)'}
+                        continue
+                    try:
+                        resultados[chave] = _resumo(_cronometrar(lambda: operacao(grafo, pasta), repeticoes,
+                                                                 antes=grafo._cache_metricas.clear))
+                    except Exception as e:
+                        resultados[chave] = {'erro': f"{type(e).__name__}: {e}"}
+
+                for chave in sorted(k for k in resultados if k.startswith(prefixo + '/')):
+                    r = resultados[chave]
+                    situacao = f"{r['segundos']:.4f}s" if 'segundos' in r else r.get('pulado') or r['erro']
+                    print(f"{chave:<60} {situacao}")
+    return relatorio
+
+
+# --- COMPARAÇÃO ENTRE EXECUÇÕES ---
+def comparar(caminho_base, caminho_novo, tolerancia=0.10):
+    """
+    Compara dois relatórios (ex.: de commits diferentes) pelo menor tempo de
+    cada operação. Regressão é ficar mais de `tolerancia` mais lento e mais de
+    MINIMO_SEGUNDOS_COMPARACAO acima da base. Retorna a lista de regressões.
+    """
+    with open(caminho_base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(caminho_novo, encoding='utf-8') as f:
+        novo = json.load(f)
+    print(f"Base: {base['meta'].get('commit')}  Novo: {novo['meta'].get('commit')}")
+    print(f"{'operação':<60} {'base':>10} {'novo':>10} {'razão':>7}")
+
+    regressoes = []
+    for chave in sorted(set(base['resultados']) & set(novo['resultados'])):
+        antes, depois = base['resultados'][chave], novo['resultados'][chave]
+        if 'segundos' not in antes or 'segundos' not in depois:
+            continue
+        t_base, t_novo = antes['segundos'], depois['segundos']
+        razao = t_novo / t_base if t_base > 0 else float('inf')
+        marca = ''
+        if t_novo > t_base * (1 + tolerancia) and t_novo - t_base > MINIMO_SEGUNDOS_COMPARACAO:
+            regressoes.append((chave, t_base, t_novo))
+            marca = '  <-- REGRESSÃO'
+        print(f"{chave:<60} {t_base:>10.4f} {t_novo:>10.4f} {razao:>6.2f}x{marca}")
+
+    print(f"\n{len(regressoes)} regressão(ões) acima de {tolerancia:.0%}.")
+    return regressoes
+
+
+def ler_argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das métricas de grafos.py em grafos sintéticos.")
+    parser.add_argument('--tamanhos', default=','.join(str(t) for t in TAMANHOS),
+                        help="números de arestas separados por vírgula")
+    parser.add_argument('--backends', default=','.join(BACKENDS), help=f"entre: {', '.join(BACKENDS)}")
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES)
+    parser.add_argument('--semente', type=int, default=SEMENTE)
+    parser.add_argument('--completo', action='store_true',
+                        help="mede também as operações acima de ORCAMENTO_TRABALHO")
+    parser.add_argument('--saida', default='benchmark.json')
+    parser.add_argument('--comparar', nargs=2, metavar=('BASE.json', 'NOVO.json'),
+                        help="compara dois relatórios em vez de medir")
+    parser.add_argument('--tolerancia', type=float, default=0.10)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = ler_argumentos()
+    if args.comparar:
+        sys.exit(1 if comparar(*args.comparar, tolerancia=args.tolerancia) else 0)
+
+    backends = [b.strip() for b in args.backends.split(',') if b.strip()]
+    invalidos = [b for b in backends if b not in BACKENDS]
+    if invalidos:
+        sys.exit(f"Backend(s) desconhecido(s): {', '.join(invalidos)}")
+    tamanhos = [int(t) for t in args.tamanhos.split(',') if t.strip()]
+
+    relatorio = executar(tamanhos, backends, args.repeticoes, args.semente, args.completo)
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {args.saida}")
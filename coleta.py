@@ -1,129 +1,630 @@
+import argparse
+import contextlib
 import csv
+import heapq
+import json
+import tempfile
+import threading
 import time
 import os
-from github import Github, RateLimitExceededException
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from github import Github, GithubException, RateLimitExceededException
 
 # --- CONFIGURAÇÃO ---
-GITHUB_TOKEN = "" 
+GITHUB_TOKEN = ""
 REPO_NAME = "yonaskolb/XcodeGen"
-PASTA_SAIDA = "dados_coletados" 
+PASTA_SAIDA = "dados_coletados"
+# Coleta de vários repositórios: shards e grafos mesclados ficam aqui
+PASTA_ORGANIZACAO = "dados_organizacao"
+ARQUIVOS_GRAFOS = ['grafo_1_comentarios.csv', 'grafo_2_fechamentos.csv', 'grafo_3_pr_reviews.csv']
+# Endereço da API (troque por um servidor local para testes, ex.: http://localhost:8000)
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+# Requisições simultâneas e tentativas por item antes de desistir
+MAX_WORKERS = 8
+MAX_TENTATIVAS = 5
+# Processos da coleta de vários repositórios (um repositório por vez em cada)
+MAX_PROCESSOS = 4
+# Coleta incremental: só busca o que mudou desde o último checkpoint
+COLETA_INCREMENTAL = True
+ARQUIVO_CHECKPOINT = "checkpoint.json"
+INTERVALO_CHECKPOINT = 200
+# Saída: 'eventos' (uma linha por interação), 'agregado' (uma linha por
+# origem/destino/tipo, com contagem e peso somado) ou 'ambos'
+MODO_SAIDA = "ambos"
+# Pares distintos mantidos em memória antes de despejar um bloco ordenado em disco
+LIMITE_AGREGACAO_MEMORIA = 500_000
+
+
+# --- CONTROLE DE LIMITE DA API ---
+class ControleLimite:
+    """
+    Pausa compartilhada entre as threads: quando uma requisição bate no limite
+    da API, todas esperam até o horário de reset informado pelo GitHub.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._retomar_em = 0.0
+
+    def pausar_ate(self, instante):
+        with self._lock:
+            if instante > self._retomar_em:
+                self._retomar_em = instante
+                print(f"Limite da API atingido. Retomando em {max(0, int(instante - time.time()))} segundos...")
+
+    def aguardar(self):
+        while True:
+            with self._lock:
+                espera = self._retomar_em - time.time()
+            if espera <= 0:
+                return
+            time.sleep(espera)
+
+
+def _instante_reset(excecao):
+    """Lê Retry-After / X-RateLimit-Reset da resposta; sem cabeçalho, espera 60 s."""
+    cabecalhos = {k.lower(): v for k, v in (getattr(excecao, 'headers', None) or {}).items()}
+    if 'retry-after' in cabecalhos:
+        return time.time() + float(cabecalhos['retry-after'])
+    if 'x-ratelimit-reset' in cabecalhos:
+        return float(cabecalhos['x-ratelimit-reset']) + 1
+    return time.time() + 60
+
+
+def _eh_limite(excecao):
+    """429, ou 403 com cabeçalhos/mensagem de limite (o limite secundário chega como 403 genérico)."""
+    if excecao.status == 429:
+        return True
+    if excecao.status != 403:
+        return False
+    cabecalhos = {k.lower(): v for k, v in (getattr(excecao, 'headers', None) or {}).items()}
+    return ('retry-after' in cabecalhos or cabecalhos.get('x-ratelimit-remaining') == '0'
+            or 'rate limit' in str(excecao).lower())
+
+
+def _com_retentativa(controle, descricao, funcao, *args):
+    """
+    Executa funcao(*args) respeitando o limite da API. Limite atingido não conta
+    como falha (espera o reset e repete); erros de rede e respostas 5xx são
+    repetidos com espera exponencial até MAX_TENTATIVAS, e então a exceção é
+    propagada. Os demais erros do cliente (404, 422...) são propagados na hora.
+    """
+    falhas = 0
+    while True:
+        controle.aguardar()
+        try:
+            return funcao(*args)
+        except RateLimitExceededException as e:
+            controle.pausar_ate(_instante_reset(e))
+        except (GithubException, OSError) as e:
+            if isinstance(e, GithubException):
+                if _eh_limite(e):
+                    controle.pausar_ate(_instante_reset(e))
+                    continue
+                if e.status is not None and e.status < 500:
+                    raise
+            falhas += 1
+            if falhas >= MAX_TENTATIVAS:
+                raise
+            print(f"Erro em {descricao} ({e}); nova tentativa {falhas + 1}/{MAX_TENTATIVAS}...")
+            time.sleep(2 ** falhas)
+
+
+def _iterar_paginas(controle, lista_paginada, descricao):
+    """Percorre uma PaginatedList página a página, com retentativa por página."""
+    pagina = 0
+    while True:
+        itens = _com_retentativa(controle, f"{descricao} (página {pagina})", lista_paginada.get_page, pagina)
+        if not itens:
+            return
+        yield from itens
+        pagina += 1
+
+
+# --- PROCESSAMENTO DE CADA ITEM (executado nas threads) ---
+def _processar_issue(issue):
+    """Retorna (linhas do grafo 1, linhas do grafo 2) de uma issue/PR fechada."""
+    linhas_g1, linhas_g2 = [], []
+    owner = issue.user.login
+
+    # GRAFO 2: Fechamento de Issue (Peso 3) [cite: 33]
+    if issue.pull_request is None and issue.closed_by:
+        closer = issue.closed_by.login
+        if closer != owner:
+            linhas_g2.append([closer, owner, 3, issue.number])
+
+    # GRAFO 1: Comentários (Peso 2) [cite: 32]
+    if issue.comments > 0:
+        tipo = "pr" if issue.pull_request else "issue"
+        for comment in issue.get_comments():
+            commenter = comment.user.login
+            if commenter != owner:
+                linhas_g1.append([commenter, owner, tipo, 2, issue.number])
+
+    return linhas_g1, linhas_g2
+
+
+def _processar_pr(pr):
+    """Retorna as linhas do grafo 3 (merge e revisões) de um PR fechado."""
+    linhas_g3 = []
+    pr_owner = pr.user.login
+
+    # GRAFO 3: Merges (Peso 5) [cite: 35]
+    if pr.merged and pr.merged_by:
+        merger = pr.merged_by.login
+        if merger != pr_owner:
+            linhas_g3.append([merger, pr_owner, 'MERGE', 5, pr.number])
+
+    # GRAFO 3: Revisões e Aprovações (Peso 4) [cite: 34]
+    for review in pr.get_reviews():
+        reviewer = review.user.login
+        if reviewer != pr_owner:
+            if review.state in ['APPROVED', 'CHANGES_REQUESTED', 'COMMENTED']:
+                linhas_g3.append([reviewer, pr_owner, review.state, 4, pr.number])
+
+    return (linhas_g3,)
+
+
+def _coletar_em_paralelo(pool, controle, itens, processar, rotulo, ao_concluir, falhas):
+    """
+    Submete cada item ao pool (no máximo 4 * MAX_WORKERS pendentes) e entrega
+    os resultados a ao_concluir(item, resultado) na ordem original dos itens.
+    Itens que esgotam as tentativas vão para `falhas`.
+    """
+    pendentes = deque()
+
+    def entregar(item, futuro):
+        try:
+            resultado = futuro.result()
+        except Exception as e:
+            print(f"Erro ao processar {rotulo} {item.number}: {e}")
+            falhas.append((rotulo, item.number, str(e)))
+            return
+        ao_concluir(item, resultado)
+
+    count = 0
+    for item in itens:
+        count += 1
+        if count % 50 == 0: print(f"Processando {rotulo} {count}...")
+        pendentes.append((item, pool.submit(_com_retentativa, controle, f"{rotulo} {item.number}", processar, item)))
+        if len(pendentes) >= 4 * MAX_WORKERS:
+            entregar(*pendentes.popleft())
+    while pendentes:
+        entregar(*pendentes.popleft())
+
+
+# --- AGREGAÇÃO DE ARESTAS ---
+class AgregadorArestas:
+    """
+    Agrega interações por (origem, destino, tipo): contagem, peso somado e
+    menor/maior número de issue/PR. Acima de limite_chaves pares distintos, o
+    conteúdo é despejado em um bloco ordenado em disco; gravar() intercala os
+    blocos (heapq.merge) combinando chaves iguais, com memória limitada.
+    """
+    CABECALHO = ['origem', 'destino', 'tipo', 'contagem', 'peso_total', 'primeiro_numero', 'ultimo_numero']
+
+    def __init__(self, limite_chaves=LIMITE_AGREGACAO_MEMORIA):
+        self.limite_chaves = limite_chaves
+        self.arestas = {}
+        self.blocos = []
+
+    def adicionar(self, origem, destino, tipo, peso, numero):
+        chave = (origem, destino, tipo)
+        atual = self.arestas.get(chave)
+        if atual is None:
+            self.arestas[chave] = [1, peso, numero, numero]
+            if len(self.arestas) >= self.limite_chaves:
+                self._despejar()
+        else:
+            atual[0] += 1
+            atual[1] += peso
+            atual[2] = min(atual[2], numero)
+            atual[3] = max(atual[3], numero)
+
+    def _despejar(self):
+        with tempfile.NamedTemporaryFile('w', delete=False, newline='', encoding='utf-8',
+                                         prefix='agregado_', suffix='.csv') as f:
+            escritor = csv.writer(f)
+            for chave in sorted(self.arestas):
+                escritor.writerow(list(chave) + self.arestas[chave])
+            self.blocos.append(f.name)
+        self.arestas = {}
+
+    @staticmethod
+    def _ler_bloco(caminho, cabecalho=False):
+        with open(caminho, 'r', newline='', encoding='utf-8') as f:
+            leitor = csv.reader(f)
+            if cabecalho:
+                next(leitor, None)
+            for o, d, t, contagem, peso, primeiro, ultimo in leitor:
+                yield (o, d, t), [int(contagem), float(peso), int(primeiro), int(ultimo)]
+
+    def gravar(self, caminho):
+        fontes = [self._ler_bloco(b) for b in self.blocos]
+        fontes.append(iter(sorted(self.arestas.items())))
+        _gravar_intercalado(fontes, caminho)
+
+        for bloco in self.blocos:
+            os.remove(bloco)
+        self.blocos = []
+        self.arestas = {}
+
+
+def _gravar_intercalado(fontes, caminho):
+    """Intercala fontes já ordenadas por chave, somando registros da mesma chave."""
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(AgregadorArestas.CABECALHO)
+
+        def escrever(chave, valores):
+            contagem, peso, primeiro, ultimo = valores
+            peso = int(peso) if float(peso).is_integer() else peso
+            escritor.writerow(list(chave) + [contagem, peso, primeiro, ultimo])
+
+        chave_atual, acumulado = None, None
+        for chave, valores in heapq.merge(*fontes, key=lambda registro: registro[0]):
+            if chave == chave_atual:
+                acumulado[0] += valores[0]
+                acumulado[1] += valores[1]
+                acumulado[2] = min(acumulado[2], valores[2])
+                acumulado[3] = max(acumulado[3], valores[3])
+                continue
+            if chave_atual is not None:
+                escrever(chave_atual, acumulado)
+            chave_atual, acumulado = chave, list(valores)
+        if chave_atual is not None:
+            escrever(chave_atual, acumulado)
+    os.replace(temporario, caminho)
+
+
+# --- DATASETS COM UPSERT E CHECKPOINT ---
+class DatasetIncremental:
+    """
+    CSV de arestas identificado pelo número da issue/PR (coluna_chave).
+    As linhas de cada item reprocessado substituem as antigas na próxima
+    gravação (upsert), então reprocessar um item nunca duplica arestas.
+    Itens ainda ausentes do arquivo são só acrescentados ao final; o arquivo
+    só é reescrito (temporário + troca atômica) quando alguma chave pendente
+    já está gravada. coluna_tipo/coluna_peso (ou tipo_padrao) dizem como
+    agregar cada linha.
+    """
+    def __init__(self, caminho, cabecalho, coluna_chave, coluna_peso, coluna_tipo=None, tipo_padrao=None):
+        self.caminho = caminho
+        self.cabecalho = cabecalho
+        self.coluna_chave = coluna_chave
+        self.coluna_peso = coluna_peso
+        self.coluna_tipo = coluna_tipo
+        self.tipo_padrao = tipo_padrao
+        self.pendentes = {}
+        # Chaves já presentes no arquivo (lidas uma vez, na primeira gravação)
+        self._chaves_gravadas = None
+
+    @property
+    def caminho_agregado(self):
+        return os.path.splitext(self.caminho)[0] + '_agregado.csv'
+
+    def agregar_linha(self, agregador, linha):
+        tipo = linha[self.coluna_tipo] if self.coluna_tipo is not None else self.tipo_padrao
+        agregador.adicionar(linha[0], linha[1], tipo, float(linha[self.coluna_peso]), int(linha[self.coluna_chave]))
+
+    def limpar(self):
+        with open(self.caminho, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(self.cabecalho)
+        self.pendentes = {}
+        self._chaves_gravadas = set()
+
+    def registrar(self, numero, linhas):
+        self.pendentes[str(numero)] = linhas
+
+    def _linhas_gravadas(self):
+        with open(self.caminho, 'r', newline='', encoding='utf-8') as entrada:
+            leitor = csv.reader(entrada)
+            next(leitor, None)
+            for linha in leitor:
+                if len(linha) > self.coluna_chave:
+                    yield linha
+
+    def gravar(self, agregador=None):
+        """Aplica o upsert; com agregador, cada linha final também é agregada (mesma passada)."""
+        if not self.pendentes and agregador is None and os.path.exists(self.caminho):
+            return
+        if not os.path.exists(self.caminho):
+            pendentes = self.pendentes
+            self.limpar()
+            self.pendentes = pendentes
+        if self._chaves_gravadas is None:
+            self._chaves_gravadas = {linha[self.coluna_chave] for linha in self._linhas_gravadas()}
+
+        if self._chaves_gravadas.isdisjoint(self.pendentes):
+            # Só itens novos: acrescenta, sem reler nem reescrever o arquivo
+            with open(self.caminho, 'a', newline='', encoding='utf-8') as saida:
+                escritor = csv.writer(saida)
+                for linhas in self.pendentes.values():
+                    escritor.writerows(linhas)
+            if agregador is not None:
+                for linha in self._linhas_gravadas():
+                    self.agregar_linha(agregador, linha)
+        else:
+            temporario = self.caminho + '.tmp'
+            with open(temporario, 'w', newline='', encoding='utf-8') as saida:
+                escritor = csv.writer(saida)
+                escritor.writerow(self.cabecalho)
+                for linha in self._linhas_gravadas():
+                    if linha[self.coluna_chave] not in self.pendentes:
+                        escritor.writerow(linha)
+                        if agregador is not None:
+                            self.agregar_linha(agregador, linha)
+                for linhas in self.pendentes.values():
+                    escritor.writerows(linhas)
+                    if agregador is not None:
+                        for linha in linhas:
+                            self.agregar_linha(agregador, linha)
+            os.replace(temporario, self.caminho)
+        self._chaves_gravadas.update(self.pendentes)
+        self.pendentes = {}
+
+
+def _ler_checkpoint(caminho):
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _salvar_checkpoint(caminho, checkpoint):
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(temporario, caminho)
+
+
+def _prs_atualizados_desde(controle, repo, marca):
+    """
+    A API de PRs não aceita `since`: percorre do mais recente para o mais
+    antigo até passar da marca e devolve os PRs em ordem crescente de atualização.
+    """
+    prs = []
+    for pr in _iterar_paginas(controle, repo.get_pulls(state='closed', sort='updated', direction='desc'),
+                              "lista de PRs"):
+        if marca is not None and pr.updated_at < marca:
+            break
+        prs.append(pr)
+    prs.reverse()
+    return prs
+
+
+def coletar_dados(repo_name=REPO_NAME, pasta_saida=PASTA_SAIDA, incremental=COLETA_INCREMENTAL,
+                  modo_saida=MODO_SAIDA):
+    """
+    Coleta as interações do repositório. No modo incremental, lê o checkpoint
+    da pasta e busca só issues/PRs atualizados desde a última marca
+    (updated_at), fazendo upsert das arestas nos CSVs existentes. O checkpoint
+    é gravado a cada INTERVALO_CHECKPOINT itens, então uma execução
+    interrompida continua de onde parou.
+
+    modo_saida 'ambos' ou 'agregado' também gera <grafo>_agregado.csv, com uma
+    linha por (origem, destino, tipo). 'agregado' não grava o log de eventos;
+    como o upsert depende dele, nesse modo a coleta é sempre completa.
+    """
+    if modo_saida not in ('eventos', 'ambos', 'agregado'):
+        raise ValueError(f"modo_saida inválido: {modo_saida}")
+    if modo_saida == 'agregado' and incremental:
+        print("Modo 'agregado' sem log de eventos: fazendo coleta completa.")
+        incremental = False
 
-def coletar_dados():
     print("Conectando ao GitHub...")
-    g = Github(GITHUB_TOKEN)
-    
+    # A retentativa interna do PyGithub fica desligada: limites e falhas são
+    # tratados aqui, com pausa compartilhada entre as threads.
+    g = Github(GITHUB_TOKEN or None, base_url=GITHUB_API_URL, retry=None,
+               pool_size=MAX_WORKERS, seconds_between_requests=None)
+    controle = ControleLimite()
+
     try:
-        repo = g.get_repo(REPO_NAME)
+        repo = _com_retentativa(controle, "repositório", g.get_repo, repo_name)
         print(f"Repositório encontrado: {repo.full_name}")
     except Exception as e:
         print(f"Erro ao acessar repositório: {e}")
-        return
+        return False
 
     # --- CRIAÇÃO DA PASTA ---
     # Verifica se a pasta existe, se não, cria
-    if not os.path.exists(PASTA_SAIDA):
-        os.makedirs(PASTA_SAIDA)
-        print(f"Pasta '{PASTA_SAIDA}' criada com sucesso.")
+    if not os.path.exists(pasta_saida):
+        os.makedirs(pasta_saida)
+        print(f"Pasta '{pasta_saida}' criada com sucesso.")
     else:
-        print(f"Salvando arquivos na pasta '{PASTA_SAIDA}'.")
+        print(f"Salvando arquivos na pasta '{pasta_saida}'.")
 
     # --- PREPARAÇÃO DOS ARQUIVOS CSV ---
-    
     # Grafo 1: Comentários em issues ou pull requests
-    caminho_f1 = os.path.join(PASTA_SAIDA, 'grafo_1_comentarios.csv')
-    f1 = open(caminho_f1, 'w', newline='', encoding='utf-8')
-    w1 = csv.writer(f1)
-    w1.writerow(['origem', 'destino', 'tipo', 'peso_sugerido', 'numero_issue'])
-
+    d1 = DatasetIncremental(os.path.join(pasta_saida, ARQUIVOS_GRAFOS[0]),
+                            ['origem', 'destino', 'tipo', 'peso_sugerido', 'numero_issue'], 4, 3, coluna_tipo=2)
     # Grafo 2: Fechamento de issue por outro usuário
-    caminho_f2 = os.path.join(PASTA_SAIDA, 'grafo_2_fechamentos.csv')
-    f2 = open(caminho_f2, 'w', newline='', encoding='utf-8')
-    w2 = csv.writer(f2)
-    w2.writerow(['origem', 'destino', 'peso_sugerido', 'numero_issue'])
-
+    d2 = DatasetIncremental(os.path.join(pasta_saida, ARQUIVOS_GRAFOS[1]),
+                            ['origem', 'destino', 'peso_sugerido', 'numero_issue'], 3, 2, tipo_padrao='FECHAMENTO')
     # Grafo 3: Revisões, aprovações e merges de PRs
-    caminho_f3 = os.path.join(PASTA_SAIDA, 'grafo_3_pr_reviews.csv')
-    f3 = open(caminho_f3, 'w', newline='', encoding='utf-8')
-    w3 = csv.writer(f3)
-    w3.writerow(['origem', 'destino', 'acao', 'peso_sugerido', 'numero_pr'])
-
-    # --- COLETA DE ISSUES E COMENTÁRIOS ---
-    print("\n--- Iniciando coleta de Issues e Comentários (Grafos 1 e 2) ---")
-    issues = repo.get_issues(state='closed')
-    
-    # DICA: Descomente a linha abaixo para testes rápidos (pega apenas as últimas 100)
-    # issues = issues[:100] 
+    d3 = DatasetIncremental(os.path.join(pasta_saida, ARQUIVOS_GRAFOS[2]),
+                            ['origem', 'destino', 'acao', 'peso_sugerido', 'numero_pr'], 4, 3, coluna_tipo=2)
 
-    count = 0
-    for issue in issues:
-        try:
-            count += 1
-            if count % 50 == 0: print(f"Processando item {count}...")
-
-            owner = issue.user.login 
-
-            # GRAFO 2: Fechamento de Issue (Peso 3) [cite: 33]
-            if issue.pull_request is None and issue.closed_by:
-                closer = issue.closed_by.login
-                if closer != owner:
-                    w2.writerow([closer, owner, 3, issue.number])
-
-            # GRAFO 1: Comentários (Peso 2) [cite: 32]
-            if issue.comments > 0:
-                comments = issue.get_comments()
-                for comment in comments:
-                    commenter = comment.user.login
-                    if commenter != owner: 
-                        tipo = "pr" if issue.pull_request else "issue"
-                        w1.writerow([commenter, owner, tipo, 2, issue.number])
-        
-        except RateLimitExceededException:
-            print("Limite da API atingido. Aguardando 60 segundos...")
-            time.sleep(60)
-        except Exception as e:
-            print(f"Erro ao processar issue {issue.number}: {e}")
-            continue
-
-    # --- COLETA DE PULL REQUESTS (MERGES E REVIEWS) ---
-    print("\n--- Iniciando coleta detalhada de Pull Requests (Grafo 3) ---")
-    pulls = repo.get_pulls(state='closed')
-    
-    # DICA: Descomente a linha abaixo para testes rápidos
-    # pulls = pulls[:100]
-
-    count_pr = 0
-    for pr in pulls:
-        try:
-            count_pr += 1
-            if count_pr % 20 == 0: print(f"Processando PR {count_pr}...")
-
-            pr_owner = pr.user.login 
-
-            # GRAFO 3: Merges (Peso 5) [cite: 35]
-            if pr.merged and pr.merged_by:
-                merger = pr.merged_by.login
-                if merger != pr_owner:
-                    w3.writerow([merger, pr_owner, 'MERGE', 5, pr.number])
-
-            # GRAFO 3: Revisões e Aprovações (Peso 4) [cite: 34]
-            reviews = pr.get_reviews()
-            for review in reviews:
-                reviewer = review.user.login
-                if reviewer != pr_owner:
-                    if review.state in ['APPROVED', 'CHANGES_REQUESTED', 'COMMENTED']:
-                        w3.writerow([reviewer, pr_owner, review.state, 4, pr.number])
-
-        except RateLimitExceededException:
-            print("Limite da API atingido. Aguardando 60 segundos...")
-            time.sleep(60)
-        except Exception as e:
-            print(f"Erro ao processar PR {pr.number}: {e}")
-            continue
+    caminho_checkpoint = os.path.join(pasta_saida, ARQUIVO_CHECKPOINT)
+    checkpoint = _ler_checkpoint(caminho_checkpoint) if incremental else {}
+    if checkpoint.get('repositorio') != repo_name:
+        if checkpoint:
+            print("Checkpoint de outro repositório ignorado.")
+        checkpoint = {'repositorio': repo_name}
+    gravar_eventos = modo_saida != 'agregado'
+    if gravar_eventos and 'issues' not in checkpoint and 'pulls' not in checkpoint:
+        print("Sem checkpoint: coleta completa.")
+        for dataset in (d1, d2, d3):
+            dataset.limpar()
+    agregadores = {} if modo_saida == 'eventos' else {d: AgregadorArestas() for d in (d1, d2, d3)}
+
+    def marca_de(etapa):
+        marca = checkpoint.get(etapa, {}).get('atualizado_em')
+        return datetime.fromisoformat(marca) if marca else None
+
+    falhas = []
+
+    def etapa_com_checkpoint(etapa, datasets):
+        """Devolve ao_concluir(item, resultado) que faz upsert e avança a marca da etapa."""
+        estado = {'processados': 0, 'falhas_antes': len(falhas)}
+
+        def ao_concluir(item, resultado):
+            for dataset, linhas in zip(datasets, resultado):
+                if gravar_eventos:
+                    dataset.registrar(item.number, linhas)
+                else:
+                    for linha in linhas:
+                        dataset.agregar_linha(agregadores[dataset], linha)
+            estado['processados'] += 1
+            # A marca só avança enquanto nenhum item da etapa falhou
+            if len(falhas) == estado['falhas_antes']:
+                estado['marca'] = {'atualizado_em': item.updated_at.isoformat(), 'ultimo_numero': item.number}
+            if estado['processados'] % INTERVALO_CHECKPOINT == 0:
+                salvar()
+
+        def salvar(final=False):
+            """No final da etapa, a última gravação também alimenta os agregadores."""
+            if gravar_eventos:
+                for dataset in datasets:
+                    dataset.gravar(agregadores.get(dataset) if final else None)
+            if final:
+                for dataset in datasets:
+                    if dataset in agregadores:
+                        agregadores[dataset].gravar(dataset.caminho_agregado)
+            if not gravar_eventos:
+                return
+            if 'marca' in estado:
+                checkpoint[etapa] = estado['marca']
+            _salvar_checkpoint(caminho_checkpoint, checkpoint)
+
+        return ao_concluir, salvar
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        # --- COLETA DE ISSUES E COMENTÁRIOS ---
+        print("\n--- Iniciando coleta de Issues e Comentários (Grafos 1 e 2) ---")
+        marca = marca_de('issues')
+        if marca:
+            print(f"Buscando issues atualizadas desde {marca.isoformat()}...")
+        filtro = {'since': marca} if marca else {}
+        issues = _iterar_paginas(controle, repo.get_issues(state='closed', sort='updated', direction='asc', **filtro),
+                                 "lista de issues")
+        ao_concluir, salvar = etapa_com_checkpoint('issues', (d1, d2))
+        _coletar_em_paralelo(pool, controle, issues, _processar_issue, "issue", ao_concluir, falhas)
+        salvar(final=True)
+
+        # --- COLETA DE PULL REQUESTS (MERGES E REVIEWS) ---
+        print("\n--- Iniciando coleta detalhada de Pull Requests (Grafo 3) ---")
+        pulls = _prs_atualizados_desde(controle, repo, marca_de('pulls'))
+        print(f"{len(pulls)} PR(s) para processar.")
+        ao_concluir, salvar = etapa_com_checkpoint('pulls', (d3,))
+        _coletar_em_paralelo(pool, controle, pulls, _processar_pr, "PR", ao_concluir, falhas)
+        salvar(final=True)
+
+    if falhas:
+        print(f"\nATENÇÃO: {len(falhas)} item(ns) falharam após {MAX_TENTATIVAS} tentativas:")
+        for rotulo, numero, erro in falhas:
+            print(f"   {rotulo} {numero}: {erro}")
+        print("A marca do checkpoint parou antes deles; a próxima execução tenta de novo.")
+    print(f"\nSucesso! Arquivos salvos na pasta '{pasta_saida}'.")
+    return True
+
+
+# --- COLETA DE VÁRIOS REPOSITÓRIOS ---
+def _pasta_shard(pasta_saida, repo_name):
+    return os.path.join(pasta_saida, 'shards', repo_name.replace('/', '__'))
+
+
+def _coletar_shard(repo_name, pasta_shard, incremental, modo_saida):
+    """Executado em um processo trabalhador; a saída vai para coleta.log do shard."""
+    os.makedirs(pasta_shard, exist_ok=True)
+    with open(os.path.join(pasta_shard, 'coleta.log'), 'a', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log):
+        return coletar_dados(repo_name, pasta_shard, incremental, modo_saida)
+
+
+def _concatenar_eventos(shards, caminho):
+    """Junta os logs de eventos linha a linha, acrescentando a coluna 'repositorio'."""
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', newline='', encoding='utf-8') as saida:
+        escritor = csv.writer(saida)
+        cabecalho_escrito = False
+        for repo_name, arquivo in shards:
+            with open(arquivo, 'r', newline='', encoding='utf-8') as entrada:
+                leitor = csv.reader(entrada)
+                cabecalho = next(leitor, None)
+                if cabecalho is None:
+                    continue
+                if not cabecalho_escrito:
+                    escritor.writerow(cabecalho + ['repositorio'])
+                    cabecalho_escrito = True
+                for linha in leitor:
+                    escritor.writerow(linha + [repo_name])
+    os.replace(temporario, caminho)
+
+
+def mesclar_shards(repositorios, pasta_saida=PASTA_ORGANIZACAO):
+    """
+    Combina os shards de pasta_saida/shards em um conjunto único de CSVs na
+    própria pasta_saida. Os usuários são identificados pelo login, então os
+    grafos mesclados compartilham o mesmo espaço de ids no main.py. Tudo é
+    feito em fluxo: os logs são concatenados e os agregados (já ordenados por
+    chave) são intercalados com heapq.merge, sem carregar os shards inteiros.
+    """
+    pastas = [(r, _pasta_shard(pasta_saida, r)) for r in repositorios]
+    for arquivo in ARQUIVOS_GRAFOS:
+        eventos = [(r, os.path.join(p, arquivo)) for r, p in pastas if os.path.exists(os.path.join(p, arquivo))]
+        if eventos:
+            _concatenar_eventos(eventos, os.path.join(pasta_saida, arquivo))
+
+        agregado = os.path.splitext(arquivo)[0] + '_agregado.csv'
+        agregados = [os.path.join(p, agregado) for _, p in pastas if os.path.exists(os.path.join(p, agregado))]
+        if agregados:
+            fontes = [AgregadorArestas._ler_bloco(c, cabecalho=True) for c in agregados]
+            _gravar_intercalado(fontes, os.path.join(pasta_saida, agregado))
+        print(f"{arquivo}: {max(len(eventos), len(agregados))} shard(s) mesclado(s).")
+
+
+def coletar_organizacao(repositorios, pasta_saida=PASTA_ORGANIZACAO, processos=MAX_PROCESSOS,
+                        incremental=COLETA_INCREMENTAL, modo_saida=MODO_SAIDA):
+    """
+    Coleta vários repositórios em processos separados, cada um gravando seu
+    shard (CSVs, checkpoint e coleta.log) em pasta_saida/shards/<dono>__<repo>,
+    e depois mescla os shards. Os processos compartilham o token, então o
+    limite da API é dividido entre eles.
+    """
+    os.makedirs(pasta_saida, exist_ok=True)
+    print(f"Coletando {len(repositorios)} repositório(s) com até {processos} processo(s)...")
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        futuros = {pool.submit(_coletar_shard, r, _pasta_shard(pasta_saida, r), incremental, modo_saida): r
+                   for r in repositorios}
+        for futuro in as_completed(futuros):
+            repo_name = futuros[futuro]
+            try:
+                ok = futuro.result()
+            except Exception as e:
+                ok, detalhe = False, str(e)
+            else:
+                detalhe = "veja coleta.log do shard"
+            print(f"   {repo_name}: {'concluído' if ok else f'falhou ({detalhe})'}")
+
+    print("\n--- Mesclando shards ---")
+    mesclar_shards(repositorios, pasta_saida)
+    print(f"\nSucesso! Grafos mesclados na pasta '{pasta_saida}'.")
 
-    f1.close()
-    f2.close()
-    f3.close()
-    print(f"\nSucesso! Arquivos salvos na pasta '{PASTA_SAIDA}'.")
 
 if __name__ == "__main__":
-    coletar_dados()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Coleta interações de repositórios do GitHub.")
+    parser.add_argument('repositorios', nargs='*', metavar='DONO/REPO',
+                        help="vários repositórios ativam a coleta em shards (padrão: REPO_NAME)")
+    parser.add_argument('--pasta', help="pasta de saída")
+    parser.add_argument('--processos', type=int, default=MAX_PROCESSOS)
+    parser.add_argument('--modo', default=MODO_SAIDA, choices=['eventos', 'ambos', 'agregado'])
+    args = parser.parse_args()
+    if len(args.repositorios) > 1:
+        coletar_organizacao(args.repositorios, args.pasta or PASTA_ORGANIZACAO, args.processos,
+                            modo_saida=args.modo)
+    else:
+        coletar_dados((args.repositorios or [REPO_NAME])[0], args.pasta or PASTA_SAIDA, modo_saida=args.modo)
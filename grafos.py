@@ -1,5 +1,242 @@
 from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import wraps
+from multiprocessing import shared_memory
+import gzip
 import heapq
+import inspect
+import json
+import re
+import mmap
+import os
+import random
+import struct
+import sys
+import threading
+import time
+from statistics import NormalDist, stdev
+from xml.sax.saxutils import quoteattr
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele ficam só as versões em Python puro
+    np = None
+
+# A partir deste número de arestas, top_pagerank usa o motor vetorizado (NumPy)
+LIMIAR_PAGERANK_VETORIZADO = 5000
+
+# Máximo de resultados de métricas guardados por grafo (LRU)
+TAMANHO_CACHE_METRICAS = 32
+# Parâmetros que não alteram o resultado (ficam fora da chave do cache)
+_PARAMETROS_SEM_EFEITO = ('workers',)
+
+# Atributos de nó que export_to_gephi sabe calcular sozinho
+ATRIBUTOS_GEPHI = ('pagerank', 'grau_entrada', 'grau_saida', 'proximidade', 'comunidade', 'intermediacao')
+# Linhas de XML acumuladas antes de cada escrita no arquivo
+LINHAS_POR_ESCRITA = 4096
+# Caracteres de controle que o XML 1.0 não aceita nem escapados
+_CONTROLE_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+# Vértices entre verificações de progresso/cancelamento nas métricas lineares
+VERTICES_POR_PROGRESSO = 1024
+
+
+# Linhas do bitset desempacotadas por vez ao somar colunas da matriz
+LINHAS_POR_BLOCO_MATRIZ = 1024
+# _TABELAS_BIT[k]: tabela de bytes.translate que leva cada byte a 1 se o bit k
+# (do mais significativo) estiver ligado, senão a 0
+_TABELAS_BIT = [bytes(1 if b & (0x80 >> k) else 0 for b in range(256)) for k in range(8)]
+_POPCOUNT_BYTE = np.array([bin(b).count('1') for b in range(256)], dtype=np.uint8) if np is not None else None
+
+
+def _texto_xml(valor):
+    if isinstance(valor, bool):
+        return 'true' if valor else 'false'
+    return _CONTROLE_XML.sub('', str(valor))
+
+
+def _tipo_gexf(valores):
+    """Tipo GEXF da coluna, pelo primeiro valor não nulo."""
+    for valor in valores:
+        if valor is None:
+            continue
+        if isinstance(valor, bool):
+            return 'boolean'
+        if isinstance(valor, int) or (np is not None and isinstance(valor, np.integer)):
+            return 'integer'
+        if isinstance(valor, float) or (np is not None and isinstance(valor, np.floating)):
+            return 'double'
+        return 'string'
+    return 'double'
+
+
+# ------------------------------------------------------------------
+# INSTRUMENTAÇÃO (tempos, contadores, progresso e cancelamento)
+# ------------------------------------------------------------------
+class OperacaoCancelada(Exception):
+    """Lançada dentro de uma métrica quando o TokenCancelamento é acionado."""
+
+
+class TokenCancelamento:
+    """Cancelamento cooperativo: as métricas verificam o token a cada passo de progresso."""
+    def __init__(self):
+        self._evento = threading.Event()
+
+    def cancelar(self):
+        self._evento.set()
+
+    @property
+    def cancelado(self):
+        return self._evento.is_set()
+
+    def verificar(self):
+        if self._evento.is_set():
+            raise OperacaoCancelada("Operação cancelada.")
+
+
+class Instrumentacao:
+    """
+    Ganchos de observação de um grafo (grafo.instrumentacao). Sem
+    instrumentação (None, o padrão) as métricas só testam o atributo.
+
+    - tempos: {método: [chamadas, segundos]} de cada métrica chamada
+    - contadores: {nome: total}, ex.: dijkstra.relaxacoes, pagerank.iteracoes
+    - ao_progresso(operacao, feito, total): chamado a cada intervalo_progresso
+      passos, no último e sempre que forcar=True (blocos do processamento paralelo)
+    - cancelamento: TokenCancelamento verificado a cada passo
+    """
+    def __init__(self, ao_progresso=None, cancelamento=None, intervalo_progresso=100):
+        self.ao_progresso = ao_progresso
+        self.cancelamento = cancelamento
+        self.intervalo_progresso = intervalo_progresso
+        self.tempos = {}
+        self.contadores = {}
+
+    def contar(self, nome, quantidade=1):
+        self.contadores[nome] = self.contadores.get(nome, 0) + quantidade
+
+    def combinar(self, contadores):
+        """Soma contadores vindos de outro processo."""
+        for nome, quantidade in contadores.items():
+            self.contar(nome, quantidade)
+
+    def registrar_tempo(self, nome, segundos):
+        registro = self.tempos.setdefault(nome, [0, 0.0])
+        registro[0] += 1
+        registro[1] += segundos
+
+    def progresso(self, operacao, feito, total, forcar=False):
+        if self.cancelamento is not None:
+            self.cancelamento.verificar()
+        if self.ao_progresso is not None and (forcar or feito % self.intervalo_progresso == 0 or feito == total):
+            self.ao_progresso(operacao, feito, total)
+
+    def limpar(self):
+        self.tempos = {}
+        self.contadores = {}
+
+    def relatorio(self):
+        return {
+            'tempos': {nome: {'chamadas': c, 'segundos': s} for nome, (c, s) in self.tempos.items()},
+            'contadores': dict(self.contadores),
+        }
+
+
+def instrumentado(metodo):
+    """Cronometra o método quando o grafo tem instrumentação instalada."""
+    @wraps(metodo)
+    def envoltorio(self, *args, **kwargs):
+        instrumentacao = self.instrumentacao
+        if instrumentacao is None:
+            return metodo(self, *args, **kwargs)
+        inicio = time.perf_counter()
+        try:
+            return metodo(self, *args, **kwargs)
+        finally:
+            instrumentacao.registrar_tempo(metodo.__name__, time.perf_counter() - inicio)
+
+    return envoltorio
+
+
+def _numerar_componentes(representantes):
+    """Renumera representantes arbitrários em 0..k-1 pela ordem do menor vértice. Retorna (ids, tamanhos)."""
+    numero = {}
+    ids = []
+    tamanhos = []
+    for r in representantes:
+        c = numero.get(r)
+        if c is None:
+            c = numero[r] = len(tamanhos)
+            tamanhos.append(0)
+        tamanhos[c] += 1
+        ids.append(c)
+    return ids, tamanhos
+
+
+def _acumular_dependencias(origem, ordem, caminhos, predecessores, centralidade):
+    """Fase de retorno do Brandes: dependências em ordem decrescente de distância."""
+    dependencia = [0.0] * len(caminhos)
+    for w in reversed(ordem):
+        coeficiente = (1.0 + dependencia[w]) / caminhos[w]
+        for v in predecessores[w]:
+            dependencia[v] += caminhos[v] * coeficiente
+        if w != origem:
+            centralidade[w] += dependencia[w]
+
+
+def _amostragem_aleatoria(argumentos):
+    """Amostragem sem semente: cada chamada sorteia outras origens."""
+    return argumentos['amostras'] is not None and argumentos['semente'] is None
+
+
+def memorizar_metrica(metodo=None, sem_cache=None):
+    """
+    Decorador de métricas: guarda o resultado por (método, parâmetros, versão
+    do grafo) em um cache LRU por instância. Qualquer alteração de aresta
+    incrementa a versão e descarta o cache, então resultados antigos nunca
+    são reaproveitados. Chamadas com parâmetros não-hasheáveis (listas,
+    dicts) não passam pelo cache. O objeto retornado é compartilhado entre
+    chamadas: não o modifique.
+
+    sem_cache(argumentos) -> bool marca chamadas que não devem ser guardadas
+    (ex.: amostragem sem semente, cujo resultado muda a cada chamada). Uso:
+    @memorizar_metrica(sem_cache=...).
+    """
+    if metodo is None:
+        return lambda metodo: memorizar_metrica(metodo, sem_cache)
+    assinatura = inspect.signature(metodo)
+
+    @wraps(metodo)
+    def envoltorio(self, *args, **kwargs):
+        argumentos = assinatura.bind(self, *args, **kwargs)
+        argumentos.apply_defaults()
+        if sem_cache is not None and sem_cache(argumentos.arguments):
+            return metodo(self, *args, **kwargs)
+        parametros = tuple((nome, valor) for nome, valor in list(argumentos.arguments.items())[1:]
+                           if nome not in _PARAMETROS_SEM_EFEITO)
+        chave = (metodo.__name__, parametros, self._versao)
+        try:
+            hash(chave)
+        except TypeError:
+            return metodo(self, *args, **kwargs)
+
+        cache = self._cache_metricas
+        if chave in cache:
+            cache.move_to_end(chave)
+            if self.instrumentacao is not None:
+                self.instrumentacao.contar('cache.acertos')
+            return cache[chave]
+
+        resultado = metodo(self, *args, **kwargs)
+        cache[chave] = resultado
+        if len(cache) > TAMANHO_CACHE_METRICAS:
+            cache.popitem(last=False)
+        return resultado
+
+    return instrumentado(envoltorio)
 
 # ------------------------------------------------------------------
 # CLASSE ABSTRATA (MODELO OBRIGATÓRIO)
@@ -9,13 +246,24 @@ class AbstractGraph(ABC):
         self.num_vertices = num_vertices
         self.vertex_weights = [0.0] * num_vertices
         self.vertex_labels = [""] * num_vertices
+        # Versão estrutural (muda a cada alteração) e cache de métricas
+        self._versao = 0
+        self._cache_metricas = OrderedDict()
+        # Instrumentacao opcional (tempos, contadores, progresso, cancelamento)
+        self.instrumentacao = None
 
     def get_vertex_count(self):
         return self.num_vertices
 
+    def _registrar_mutacao(self):
+        """Chamado pelas implementações sempre que o grafo muda."""
+        self._versao += 1
+        self._cache_metricas.clear()
+
     def set_vertex_weight(self, v, weight):
         if 0 <= v < self.num_vertices:
             self.vertex_weights[v] = weight
+            self._registrar_mutacao()
 
     def get_vertex_weight(self, v):
         if 0 <= v < self.num_vertices:
@@ -47,6 +295,16 @@ class AbstractGraph(ABC):
     @abstractmethod
     def get_vertex_out_degree(self, u): pass
 
+    @abstractmethod
+    def get_successors(self, u):
+        """Retorna um iterável de pares (v, peso) das arestas de saída de u."""
+        pass
+
+    @abstractmethod
+    def get_predecessors(self, u):
+        """Retorna um iterável de pares (v, peso) das arestas de entrada v -> u."""
+        pass
+
     # --- LÓGICA DE RELACIONAMENTO (Implementação Padrão) ---
     def is_sucessor(self, u, v):
         return self.has_edge(u, v)
@@ -74,165 +332,12 @@ class AbstractGraph(ABC):
     @abstractmethod
     def is_connected(self): pass
 
-# ------------------------------------------------------------------
-# IMPLEMENTAÇÃO 1: MATRIZ DE ADJACÊNCIA
-# ------------------------------------------------------------------
-class AdjacencyMatrixGraph(AbstractGraph):
-    def __init__(self, num_vertices):
-        super().__init__(num_vertices)
-        self.matrix = [[0.0] * num_vertices for _ in range(num_vertices)]
-        self._edge_count = 0
-
-    def add_edge(self, u, v, weight=1.0):
-        if u == v: return 
-        if 0 <= u < self.num_vertices and 0 <= v < self.num_vertices:
-            if self.matrix[u][v] == 0:
-                self._edge_count += 1
-            self.matrix[u][v] = weight
-
-    def remove_edge(self, u, v):
-        if self.has_edge(u, v):
-            self.matrix[u][v] = 0.0
-            self._edge_count -= 1
-
-    def has_edge(self, u, v):
-        if 0 <= u < self.num_vertices and 0 <= v < self.num_vertices:
-            return self.matrix[u][v] != 0.0
-        return False
-
-    def get_edge_count(self):
-        return self._edge_count
-
-    def get_edge_weight(self, u, v):
-        if self.has_edge(u, v):
-            return self.matrix[u][v]
-        return 0.0
-
-    def set_edge_weight(self, u, v, weight):
-        if self.has_edge(u, v):
-            self.matrix[u][v] = weight
-
-    def get_vertex_out_degree(self, u):
-        count = 0
-        if 0 <= u < self.num_vertices:
-            for v in range(self.num_vertices):
-                if self.matrix[u][v] != 0:
-                    count += 1
-        return count
-
-    def get_vertex_in_degree(self, u):
-        count = 0
-        if 0 <= u < self.num_vertices:
-            for r in range(self.num_vertices):
-                if self.matrix[r][u] != 0:
-                    count += 1
-        return count
-
-    def is_connected(self):
-        if self.num_vertices == 0: return True
-        visited = [False] * self.num_vertices
-        queue = [0]
-        visited[0] = True
-        count_visited = 0
-        while queue:
-            u = queue.pop(0)
-            count_visited += 1
-            for v in range(self.num_vertices):
-                if (self.matrix[u][v] != 0 or self.matrix[v][u] != 0) and not visited[v]:
-                    visited[v] = True
-                    queue.append(v)
-        return count_visited == self.num_vertices
-
-
-# ------------------------------------------------------------------
-# IMPLEMENTAÇÃO 2: LISTA DE ADJACÊNCIA (A PRINCIPAL)
-# ------------------------------------------------------------------
-class AdjacencyListGraph(AbstractGraph):
-    def __init__(self, num_vertices):
-        super().__init__(num_vertices)
-        self.adj_list = [[] for _ in range(num_vertices)]
-        self._edge_count = 0
-
-    def add_edge(self, u, v, weight=1.0):
-        if u == v: return
-        if 0 <= u < self.num_vertices and 0 <= v < self.num_vertices:
-            for i, edge in enumerate(self.adj_list[u]):
-                if edge[0] == v:
-                    self.adj_list[u][i][1] = weight
-                    return
-            self.adj_list[u].append([v, weight])
-            self._edge_count += 1
-
-    def remove_edge(self, u, v):
-        if 0 <= u < self.num_vertices:
-            for i, edge in enumerate(self.adj_list[u]):
-                if edge[0] == v:
-                    self.adj_list[u].pop(i)
-                    self._edge_count -= 1
-                    return
-
-    def has_edge(self, u, v):
-        if 0 <= u < self.num_vertices:
-            for edge in self.adj_list[u]:
-                if edge[0] == v:
-                    return True
-        return False
-
-    def get_edge_count(self):
-        return self._edge_count
-
-    def get_edge_weight(self, u, v):
-        if 0 <= u < self.num_vertices:
-            for edge in self.adj_list[u]:
-                if edge[0] == v:
-                    return edge[1]
-        return 0.0
-
-    def set_edge_weight(self, u, v, weight):
-        if 0 <= u < self.num_vertices:
-            for edge in self.adj_list[u]:
-                if edge[0] == v:
-                    edge[1] = weight
-                    return
-
-    def get_vertex_out_degree(self, u):
-        if 0 <= u < self.num_vertices:
-            return len(self.adj_list[u])
-        return 0
-
-    def get_vertex_in_degree(self, u):
-        count = 0
-        for i in range(self.num_vertices):
-            for edge in self.adj_list[i]:
-                if edge[0] == u:
-                    count += 1
-        return count
-
-    def is_connected(self):
-        if self.num_vertices == 0: return True
-        visited = [False] * self.num_vertices
-        queue = [0]
-        visited[0] = True
-        count_visited = 0
-        while queue:
-            curr = queue.pop(0)
-            count_visited += 1
-            for edge in self.adj_list[curr]:
-                v = edge[0]
-                if not visited[v]:
-                    visited[v] = True
-                    queue.append(v)
-            for i in range(self.num_vertices):
-                if not visited[i]:
-                    for edge in self.adj_list[i]:
-                        if edge[0] == curr:
-                            visited[i] = True
-                            queue.append(i)
-                            break
-        return count_visited == self.num_vertices
-    
     # ====================================================================
-       # --- Métrica 3: Taxa de Reciprocidade ---
+    #   MÉTRICAS (comuns a todas as implementações, via get_successors)
+    # ====================================================================
+
+    # --- Métrica 3: Taxa de Reciprocidade ---
+    @memorizar_metrica
     def calcular_reciprocidade(self):
         """
         Calcula a taxa de reciprocidade do grafo direcionado.
@@ -242,10 +347,12 @@ class AdjacencyListGraph(AbstractGraph):
         pares_com_interacao = set()
         pares_reciprocos = set()
 
-        for u in range(self.num_vertices):
-            for aresta in self.adj_list[u]:
-                v = aresta[0]
-
+        n = self.num_vertices
+        instrumentacao = self.instrumentacao
+        for u in range(n):
+            if instrumentacao is not None and u % VERTICES_POR_PROGRESSO == 0:
+                instrumentacao.progresso('calcular_reciprocidade', u, n, forcar=True)
+            for v, _ in self.get_successors(u):
                 # Par não ordenado (u, v) para evitar duplicidade
                 par = tuple(sorted((u, v)))
                 pares_com_interacao.add(par)
@@ -253,6 +360,8 @@ class AdjacencyListGraph(AbstractGraph):
                 # Verifica se existe a aresta inversa
                 if self.has_edge(v, u):
                     pares_reciprocos.add(par)
+        if instrumentacao is not None:
+            instrumentacao.progresso('calcular_reciprocidade', n, n)
 
         if len(pares_com_interacao) == 0:
             return 0.0
@@ -260,6 +369,7 @@ class AdjacencyListGraph(AbstractGraph):
         return len(pares_reciprocos) / len(pares_com_interacao)
 
     #     # --- Métrica 4: Densidade da Rede ---
+    @memorizar_metrica
     def calcular_densidade(self):
         """
         Calcula a densidade de um grafo direcionado.
@@ -277,6 +387,7 @@ class AdjacencyListGraph(AbstractGraph):
 
 
     # --- Métrica 1: Cálculo do Grau Médio (GMCE) ---
+    @memorizar_metrica
     def calcular_gmce(self):
         n = self.num_vertices
         if n == 0:
@@ -288,31 +399,39 @@ class AdjacencyListGraph(AbstractGraph):
 
         soma_total_metricas = 0.0
 
+        instrumentacao = self.instrumentacao
         for u in range(n):
+            if instrumentacao is not None and u % VERTICES_POR_PROGRESSO == 0:
+                instrumentacao.progresso('calcular_gmce', u, n, forcar=True)
             grau_u = graus[u]
             if grau_u == 0:
                 continue
 
             soma_graus_vizinhos = 0.0
             
-            # Otimização: Iterar sobre a lista de adjacência
-            for aresta in self.adj_list[u]:
-                v = aresta[0] # [vizinho, peso]
+            # Otimização: Iterar apenas sobre os sucessores de u
+            for v, _ in self.get_successors(u):
                 soma_graus_vizinhos += graus[v]
 
             media_vizinhos = soma_graus_vizinhos / grau_u
             valor_conectividade_u = grau_u * media_vizinhos
             soma_total_metricas += valor_conectividade_u
+        if instrumentacao is not None:
+            instrumentacao.progresso('calcular_gmce', n, n)
 
         gmce = soma_total_metricas / n
         return gmce
         
     # --- Métrica 2: Coeficiente de Proximidade (Usando DIJKSTRA) ---
-    def _dijkstra(self, start_node):
-        distancias = {i: float('inf') for i in range(self.num_vertices)}
+    def _dijkstra(self, start_node, reverso=False):
+        # reverso=True percorre as arestas de entrada: distancias[v] = custo de v até start_node
+        vizinhos = self.get_predecessors if reverso else self.get_successors
+        distancias = [float('inf')] * self.num_vertices
         distancias[start_node] = 0
             
         pq = [(0, start_node)]
+        insercoes = 1
+        relaxacoes = 0  # arestas examinadas a partir de vértices finalizados
 
         while pq:
             dist_atual, u = heapq.heappop(pq)
@@ -320,56 +439,245 @@ class AdjacencyListGraph(AbstractGraph):
             if dist_atual > distancias[u]:
                 continue
 
-            for aresta in self.adj_list[u]:
-                v = aresta[0]
-                peso = aresta[1]
-                    
+            arestas = vizinhos(u)
+            relaxacoes += len(arestas)
+            for v, peso in arestas:
                 # Aqui o peso é usado como distância (Custo)
                 nova_dist = dist_atual + peso
 
                 if nova_dist < distancias[v]:
                     distancias[v] = nova_dist
                     heapq.heappush(pq, (nova_dist, v))
-            
+                    insercoes += 1
+
+        if self.instrumentacao is not None:
+            self.instrumentacao.combinar({'dijkstra.execucoes': 1, 'dijkstra.relaxacoes': relaxacoes,
+                                          'dijkstra.insercoes_heap': insercoes})
         return distancias
 
-    def calcular_coeficiente_proximidade(self):
+    def _ao_iterar(self, operacao, max_iter):
+        """Callback de iteracao_de_potencia que reporta progresso (None sem instrumentação)."""
+        instrumentacao = self.instrumentacao
+        if instrumentacao is None:
+            return None
+        return lambda iteracao: instrumentacao.progresso(operacao, iteracao, max_iter)
+
+    def _proximidade_origem(self, origem):
+        """Proximidade de um nó: alcançáveis / soma das distâncias (None se não alcança ninguém)."""
+        distancias = self._dijkstra(origem)
+
+        soma_distancias = 0
+        contagem_alcancaveis = 0
+        for d in distancias:
+            if d != float('inf') and d > 0:
+                soma_distancias += d
+                contagem_alcancaveis += 1
+
+        if soma_distancias > 0:
+            return contagem_alcancaveis / soma_distancias
+        return None
+
+    @memorizar_metrica
+    def calcular_proximidade_por_no(self, workers=1):
+        """
+        Proximidade de cada vértice (None para quem não alcança ninguém).
+        Com workers > 1 (ou None = todos os núcleos) as origens são divididas
+        entre processos que leem o grafo em CSR via memória compartilhada.
+        """
+        n = self.num_vertices
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1 and n > 1:
+            return _proximidades_em_paralelo(self, workers)
+
+        instrumentacao = self.instrumentacao
+        proximidades = []
+        for i in range(n):
+            if instrumentacao is not None:
+                instrumentacao.progresso('calcular_proximidade_por_no', i, n)
+            proximidades.append(self._proximidade_origem(i))
+        if instrumentacao is not None:
+            instrumentacao.progresso('calcular_proximidade_por_no', n, n)
+        return proximidades
+
+    @memorizar_metrica
+    def calcular_coeficiente_proximidade(self, workers=1):
         n = self.num_vertices
         if n == 0: return 0.0
 
         soma_proximidades = 0.0
         nos_processados = 0
 
-        print(f"   > Iniciando cálculo de Dijkstra para {n} nós...")
-            
-        for i in range(n):
-            if i % 100 == 0: print(f"     Processando nó {i}/{n}...")
-
-            distancias = self._dijkstra(i)
-                
-            soma_distancias = 0
-            contagem_alcancaveis = 0
-                
-            for d in distancias.values():
-                if d != float('inf') and d > 0:
-                    soma_distancias += d
-                    contagem_alcancaveis += 1
-                
-            if soma_distancias > 0:
-                proximidade = contagem_alcancaveis / soma_distancias
+        # Soma na ordem das origens: o resultado paralelo é idêntico ao serial
+        for proximidade in self.calcular_proximidade_por_no(workers):
+            if proximidade is not None:
                 soma_proximidades += proximidade
                 nos_processados += 1
 
         if nos_processados == 0:
             return 0.0
-                
+
         return soma_proximidades / nos_processados
 
+    @instrumentado
+    def estimar_coeficiente_proximidade(self, amostras=None, tempo_limite=None, semente=None, confianca=0.95):
+        """
+        Versão aproximada de calcular_coeficiente_proximidade: roda Dijkstra só a
+        partir de pivôs sorteados (sem reposição) até esgotar `amostras` ou
+        `tempo_limite` segundos (padrão: 64 pivôs).
+
+        - Global: média das proximidades exatas dos pivôs, com intervalo de
+          confiança normal (inclui correção de população finita).
+        - Por nó: Dijkstra reverso a partir de cada pivô dá o custo de cada v até
+          os pivôs; a proximidade de v é estimada como 1 / média desses custos
+          (exata para os próprios pivôs).
+
+        Retorna dict com 'estimativa', 'intervalo' (inf, sup), 'amostras' e
+        'por_no' (lista com None para nós que não alcançaram nenhum pivô).
+        """
+        n = self.num_vertices
+        if n == 0:
+            return {'estimativa': 0.0, 'intervalo': (0.0, 0.0), 'amostras': 0, 'por_no': []}
+        if amostras is None and tempo_limite is None:
+            amostras = 64
+        limite = n if amostras is None else min(amostras, n)
+
+        rng = random.Random(semente)
+        pivos = rng.sample(range(n), limite)
+        inicio = time.perf_counter()
+
+        valores = []                 # proximidade exata de cada pivô (quando definida)
+        soma_custos = [0.0] * n      # soma de d(v, pivô) por nó
+        contagem_custos = [0] * n
+        por_no = [None] * n
+        usados = 0
+        for p in pivos:
+            if tempo_limite is not None and usados >= 2 and time.perf_counter() - inicio > tempo_limite:
+                break
+            if self.instrumentacao is not None:
+                self.instrumentacao.progresso('estimar_coeficiente_proximidade', usados, limite)
+            usados += 1
+
+            proximidade = self._proximidade_origem(p)
+            por_no[p] = proximidade
+            if proximidade is not None:
+                valores.append(proximidade)
+
+            for v, d in enumerate(self._dijkstra(p, reverso=True)):
+                if d != float('inf') and d > 0:
+                    soma_custos[v] += d
+                    contagem_custos[v] += 1
+
+        if self.instrumentacao is not None:
+            self.instrumentacao.progresso('estimar_coeficiente_proximidade', usados, usados)
+        sorteados = set(pivos[:usados])
+        for v in range(n):
+            if v not in sorteados and soma_custos[v] > 0:
+                por_no[v] = contagem_custos[v] / soma_custos[v]
+
+        if not valores:
+            return {'estimativa': 0.0, 'intervalo': (0.0, 0.0), 'amostras': usados, 'por_no': por_no}
+
+        media = sum(valores) / len(valores)
+        margem = 0.0
+        if len(valores) > 1 and usados < n:
+            z = NormalDist().inv_cdf((1 + confianca) / 2)
+            correcao = ((n - usados) / (n - 1)) ** 0.5
+            margem = z * stdev(valores) / len(valores) ** 0.5 * correcao
+
+        return {
+            'estimativa': media,
+            'intervalo': (max(0.0, media - margem), media + margem),
+            'amostras': usados,
+            'por_no': por_no,
+        }
+
+    # ====================================================================
+    #   Intermediação (Brandes ponderado)
+    # ====================================================================
+    def _brandes_origem(self, origem, centralidade):
+        """
+        Uma origem do algoritmo de Brandes: Dijkstra (peso = custo, como em
+        _dijkstra) contando caminhos mínimos e guardando predecessores, depois
+        acumula as dependências em centralidade (in-place).
+        """
+        n = self.num_vertices
+        distancias = [float('inf')] * n
+        caminhos = [0.0] * n           # sigma: número de caminhos mínimos
+        predecessores = [[] for _ in range(n)]
+        fechado = [False] * n          # distância já definitiva (vértice em ordem)
+        distancias[origem] = 0
+        caminhos[origem] = 1.0
+        ordem = []                     # vértices na ordem em que foram fechados
+
+        pq = [(0, origem)]
+        while pq:
+            dist_atual, u = heapq.heappop(pq)
+            if fechado[u] or dist_atual > distancias[u]:
+                continue
+            fechado[u] = True
+            ordem.append(u)
+            for v, peso in self.get_successors(u):
+                nova_dist = dist_atual + peso
+                if nova_dist < distancias[v]:
+                    distancias[v] = nova_dist
+                    caminhos[v] = caminhos[u]
+                    predecessores[v] = [u]
+                    heapq.heappush(pq, (nova_dist, v))
+                elif nova_dist == distancias[v] and not fechado[v]:
+                    # Empate com peso 0 pode chegar à origem ou a um vértice
+                    # já fechado: esses caminhos não entram na contagem
+                    caminhos[v] += caminhos[u]
+                    predecessores[v].append(u)
+
+        _acumular_dependencias(origem, ordem, caminhos, predecessores, centralidade)
+
+    @memorizar_metrica(sem_cache=_amostragem_aleatoria)
+    def calcular_intermediacao(self, normalizar=True, amostras=None, semente=None, workers=1):
+        """
+        Centralidade de intermediação (betweenness) ponderada, pelo algoritmo
+        de Brandes: quanto cada usuário aparece nos caminhos de menor custo
+        entre outros dois; valores altos indicam pontes entre sub-equipes.
+
+        - normalizar: divide por (n-1)(n-2), o máximo em grafo direcionado
+        - amostras: usa só essa quantidade de origens sorteadas (sem
+          reposição) e multiplica por n/amostras; custo limitado em grafos grandes
+        - workers > 1 (ou None = todos os núcleos): as origens são divididas
+          entre processos que leem o CSR em memória compartilhada, e as
+          contribuições parciais são somadas no final
+        Retorna a lista com a intermediação de cada vértice.
+        """
+        n = self.num_vertices
+        if amostras is not None and amostras < n:
+            origens = sorted(random.Random(semente).sample(range(n), amostras))
+        else:
+            origens = list(range(n))
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1 and len(origens) > 1:
+            centralidade = _intermediacao_em_paralelo(self, workers, origens)
+        else:
+            centralidade = [0.0] * n
+            instrumentacao = self.instrumentacao
+            for feito, origem in enumerate(origens):
+                if instrumentacao is not None:
+                    instrumentacao.progresso('calcular_intermediacao', feito, len(origens))
+                self._brandes_origem(origem, centralidade)
+            if instrumentacao is not None:
+                instrumentacao.progresso('calcular_intermediacao', len(origens), len(origens))
+
+        escala = n / len(origens) if origens else 0.0
+        if normalizar and n > 2:
+            escala /= (n - 1) * (n - 2)
+        return [c * escala for c in centralidade]
+
     # ====================================================================
     #   Métrica NOVA: PageRank (Influência / Importância)
     #   - Sem biblioteca de grafos
     #   - Considera pesos nas arestas (normaliza por soma de pesos de saída)
     # ====================================================================
+    @memorizar_metrica
     def calcular_pagerank(self, damping=0.85, max_iter=100, tol=1e-6):
         """
         PageRank em grafo direcionado.
@@ -389,19 +697,29 @@ class AdjacencyListGraph(AbstractGraph):
         # rank inicial uniforme
         rank = [1.0 / n] * n
 
-        # pré-cálculo: soma dos pesos de saída de cada u
+        # pré-cálculo: soma dos pesos de saída de cada u e, uma única vez,
+        # a probabilidade de transição w / su de cada aresta positiva
         out_weight_sum = [0.0] * n
+        transicoes = [None] * n
         for u in range(n):
             s = 0.0
-            for v, w in self.adj_list[u]:
+            positivas = []
+            for v, w in self.get_successors(u):
                 # garante peso positivo (se seu dataset puder ter 0/negativo, trate aqui)
                 if w > 0:
                     s += w
+                    positivas.append((v, w))
             out_weight_sum[u] = s
+            transicoes[u] = [(v, w / s) for v, w in positivas]
 
         base = (1.0 - damping) / n
+        instrumentacao = self.instrumentacao
+        iteracoes = 0
 
         for _ in range(max_iter):
+            iteracoes += 1
+            if instrumentacao is not None:
+                instrumentacao.progresso('calcular_pagerank', iteracoes, max_iter)
             new_rank = [base] * n
 
             # soma do rank "pendurado" (dangling nodes: sem saída)
@@ -416,18 +734,14 @@ class AdjacencyListGraph(AbstractGraph):
                 for i in range(n):
                     new_rank[i] += add
 
-            # distribui contribuições pelos links
+            # distribui contribuições pelos links (transição ponderada)
             for u in range(n):
-                su = out_weight_sum[u]
-                if su == 0.0:
+                if out_weight_sum[u] == 0.0:
                     continue
 
-                ru = rank[u]
-                for v, w in self.adj_list[u]:
-                    if w <= 0:
-                        continue
-                    # transição ponderada
-                    new_rank[v] += damping * ru * (w / su)
+                fator = damping * rank[u]
+                for v, p in transicoes[u]:
+                    new_rank[v] += fator * p
 
             # checa convergência (norma L1)
             diff = 0.0
@@ -438,17 +752,42 @@ class AdjacencyListGraph(AbstractGraph):
             if diff < tol:
                 break
 
+        if instrumentacao is not None:
+            instrumentacao.contar('pagerank.iteracoes', iteracoes)
+
         # normalização final (segurança numérica)
         s = sum(rank)
         if s > 0:
             rank = [x / s for x in rank]
         return rank
 
-    def top_pagerank(self, k=10, damping=0.85, max_iter=100, tol=1e-6):
+    @memorizar_metrica
+    def calcular_pagerank_vetorizado(self, damping=0.85, max_iter=100, tol=1e-6,
+                                     personalizacao=None, rank_inicial=None):
+        """
+        Mesmo PageRank de calcular_pagerank, iterado com NumPy sobre a matriz
+        de transição esparsa (montada uma única vez). Requer NumPy.
+
+        - personalizacao: dict {vértice: peso} ou sequência de tamanho n; define
+          para onde vão o teleporte e a massa dos nós sem saída (padrão: uniforme)
+        - rank_inicial: vetor de um cálculo anterior para partida a quente
+        """
+        return MotorPageRank(self).calcular(damping, max_iter, tol, personalizacao, rank_inicial).tolist()
+
+    @instrumentado
+    def top_pagerank(self, k=10, damping=0.85, max_iter=100, tol=1e-6, personalizacao=None):
         """
         Retorna top-k nós por PageRank com rótulo (se existir).
+        Grafos com LIMIAR_PAGERANK_VETORIZADO arestas ou mais (ou com
+        personalização) usam o motor NumPy quando ele está disponível.
         """
-        pr = self.calcular_pagerank(damping=damping, max_iter=max_iter, tol=tol)
+        if np is not None and (personalizacao is not None or self.get_edge_count() >= LIMIAR_PAGERANK_VETORIZADO):
+            pr = self.calcular_pagerank_vetorizado(damping=damping, max_iter=max_iter, tol=tol,
+                                                   personalizacao=personalizacao)
+        else:
+            if personalizacao is not None:
+                raise RuntimeError("PageRank personalizado requer NumPy instalado.")
+            pr = self.calcular_pagerank(damping=damping, max_iter=max_iter, tol=tol)
         pares = []
         for i, val in enumerate(pr):
             label = self.vertex_labels[i] if hasattr(self, 'vertex_labels') and i < len(self.vertex_labels) else str(i)
@@ -456,37 +795,2027 @@ class AdjacencyListGraph(AbstractGraph):
         pares.sort(key=lambda x: x[2], reverse=True)
         return pares[:k]
 
+    @memorizar_metrica
+    def calcular_pagerank_multiplo(self, dampings=(0.85,), max_iter=100, tol=1e-6, personalizacao=None):
+        """PageRank para vários fatores de amortecimento em um só lote. Retorna {damping: lista}."""
+        R = MotorPageRank(self).calcular_lote(dampings, max_iter, tol, personalizacao)
+        return {d: R[:, j].tolist() for j, d in enumerate(dampings)}
+
+    @memorizar_metrica
+    def calcular_hits(self, max_iter=100, tol=1e-8):
+        """
+        HITS ponderado (hubs e autoridades). Itera h <- A·Aᵀ·h no núcleo em lote
+        e obtém a = Aᵀ·h no final; ambos normalizados para somar 1.
+        Hubs altos: quem interage com autoridades (ex.: revisores ativos);
+        autoridades altas: quem recebe interações de bons hubs (ex.: autores).
+        Requer NumPy. Retorna (hubs, autoridades).
+        """
+        n = self.num_vertices
+        if n == 0:
+            return [], []
+        propaga = OperadorEsparso(n, *self._arestas_numpy())   # X[u] -> Y[v]
+        volta = propaga.transposto()                          # X[v] -> Y[u]
+
+        def normalizar(X):
+            somas = X.sum(axis=0)
+            return np.divide(X, somas, out=X, where=somas > 0)
+
+        def passo(H, ativas):
+            return normalizar(volta.aplicar(propaga.aplicar(H)))
+
+        H, iteracoes, _ = iteracao_de_potencia(passo, np.full((n, 1), 1.0 / n), max_iter, tol,
+                                               self._ao_iterar('calcular_hits', max_iter))
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar('hits.iteracoes', int(iteracoes.max()))
+        A = normalizar(propaga.aplicar(H))
+        return H[:, 0].tolist(), A[:, 0].tolist()
+
+    @memorizar_metrica
+    def calcular_katz(self, alfas=(0.01,), beta=1.0, max_iter=1000, tol=1e-8):
+        """
+        Centralidade de Katz ponderada, x = alfa·Aᵀ·x + beta, para vários alfas
+        no mesmo lote. Cada alfa precisa ser menor que 1/raio espectral da matriz
+        de pesos; se a série divergir é lançado ValueError. Requer NumPy.
+        Retorna {alfa: lista}.
+        """
+        n = self.num_vertices
+        if n == 0:
+            return {a: [] for a in alfas}
+        propaga = OperadorEsparso(n, *self._arestas_numpy())
+        vetor_alfas = np.asarray(alfas, dtype=np.float64)
+
+        def passo(X, ativas):
+            return vetor_alfas[ativas] * propaga.aplicar(X) + beta
+
+        with np.errstate(over='ignore', invalid='ignore'):
+            X, iteracoes, convergiu = iteracao_de_potencia(passo, np.full((n, len(alfas)), beta), max_iter, tol,
+                                                           self._ao_iterar('calcular_katz', max_iter))
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar('katz.iteracoes', int(iteracoes.max()))
+        if not convergiu.all():
+            divergentes = [a for a, ok in zip(alfas, convergiu) if not ok]
+            raise ValueError(f"Série de Katz não convergiu para alfa(s) {divergentes}: use alfas menores.")
+        return {a: X[:, j].tolist() for j, a in enumerate(alfas)}
+
+    def _arestas_numpy(self):
+        """Arestas como vetores NumPy (origens, destinos, pesos), agrupadas por origem."""
+        n = self.num_vertices
+        origens, destinos, pesos = [], [], []
+        for u in range(n):
+            for v, w in self.get_successors(u):
+                origens.append(u)
+                destinos.append(v)
+                pesos.append(w)
+        return (np.array(origens, dtype=np.int64), np.array(destinos, dtype=np.int64),
+                np.array(pesos, dtype=np.float64))
+
+    # ====================================================================
+    #   Componentes conexas (lineares, sem recursão)
+    # ====================================================================
+    @memorizar_metrica
+    def componentes_fracas(self):
+        """
+        Componentes fracamente conexas por union-find (união por tamanho e
+        compressão de caminho) sobre a lista de arestas, O(V + E·α(V)).
+        Retorna (ids, tamanhos): ids[v] é a componente de v, numeradas na
+        ordem do menor vértice de cada uma, e tamanhos[c] o número de vértices.
+        """
+        n = self.num_vertices
+        pai = list(range(n))
+        tamanho = [1] * n
+
+        def raiz(x):
+            while pai[x] != x:
+                pai[x] = pai[pai[x]]
+                x = pai[x]
+            return x
+
+        instrumentacao = self.instrumentacao
+        for u in range(n):
+            if instrumentacao is not None and u % VERTICES_POR_PROGRESSO == 0:
+                instrumentacao.progresso('componentes_fracas', u, n, forcar=True)
+            for v, _ in self.get_successors(u):
+                a, b = raiz(u), raiz(v)
+                if a != b:
+                    if tamanho[a] < tamanho[b]:
+                        a, b = b, a
+                    pai[b] = a
+                    tamanho[a] += tamanho[b]
+        if instrumentacao is not None:
+            instrumentacao.progresso('componentes_fracas', n, n)
+
+        return _numerar_componentes([raiz(v) for v in range(n)])
+
+    @memorizar_metrica
+    def componentes_fortes(self):
+        """
+        Componentes fortemente conexas por Tarjan iterativo (pilha explícita,
+        sem limite de recursão), O(V + E). Mesmo formato de componentes_fracas.
+        """
+        n = self.num_vertices
+        vizinhos = [[v for v, _ in self.get_successors(u)] for u in range(n)]
+        indice = [-1] * n        # ordem de descoberta
+        menor = [0] * n          # menor índice alcançável (lowlink)
+        na_pilha = [False] * n
+        pilha = []
+        rotulo = [-1] * n
+        proximo_indice = 0
+        componentes = 0
+        fechados = 0             # vértices já retornados (progresso)
+        instrumentacao = self.instrumentacao
+
+        for inicio in range(n):
+            if indice[inicio] != -1:
+                continue
+            indice[inicio] = menor[inicio] = proximo_indice
+            proximo_indice += 1
+            pilha.append(inicio)
+            na_pilha[inicio] = True
+            chamadas = [(inicio, 0)]   # (vértice, próximo vizinho a visitar)
+
+            while chamadas:
+                u, i = chamadas[-1]
+                lista = vizinhos[u]
+                if i < len(lista):
+                    chamadas[-1] = (u, i + 1)
+                    v = lista[i]
+                    if indice[v] == -1:
+                        indice[v] = menor[v] = proximo_indice
+                        proximo_indice += 1
+                        pilha.append(v)
+                        na_pilha[v] = True
+                        chamadas.append((v, 0))
+                    elif na_pilha[v] and indice[v] < menor[u]:
+                        menor[u] = indice[v]
+                    continue
+
+                # Todos os vizinhos de u visitados: "retorno" da chamada
+                chamadas.pop()
+                if instrumentacao is not None and fechados % VERTICES_POR_PROGRESSO == 0:
+                    instrumentacao.progresso('componentes_fortes', fechados, n, forcar=True)
+                fechados += 1
+                if chamadas:
+                    pai = chamadas[-1][0]
+                    if menor[u] < menor[pai]:
+                        menor[pai] = menor[u]
+                if menor[u] == indice[u]:
+                    while True:
+                        w = pilha.pop()
+                        na_pilha[w] = False
+                        rotulo[w] = componentes
+                        if w == u:
+                            break
+                    componentes += 1
+        if instrumentacao is not None:
+            instrumentacao.progresso('componentes_fortes', n, n)
+
+        return _numerar_componentes(rotulo)
+
+    def componente_gigante(self, fortes=False):
+        """Vértices (em ordem crescente) da maior componente fraca, ou forte com fortes=True."""
+        ids, tamanhos = self.componentes_fortes() if fortes else self.componentes_fracas()
+        if not tamanhos:
+            return []
+        maior = max(range(len(tamanhos)), key=tamanhos.__getitem__)
+        return [v for v, c in enumerate(ids) if c == maior]
+
+    def subgrafo(self, vertices):
+        """
+        Subgrafo induzido pelos vértices dados, renumerados 0..k-1 na ordem
+        recebida, com rótulos e pesos de vértice copiados. O mapeamento para
+        os ids originais fica em subgrafo.vertices_originais. Um CSR gera CSR;
+        os demais backends geram o mesmo tipo.
+        """
+        vertices = list(vertices)
+        novo_id = {v: i for i, v in enumerate(vertices)}
+        arestas = [(novo_id[u], novo_id[v], w) for u in vertices
+                   for v, w in self.get_successors(u) if v in novo_id]
+        labels = [self.vertex_labels[v] if v < len(self.vertex_labels) else str(v) for v in vertices]
+
+        if isinstance(self, CSRGraph):
+            sub = CSRGraph.from_edges(len(vertices), arestas, labels)
+        else:
+            sub = type(self)(len(vertices))
+            sub.vertex_labels = labels
+            for u, v, w in arestas:
+                sub.add_edge(u, v, w)
+        sub.vertex_weights = [self.vertex_weights[v] for v in vertices]
+        sub.vertices_originais = vertices
+        sub.instrumentacao = self.instrumentacao
+        return sub
+
+    def subgrafo_componente_gigante(self, fortes=False):
+        """Atalho para rodar as métricas só na maior componente."""
+        return self.subgrafo(self.componente_gigante(fortes))
+
+    # ====================================================================
+    #   Comunidades (Louvain e propagação de rótulos)
+    # ====================================================================
+    def calcular_modularidade(self, comunidades, resolucao=1.0):
+        """Modularidade de uma partição (comunidades[v] = id) na versão não direcionada do grafo."""
+        return _modularidade(*_adjacencia_simetrica(self), comunidades, resolucao)
+
+    @memorizar_metrica
+    def calcular_comunidades_louvain(self, resolucao=1.0, semente=None):
+        """
+        Louvain ponderado sobre a versão não direcionada (A = W + Wᵀ):
+        movimentos locais que maximizam a modularidade, depois cada comunidade
+        vira um vértice e o processo se repete até nada mudar. resolucao > 1
+        favorece comunidades menores. semente embaralha a ordem de visita
+        (None: ordem dos vértices, resultado determinístico).
+        Retorna (ids, modularidade), com ids numerados pelo menor vértice.
+        """
+        n = self.num_vertices
+        offsets, vizinhos, pesos = _adjacencia_simetrica(self)
+        rng = random.Random(semente) if semente is not None else None
+        membro = list(range(n))
+        nivel_offsets, nivel_vizinhos, nivel_pesos, laco = offsets, vizinhos, pesos, [0.0] * n
+        niveis = 0
+
+        while True:
+            tamanho = len(nivel_offsets) - 1
+            ordem = list(range(tamanho))
+            if rng is not None:
+                rng.shuffle(ordem)
+            comunidade, movimentos = _louvain_mover(nivel_offsets, nivel_vizinhos, nivel_pesos, laco,
+                                                    resolucao, ordem, self.instrumentacao)
+            if movimentos == 0:
+                break
+            niveis += 1
+            ids, tamanhos = _numerar_componentes(comunidade)
+            membro = [ids[c] for c in membro]
+            nivel_offsets, nivel_vizinhos, nivel_pesos, laco = _agregar_comunidades(
+                nivel_offsets, nivel_vizinhos, nivel_pesos, laco, ids, len(tamanhos))
+
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar('louvain.niveis', niveis)
+        ids, _ = _numerar_componentes(membro)
+        return ids, _modularidade(offsets, vizinhos, pesos, ids, resolucao)
+
+    @memorizar_metrica
+    def calcular_comunidades_propagacao(self, max_iter=100, semente=None):
+        """
+        Propagação de rótulos ponderada (assíncrona): cada vértice adota o
+        rótulo de maior peso entre os vizinhos, até nenhum mudar ou max_iter
+        varreduras. Mais rápida que o Louvain e sem otimizar a modularidade
+        diretamente. Empates ficam com o rótulo atual ou, se ele não empata, com
+        o menor rótulo (ou um sorteado, com semente).
+        Retorna (ids, modularidade), como calcular_comunidades_louvain.
+        """
+        n = self.num_vertices
+        offsets, vizinhos, pesos = _adjacencia_simetrica(self)
+        rng = random.Random(semente) if semente is not None else None
+        rotulo = list(range(n))
+        peso_para = [0.0] * n
+        tocados = []
+        ordem = list(range(n))
+        iteracoes = 0
+
+        for iteracoes in range(1, max_iter + 1):
+            if self.instrumentacao is not None:
+                self.instrumentacao.progresso('propagacao_rotulos', iteracoes, max_iter)
+            if rng is not None:
+                rng.shuffle(ordem)
+            mudaram = 0
+            for i in ordem:
+                if offsets[i] == offsets[i + 1]:
+                    continue
+                for p in range(offsets[i], offsets[i + 1]):
+                    r = rotulo[vizinhos[p]]
+                    if peso_para[r] == 0.0:
+                        tocados.append(r)
+                    peso_para[r] += pesos[p]
+
+                maior = max(peso_para[r] for r in tocados)
+                atual = rotulo[i]
+                if peso_para[atual] < maior:
+                    candidatos = [r for r in tocados if peso_para[r] == maior]
+                    rotulo[i] = rng.choice(candidatos) if rng is not None else min(candidatos)
+                    mudaram += 1
+
+                for r in tocados:
+                    peso_para[r] = 0.0
+                tocados.clear()
+            if mudaram == 0:
+                break
+
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar('propagacao.iteracoes', iteracoes)
+        ids, _ = _numerar_componentes(rotulo)
+        return ids, _modularidade(offsets, vizinhos, pesos, ids)
+
     # ====================================================================
     #   Exportação para o GEPHI
     # ====================================================================
-    def export_to_gephi(self, path_arquivo):
-        print(f"--- Exportando para Gephi: {path_arquivo} ---")
+    def _atributo_gephi(self, nome, workers=1):
+        """Valores por nó dos atributos calculados pelo próprio grafo."""
+        n = self.num_vertices
+        if nome == 'pagerank':
+            if np is not None and self.get_edge_count() >= LIMIAR_PAGERANK_VETORIZADO:
+                return self.calcular_pagerank_vetorizado()
+            return self.calcular_pagerank()
+        if nome == 'grau_entrada':
+            return [self.get_vertex_in_degree(u) for u in range(n)]
+        if nome == 'grau_saida':
+            return [self.get_vertex_out_degree(u) for u in range(n)]
+        if nome == 'proximidade':
+            return self.calcular_proximidade_por_no(workers)
+        if nome == 'comunidade':
+            return self.calcular_comunidades_louvain()[0]
+        if nome == 'intermediacao':
+            return self.calcular_intermediacao(workers=workers)
+        raise ValueError(f"Atributo desconhecido: {nome!r} (use {', '.join(ATRIBUTOS_GEPHI)} ou passe os valores)")
+
+    def _colunas_gephi(self, atributos, workers=1):
+        """
+        [(nome, valores)] a partir de nomes de ATRIBUTOS_GEPHI e/ou dicts
+        {nome: valores por nó}, em qualquer mistura. Valida tudo antes de
+        calcular qualquer métrica; lança ValueError em nome ou tamanho inválido.
+        Um nome ou dict sozinho vale como lista de um item.
+        """
+        itens = [atributos] if isinstance(atributos, (dict, str)) else list(atributos)
+        for item in itens:
+            if isinstance(item, dict):
+                for nome, valores in item.items():
+                    if len(valores) != self.num_vertices:
+                        raise ValueError(f"Atributo {nome!r} tem {len(valores)} valores; esperado {self.num_vertices}")
+            elif item not in ATRIBUTOS_GEPHI:
+                raise ValueError(f"Atributo desconhecido: {item!r} (use {', '.join(ATRIBUTOS_GEPHI)} ou passe os valores)")
+
+        colunas = []
+        for item in itens:
+            if isinstance(item, dict):
+                colunas.extend(item.items())
+            else:
+                colunas.append((item, self._atributo_gephi(item, workers)))
+        return colunas
+
+    @instrumentado
+    def export_to_gephi(self, path_arquivo, atributos=(), comprimir=None, workers=1):
+        """
+        Exporta em GEXF 1.2, em fluxo: as linhas são acumuladas em blocos de
+        LINHAS_POR_ESCRITA e gravadas de uma vez, sem montar o arquivo em memória.
+
+        - atributos: um nome, dict {nome: valores por nó} ou sequência que mistura
+          nomes de ATRIBUTOS_GEPHI (calculados aqui) e dicts; valores None
+          ficam sem attvalue. Nome desconhecido ou tamanho errado: ValueError
+        - comprimir: grava gzip; None decide pela extensão .gz
+        - workers: processos da proximidade/intermediação, se pedidas
+
+        O progresso é reportado por vértice (nós e depois arestas de saída,
+        total 2n). Se cancelada, o arquivo parcial é removido; erros de
+        gravação (OSError) são reportados sem interromper o programa.
+        """
+        instrumentacao = self.instrumentacao
+        n = self.num_vertices
+        if comprimir is None:
+            comprimir = path_arquivo.endswith('.gz')
+        colunas = self._colunas_gephi(atributos, workers)
         try:
-            with open(path_arquivo, 'w', encoding='utf-8') as f:
-                f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-                f.write('<gexf xmlns="http://www.gexf.net/1.2draft" version="1.2">\n')
-                f.write('    <meta><creator>Trabalho Grafos</creator></meta>\n')
-                f.write('    <graph mode="static" defaultedgetype="directed">\n')
-                
-                f.write('        <nodes>\n')
-                for i in range(self.num_vertices):
-                    rotulo = str(i)
-                    if hasattr(self, 'vertex_labels') and i < len(self.vertex_labels):
-                        rotulo = self.vertex_labels[i].replace("&", "").replace("<", "").replace(">", "")
-                    f.write(f'            <node id="{i}" label="{rotulo}" />\n')
-                f.write('        </nodes>\n')
-
-                f.write('        <edges>\n')
+            if comprimir:
+                arquivo = gzip.open(path_arquivo, 'wt', encoding='utf-8', compresslevel=6)
+            else:
+                arquivo = open(path_arquivo, 'w', encoding='utf-8', buffering=1 << 20)
+            with arquivo as f:
+                buffer = []
+
+                def escrever(linha):
+                    buffer.append(linha)
+                    if len(buffer) >= LINHAS_POR_ESCRITA:
+                        f.write(''.join(buffer))
+                        buffer.clear()
+
+                escrever('<?xml version="1.0" encoding="UTF-8"?>\n')
+                escrever('<gexf xmlns="http://www.gexf.net/1.2draft" version="1.2">\n')
+                escrever('    <meta><creator>Trabalho Grafos</creator></meta>\n')
+                escrever('    <graph mode="static" defaultedgetype="directed">\n')
+
+                if colunas:
+                    escrever('        <attributes class="node">\n')
+                    for i, (nome, valores) in enumerate(colunas):
+                        escrever(f'            <attribute id="{i}" title={quoteattr(str(nome))} '
+                                 f'type="{_tipo_gexf(valores)}" />\n')
+                    escrever('        </attributes>\n')
+
+                labels = getattr(self, 'vertex_labels', None) or []
+                escrever('        <nodes>\n')
+                for i in range(n):
+                    if instrumentacao is not None:
+                        instrumentacao.progresso('export_to_gephi', i, 2 * n)
+                    rotulo = quoteattr(_texto_xml(labels[i] if i < len(labels) else i))
+                    valores = ''.join(f'<attvalue for="{j}" value={quoteattr(_texto_xml(coluna[i]))} />'
+                                      for j, (_, coluna) in enumerate(colunas) if coluna[i] is not None)
+                    if valores:
+                        escrever(f'            <node id="{i}" label={rotulo}><attvalues>{valores}</attvalues></node>\n')
+                    else:
+                        escrever(f'            <node id="{i}" label={rotulo} />\n')
+                escrever('        </nodes>\n')
+
+                escrever('        <edges>\n')
                 id_aresta = 0
-                for u in range(self.num_vertices):
-                    for aresta in self.adj_list[u]:
-                        f.write(f'            <edge id="{id_aresta}" source="{u}" target="{aresta[0]}" weight="{aresta[1]}" />\n')
+                for u in range(n):
+                    if instrumentacao is not None:
+                        instrumentacao.progresso('export_to_gephi', n + u, 2 * n)
+                    for v, w in self.get_successors(u):
+                        escrever(f'            <edge id="{id_aresta}" source="{u}" target="{v}" weight="{w}" />\n')
                         id_aresta += 1
-                f.write('        </edges>\n')
-                f.write('    </graph>\n')
-                f.write('</gexf>\n')
-            print("Exportação concluída.")
-        except Exception as e:
+                escrever('        </edges>\n')
+                escrever('    </graph>\n')
+                escrever('</gexf>\n')
+                f.write(''.join(buffer))
+            if instrumentacao is not None:
+                instrumentacao.progresso('export_to_gephi', 2 * n, 2 * n)
+        except OperacaoCancelada:
+            if os.path.exists(path_arquivo):
+                os.remove(path_arquivo)
+            raise
+        except OSError as e:
             print(f"Erro exportar Gephi: {e}")
 
-            
\ No newline at end of file
+
+# ------------------------------------------------------------------
+# IMPLEMENTAÇÃO 1: MATRIZ DE ADJACÊNCIA
+# ------------------------------------------------------------------
+class AdjacencyMatrixGraph(AbstractGraph):
+    """
+    Matriz contígua de pesos float32 (array('f'), n*n) e um bitset de
+    existência (bytearray, uma linha de ceil(n/8) bytes por vértice, bit mais
+    significativo primeiro). Com NumPy, as mesmas memórias são vistas como
+    ndarrays (sem cópia) para graus, vizinhanças e conectividade vetorizados;
+    sem NumPy, as varreduras usam fatias e operações de bytes em C.
+    Os pesos ficam em precisão simples (float32).
+    """
+    def __init__(self, num_vertices):
+        super().__init__(num_vertices)
+        n = num_vertices
+        self._bytes_linha = (n + 7) // 8
+        self.pesos = array('f', [0.0]) * (n * n)
+        self.bits = bytearray(n * self._bytes_linha)
+        self._edge_count = 0
+        self._criar_visoes()
+
+    def _criar_visoes(self):
+        # Vistas NumPy sem cópia sobre pesos/bits; refeitas após cópia ou pickle,
+        # que duplicam os buffers e deixariam as vistas apontando para os antigos
+        if np is not None:
+            n = self.num_vertices
+            self._pesos_np = np.frombuffer(self.pesos, dtype=np.float32).reshape(n, n)
+            self._bits_np = np.frombuffer(self.bits, dtype=np.uint8).reshape(n, self._bytes_linha)
+
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado.pop('_pesos_np', None)
+        estado.pop('_bits_np', None)
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._criar_visoes()
+
+    def _posicao_bit(self, u, v):
+        return u * self._bytes_linha + (v >> 3), 0x80 >> (v & 7)
+
+    def add_edge(self, u, v, weight=1.0):
+        if u == v: return 
+        if 0 <= u < self.num_vertices and 0 <= v < self.num_vertices:
+            i, mascara = self._posicao_bit(u, v)
+            if not self.bits[i] & mascara:
+                self.bits[i] |= mascara
+                self._edge_count += 1
+            self.pesos[u * self.num_vertices + v] = weight
+            self._registrar_mutacao()
+
+    def remove_edge(self, u, v):
+        if self.has_edge(u, v):
+            i, mascara = self._posicao_bit(u, v)
+            self.bits[i] &= ~mascara & 0xFF
+            self.pesos[u * self.num_vertices + v] = 0.0
+            self._edge_count -= 1
+            self._registrar_mutacao()
+
+    def has_edge(self, u, v):
+        if 0 <= u < self.num_vertices and 0 <= v < self.num_vertices:
+            i, mascara = self._posicao_bit(u, v)
+            return bool(self.bits[i] & mascara)
+        return False
+
+    def get_edge_count(self):
+        return self._edge_count
+
+    def get_edge_weight(self, u, v):
+        if self.has_edge(u, v):
+            return self.pesos[u * self.num_vertices + v]
+        return 0.0
+
+    def set_edge_weight(self, u, v, weight):
+        if self.has_edge(u, v):
+            self.pesos[u * self.num_vertices + v] = weight
+            self._registrar_mutacao()
+
+    def _linha_bits(self, u):
+        return self.bits[u * self._bytes_linha:(u + 1) * self._bytes_linha]
+
+    def get_vertex_out_degree(self, u):
+        if 0 <= u < self.num_vertices:
+            return int.from_bytes(self._linha_bits(u), 'big').bit_count()
+        return 0
+
+    def get_vertex_in_degree(self, u):
+        if 0 <= u < self.num_vertices:
+            mascara = 0x80 >> (u & 7)
+            if np is not None:
+                return int(np.count_nonzero(self._bits_np[:, u >> 3] & mascara))
+            # Coluna de bytes por fatia com passo; translate marca os que têm o bit
+            coluna = self.bits[u >> 3::self._bytes_linha]
+            return coluna.translate(_TABELAS_BIT[u & 7]).count(1)
+        return 0
+
+    def get_successors(self, u):
+        if not 0 <= u < self.num_vertices:
+            return []
+        n = self.num_vertices
+        if np is not None:
+            destinos = np.flatnonzero(np.unpackbits(self._bits_np[u], count=n))
+            return list(zip(destinos.tolist(), self._pesos_np[u, destinos].tolist()))
+        base = u * n
+        sucessores = []
+        for i, byte in enumerate(self._linha_bits(u)):
+            if byte:
+                for k in range(8):
+                    if byte & (0x80 >> k):
+                        v = (i << 3) | k
+                        sucessores.append((v, self.pesos[base + v]))
+        return sucessores
+
+    def get_predecessors(self, u):
+        if not 0 <= u < self.num_vertices:
+            return []
+        mascara = 0x80 >> (u & 7)
+        if np is not None:
+            origens = np.flatnonzero(self._bits_np[:, u >> 3] & mascara)
+            return list(zip(origens.tolist(), self._pesos_np[origens, u].tolist()))
+        n = self.num_vertices
+        coluna = self.bits[u >> 3::self._bytes_linha]
+        return [(r, self.pesos[r * n + u]) for r, byte in enumerate(coluna) if byte & mascara]
+
+    def graus(self):
+        """(graus_saida, graus_entrada) de todos os vértices; vetorizado com NumPy."""
+        n = self.num_vertices
+        if np is None:
+            return ([self.get_vertex_out_degree(u) for u in range(n)],
+                    [self.get_vertex_in_degree(u) for u in range(n)])
+        saida = _POPCOUNT_BYTE[self._bits_np].sum(axis=1, dtype=np.int64)
+        entrada = np.zeros(n, dtype=np.int64)
+        instrumentacao = self.instrumentacao
+        # Soma das linhas desempacotadas em blocos, para não materializar n x n
+        for inicio in range(0, n, LINHAS_POR_BLOCO_MATRIZ):
+            if instrumentacao is not None:
+                instrumentacao.progresso('graus', inicio, n, forcar=True)
+            bloco = np.unpackbits(self._bits_np[inicio:inicio + LINHAS_POR_BLOCO_MATRIZ], axis=1, count=n)
+            entrada += bloco.sum(axis=0, dtype=np.int64)
+        if instrumentacao is not None:
+            instrumentacao.progresso('graus', n, n)
+        return saida.tolist(), entrada.tolist()
+
+    @memorizar_metrica
+    def calcular_gmce(self):
+        # Σ_u Σ_{v ∈ suc(u)} grau_saida(v) = Σ_v grau_entrada(v) · grau_saida(v)
+        n = self.num_vertices
+        if n == 0:
+            return 0.0
+        saida, entrada = self.graus()
+        return sum(s * e for s, e in zip(saida, entrada)) / n
+
+    def is_connected(self):
+        # Conectividade fraca por expansão de fronteira booleana
+        n = self.num_vertices
+        if n == 0: return True
+        if np is None:
+            visitados = [False] * n
+            visitados[0] = True
+            fila = deque([0])
+            contagem = 0
+            while fila:
+                u = fila.popleft()
+                contagem += 1
+                for vizinhos in (self.get_successors(u), self.get_predecessors(u)):
+                    for v, _ in vizinhos:
+                        if not visitados[v]:
+                            visitados[v] = True
+                            fila.append(v)
+            return contagem == n
+
+        visitados = np.zeros(n, dtype=bool)
+        fronteira = np.zeros(n, dtype=bool)
+        visitados[0] = fronteira[0] = True
+        while fronteira.any():
+            atuais = np.flatnonzero(fronteira)
+            # Saída: OR só das linhas da fronteira
+            saida = np.unpackbits(np.bitwise_or.reduce(self._bits_np[atuais], axis=0), count=n).astype(bool)
+            # Entrada: só as colunas de bytes que contêm vértices da fronteira
+            colunas, grupo = np.unique(atuais >> 3, return_inverse=True)
+            mascaras = np.zeros(len(colunas), dtype=np.uint8)
+            np.bitwise_or.at(mascaras, grupo, (0x80 >> (atuais & 7)).astype(np.uint8))
+            entrada = (self._bits_np[:, colunas] & mascaras).any(axis=1)
+            fronteira = (saida | entrada) & ~visitados
+            visitados |= fronteira
+        return bool(visitados.all())
+
+
+# ------------------------------------------------------------------
+# IMPLEMENTAÇÃO 2: LISTA DE ADJACÊNCIA (A PRINCIPAL)
+# ------------------------------------------------------------------
+class AdjacencyListGraph(AbstractGraph):
+    def __init__(self, num_vertices):
+        super().__init__(num_vertices)
+        self.adj_list = [[] for _ in range(num_vertices)]
+        # Índice reverso: pred_list[v] guarda [u, peso] de cada aresta u -> v
+        self.pred_list = [[] for _ in range(num_vertices)]
+        self.in_degree = [0] * num_vertices
+        # Índices hash vizinho -> posição, para buscas O(1) esperado:
+        # _pos_saida[u][v] indexa adj_list[u] e _pos_entrada[v][u] indexa pred_list[v]
+        self._pos_saida = [{} for _ in range(num_vertices)]
+        self._pos_entrada = [{} for _ in range(num_vertices)]
+        self._edge_count = 0
+
+    @staticmethod
+    def _remover_posicao(lista, posicoes, chave):
+        """
+        Remove lista[posicoes[chave]] em O(1): o último elemento ocupa a vaga.
+        A ordem resultante continua determinística (depende só da sequência de operações).
+        """
+        i = posicoes.pop(chave)
+        ultimo = lista.pop()
+        if i < len(lista):
+            lista[i] = ultimo
+            posicoes[ultimo[0]] = i
+
+    def _aresta(self, u, v):
+        """Registro [v, peso] de u -> v em adj_list[u], ou None."""
+        if 0 <= u < self.num_vertices:
+            i = self._pos_saida[u].get(v)
+            if i is not None:
+                return self.adj_list[u][i]
+        return None
+
+    def add_edge(self, u, v, weight=1.0):
+        if u == v: return
+        if 0 <= u < self.num_vertices and 0 <= v < self.num_vertices:
+            self._registrar_mutacao()
+            edge = self._aresta(u, v)
+            if edge is not None:
+                edge[1] = weight
+                self.pred_list[v][self._pos_entrada[v][u]][1] = weight
+                return
+            self._pos_saida[u][v] = len(self.adj_list[u])
+            self.adj_list[u].append([v, weight])
+            self._pos_entrada[v][u] = len(self.pred_list[v])
+            self.pred_list[v].append([u, weight])
+            self.in_degree[v] += 1
+            self._edge_count += 1
+
+    def remove_edge(self, u, v):
+        if self._aresta(u, v) is not None:
+            self._registrar_mutacao()
+            self._remover_posicao(self.adj_list[u], self._pos_saida[u], v)
+            self._remover_posicao(self.pred_list[v], self._pos_entrada[v], u)
+            self.in_degree[v] -= 1
+            self._edge_count -= 1
+
+    def has_edge(self, u, v):
+        return self._aresta(u, v) is not None
+
+    def get_edge_count(self):
+        return self._edge_count
+
+    def get_edge_weight(self, u, v):
+        edge = self._aresta(u, v)
+        if edge is not None:
+            return edge[1]
+        return 0.0
+
+    def set_edge_weight(self, u, v, weight):
+        edge = self._aresta(u, v)
+        if edge is not None:
+            self._registrar_mutacao()
+            edge[1] = weight
+            self.pred_list[v][self._pos_entrada[v][u]][1] = weight
+
+    def get_vertex_out_degree(self, u):
+        if 0 <= u < self.num_vertices:
+            return len(self.adj_list[u])
+        return 0
+
+    def get_successors(self, u):
+        if 0 <= u < self.num_vertices:
+            return self.adj_list[u]
+        return []
+
+    def get_predecessors(self, u):
+        if 0 <= u < self.num_vertices:
+            return self.pred_list[u]
+        return []
+
+    def get_vertex_in_degree(self, u):
+        if 0 <= u < self.num_vertices:
+            return self.in_degree[u]
+        return 0
+
+    def is_connected(self):
+        # Conectividade fraca: BFS ignorando o sentido das arestas, O(V + E)
+        if self.num_vertices == 0: return True
+        visited = [False] * self.num_vertices
+        queue = deque([0])
+        visited[0] = True
+        count_visited = 0
+        while queue:
+            curr = queue.popleft()
+            count_visited += 1
+            for vizinhos in (self.adj_list[curr], self.pred_list[curr]):
+                for edge in vizinhos:
+                    v = edge[0]
+                    if not visited[v]:
+                        visited[v] = True
+                        queue.append(v)
+        return count_visited == self.num_vertices
+
+
+# ------------------------------------------------------------------
+# IMPLEMENTAÇÃO 3: CSR (COMPRESSED SPARSE ROW) - SOMENTE LEITURA
+# ------------------------------------------------------------------
+class CSRGraph(AbstractGraph):
+    """
+    Grafo imutável em formato CSR. As arestas de saída de u ocupam o
+    intervalo offsets[u]:offsets[u+1] dos buffers contíguos targets
+    (destinos, ordenados) e weights (pesos).
+
+    Não aceita inserção/remoção de arestas: construa a partir de um
+    grafo existente (from_graph) ou de uma lista de arestas (from_edges).
+    """
+    def __init__(self, num_vertices, offsets, targets, weights):
+        super().__init__(num_vertices)
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        # Índice reverso (arestas de entrada), montado sob demanda
+        self._rev_offsets = None
+        self._rev_sources = None
+        self._rev_weights = None
+
+    @classmethod
+    def from_graph(cls, grafo):
+        """Converte qualquer AbstractGraph (ex.: AdjacencyListGraph) para CSR."""
+        n = grafo.get_vertex_count()
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array('d')
+        for u in range(n):
+            for v, w in sorted(grafo.get_successors(u)):
+                targets.append(v)
+                weights.append(w)
+            offsets.append(len(targets))
+        csr = cls(n, offsets, targets, weights)
+        csr.vertex_labels = list(grafo.vertex_labels)
+        csr.vertex_weights = list(grafo.vertex_weights)
+        return csr
+
+    @classmethod
+    def from_edges(cls, num_vertices, arestas, labels=None):
+        """
+        Monta o CSR direto de um iterável de (u, v, peso).
+        Segue a semântica de add_edge: laços e vértices inválidos são
+        ignorados e, em arestas repetidas, o último peso prevalece.
+        """
+        unicas = {}
+        for u, v, w in arestas:
+            if u != v and 0 <= u < num_vertices and 0 <= v < num_vertices:
+                unicas[(u, v)] = w
+
+        contagem = [0] * (num_vertices + 1)
+        for u, _ in unicas:
+            contagem[u + 1] += 1
+        for i in range(num_vertices):
+            contagem[i + 1] += contagem[i]
+
+        targets = array('i')
+        weights = array('d')
+        for (u, v) in sorted(unicas):
+            targets.append(v)
+            weights.append(unicas[(u, v)])
+
+        csr = cls(num_vertices, array('q', contagem), targets, weights)
+        if labels is not None:
+            csr.vertex_labels = list(labels)
+        return csr
+
+    def _congelado(self, *args, **kwargs):
+        raise TypeError("CSRGraph é imutável: converta para AdjacencyListGraph para editar arestas.")
+
+    add_edge = _congelado
+    remove_edge = _congelado
+    set_edge_weight = _congelado
+
+    def _posicao(self, u, v):
+        """Índice da aresta u -> v nos buffers, ou -1 se não existir."""
+        if 0 <= u < self.num_vertices:
+            inicio, fim = self.offsets[u], self.offsets[u + 1]
+            i = bisect_left(self.targets, v, inicio, fim)
+            if i < fim and self.targets[i] == v:
+                return i
+        return -1
+
+    def has_edge(self, u, v):
+        return self._posicao(u, v) >= 0
+
+    def get_edge_count(self):
+        return len(self.targets)
+
+    def get_edge_weight(self, u, v):
+        i = self._posicao(u, v)
+        return self.weights[i] if i >= 0 else 0.0
+
+    def get_vertex_out_degree(self, u):
+        if 0 <= u < self.num_vertices:
+            return self.offsets[u + 1] - self.offsets[u]
+        return 0
+
+    def get_successors(self, u):
+        if 0 <= u < self.num_vertices:
+            inicio, fim = self.offsets[u], self.offsets[u + 1]
+            if inicio != fim:
+                return zip(self.targets[inicio:fim], self.weights[inicio:fim])
+        return ()
+
+    def _construir_reverso(self):
+        """Monta (uma única vez) o CSR transposto: origens agrupadas por destino."""
+        if self._rev_offsets is not None:
+            return
+        n = self.num_vertices
+        rev_offsets = array('q', [0] * (n + 1))
+        for v in self.targets:
+            rev_offsets[v + 1] += 1
+        for i in range(n):
+            rev_offsets[i + 1] += rev_offsets[i]
+
+        proximo = array('q', rev_offsets)
+        rev_sources = array('i', [0] * len(self.targets))
+        rev_weights = array('d', [0.0] * len(self.targets))
+        for u in range(n):
+            for j in range(self.offsets[u], self.offsets[u + 1]):
+                v = self.targets[j]
+                rev_sources[proximo[v]] = u
+                rev_weights[proximo[v]] = self.weights[j]
+                proximo[v] += 1
+
+        self._rev_offsets = rev_offsets
+        self._rev_sources = rev_sources
+        self._rev_weights = rev_weights
+
+    def get_predecessors(self, u):
+        if 0 <= u < self.num_vertices:
+            self._construir_reverso()
+            inicio, fim = self._rev_offsets[u], self._rev_offsets[u + 1]
+            if inicio != fim:
+                return zip(self._rev_sources[inicio:fim], self._rev_weights[inicio:fim])
+        return ()
+
+    def get_vertex_in_degree(self, u):
+        if 0 <= u < self.num_vertices:
+            self._construir_reverso()
+            return self._rev_offsets[u + 1] - self._rev_offsets[u]
+        return 0
+
+    def is_connected(self):
+        if self.num_vertices == 0: return True
+        self._construir_reverso()
+        visited = [False] * self.num_vertices
+        queue = deque([0])
+        visited[0] = True
+        count_visited = 0
+        while queue:
+            u = queue.popleft()
+            count_visited += 1
+            for vizinhos in (self.targets[self.offsets[u]:self.offsets[u + 1]],
+                             self._rev_sources[self._rev_offsets[u]:self._rev_offsets[u + 1]]):
+                for v in vizinhos:
+                    if not visited[v]:
+                        visited[v] = True
+                        queue.append(v)
+        return count_visited == self.num_vertices
+
+    # --- Versões das métricas que leem os buffers diretamente ---
+    def _arestas_numpy(self):
+        offsets = np.frombuffer(self.offsets, dtype=np.int64)
+        origens = np.repeat(np.arange(self.num_vertices, dtype=np.int64), np.diff(offsets))
+        destinos = np.frombuffer(self.targets, dtype=np.int32).astype(np.int64)
+        return origens, destinos, np.frombuffer(self.weights, dtype=np.float64)
+
+    @memorizar_metrica
+    def calcular_gmce(self):
+        n = self.num_vertices
+        if n == 0:
+            return 0.0
+
+        offsets, targets = self.offsets, self.targets
+        graus = [offsets[i + 1] - offsets[i] for i in range(n)]
+
+        soma_total_metricas = 0.0
+        instrumentacao = self.instrumentacao
+        for u in range(n):
+            if instrumentacao is not None and u % VERTICES_POR_PROGRESSO == 0:
+                instrumentacao.progresso('calcular_gmce', u, n, forcar=True)
+            grau_u = graus[u]
+            if grau_u == 0:
+                continue
+            soma_graus_vizinhos = 0.0
+            for v in targets[offsets[u]:offsets[u + 1]]:
+                soma_graus_vizinhos += graus[v]
+            soma_total_metricas += grau_u * (soma_graus_vizinhos / grau_u)
+        if instrumentacao is not None:
+            instrumentacao.progresso('calcular_gmce', n, n)
+
+        return soma_total_metricas / n
+
+    def _dijkstra(self, start_node, reverso=False):
+        if reverso:
+            self._construir_reverso()
+            offsets, targets, weights = self._rev_offsets, self._rev_sources, self._rev_weights
+        else:
+            offsets, targets, weights = self.offsets, self.targets, self.weights
+        distancias = [float('inf')] * self.num_vertices
+        distancias[start_node] = 0
+
+        pq = [(0, start_node)]
+        insercoes = 1
+        relaxacoes = 0
+        while pq:
+            dist_atual, u = heapq.heappop(pq)
+            if dist_atual > distancias[u]:
+                continue
+
+            relaxacoes += offsets[u + 1] - offsets[u]
+            for j in range(offsets[u], offsets[u + 1]):
+                v = targets[j]
+                nova_dist = dist_atual + weights[j]
+                if nova_dist < distancias[v]:
+                    distancias[v] = nova_dist
+                    heapq.heappush(pq, (nova_dist, v))
+                    insercoes += 1
+
+        if self.instrumentacao is not None:
+            self.instrumentacao.combinar({'dijkstra.execucoes': 1, 'dijkstra.relaxacoes': relaxacoes,
+                                          'dijkstra.insercoes_heap': insercoes})
+        return distancias
+
+    def _brandes_origem(self, origem, centralidade):
+        # Mesmo algoritmo da classe base, lendo offsets/targets/weights direto
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        n = self.num_vertices
+        distancias = [float('inf')] * n
+        caminhos = [0.0] * n
+        predecessores = [[] for _ in range(n)]
+        fechado = [False] * n
+        distancias[origem] = 0
+        caminhos[origem] = 1.0
+        ordem = []
+
+        pq = [(0, origem)]
+        while pq:
+            dist_atual, u = heapq.heappop(pq)
+            if fechado[u] or dist_atual > distancias[u]:
+                continue
+            fechado[u] = True
+            ordem.append(u)
+            for j in range(offsets[u], offsets[u + 1]):
+                v = targets[j]
+                nova_dist = dist_atual + weights[j]
+                if nova_dist < distancias[v]:
+                    distancias[v] = nova_dist
+                    caminhos[v] = caminhos[u]
+                    predecessores[v] = [u]
+                    heapq.heappush(pq, (nova_dist, v))
+                elif nova_dist == distancias[v] and not fechado[v]:
+                    caminhos[v] += caminhos[u]
+                    predecessores[v].append(u)
+
+        _acumular_dependencias(origem, ordem, caminhos, predecessores, centralidade)
+
+
+# ------------------------------------------------------------------
+# DETECÇÃO DE COMUNIDADES (LOUVAIN E PROPAGAÇÃO DE RÓTULOS)
+# ------------------------------------------------------------------
+# As comunidades são buscadas na versão não direcionada do grafo, com
+# A = W + Wᵀ (só pesos positivos), guardada em arrays no formato CSR.
+def _adjacencia_simetrica(grafo):
+    """Retorna (offsets, vizinhos, pesos) da adjacência simétrica, em arrays compactos."""
+    n = grafo.get_vertex_count()
+    inicio = [0] * (n + 1)
+    for u in range(n):
+        for v, w in grafo.get_successors(u):
+            if w > 0:
+                inicio[u + 1] += 1
+                inicio[v + 1] += 1
+    for i in range(n):
+        inicio[i + 1] += inicio[i]
+
+    total = inicio[n]
+    vizinhos = array('i', bytes(4 * total))
+    pesos = array('d', bytes(8 * total))
+    posicao = inicio[:n]
+    for u in range(n):
+        for v, w in grafo.get_successors(u):
+            if w > 0:
+                p = posicao[u]
+                vizinhos[p], pesos[p] = v, w
+                posicao[u] = p + 1
+                p = posicao[v]
+                vizinhos[p], pesos[p] = u, w
+                posicao[v] = p + 1
+    return array('q', inicio), vizinhos, pesos
+
+
+def _modularidade(offsets, vizinhos, pesos, comunidades, resolucao=1.0):
+    """Q = Σ_c [ interno_c / 2m − resolucao · (grau_c / 2m)² ] na adjacência simétrica."""
+    n = len(offsets) - 1
+    k = max(comunidades, default=-1) + 1
+    interno = [0.0] * k
+    grau = [0.0] * k
+    for u in range(n):
+        c = comunidades[u]
+        for p in range(offsets[u], offsets[u + 1]):
+            grau[c] += pesos[p]
+            if comunidades[vizinhos[p]] == c:
+                interno[c] += pesos[p]
+    m2 = sum(grau)
+    if m2 == 0:
+        return 0.0
+    return sum(interno[c] / m2 - resolucao * (grau[c] / m2) ** 2 for c in range(k))
+
+
+def _louvain_mover(offsets, vizinhos, pesos, laco, resolucao, ordem, instrumentacao, max_varreduras=100):
+    """
+    Fase local do Louvain: cada vértice vai para a comunidade vizinha de maior
+    ganho de modularidade, em varreduras até nenhum mudar. Os pesos por
+    comunidade vizinha ficam em um array com lista das posições tocadas (sem
+    dict por passo). laco[i] é o peso interno já agregado em i.
+    Retorna (comunidade de cada vértice, movimentos).
+    """
+    n = len(offsets) - 1
+    grau = [laco[i] + sum(pesos[offsets[i]:offsets[i + 1]]) for i in range(n)]
+    m2 = sum(grau)
+    comunidade = list(range(n))
+    if m2 == 0:
+        return comunidade, 0
+    total = grau[:]                 # soma dos graus de cada comunidade
+    peso_para = [0.0] * n           # peso de i para cada comunidade vizinha
+    tocadas = []
+    escala = resolucao / m2
+    movimentos = 0
+
+    for varredura in range(1, max_varreduras + 1):
+        if instrumentacao is not None:
+            instrumentacao.progresso('louvain', varredura, max_varreduras)
+        mudaram = 0
+        for i in ordem:
+            for p in range(offsets[i], offsets[i + 1]):
+                d = comunidade[vizinhos[p]]
+                if peso_para[d] == 0.0:
+                    tocadas.append(d)
+                peso_para[d] += pesos[p]
+
+            atual = comunidade[i]
+            k = grau[i]
+            total[atual] -= k
+            melhor = atual
+            melhor_ganho = peso_para[atual] - total[atual] * k * escala
+            for d in tocadas:
+                ganho = peso_para[d] - total[d] * k * escala
+                if ganho > melhor_ganho + 1e-12:
+                    melhor, melhor_ganho = d, ganho
+            total[melhor] += k
+
+            for d in tocadas:
+                peso_para[d] = 0.0
+            tocadas.clear()
+            if melhor != atual:
+                comunidade[i] = melhor
+                mudaram += 1
+        movimentos += mudaram
+        if mudaram == 0:
+            break
+    return comunidade, movimentos
+
+
+def _agregar_comunidades(offsets, vizinhos, pesos, laco, ids, k):
+    """Grafo das comunidades: um vértice por comunidade, arestas internas viram laço."""
+    novo_laco = [0.0] * k
+    linhas = [{} for _ in range(k)]
+    for i in range(len(offsets) - 1):
+        ci = ids[i]
+        novo_laco[ci] += laco[i]
+        linha = linhas[ci]
+        for p in range(offsets[i], offsets[i + 1]):
+            cj = ids[vizinhos[p]]
+            if cj == ci:
+                novo_laco[ci] += pesos[p]
+            else:
+                linha[cj] = linha.get(cj, 0.0) + pesos[p]
+
+    novos_offsets = array('q', [0])
+    novos_vizinhos = array('i')
+    novos_pesos = array('d')
+    for linha in linhas:
+        novos_vizinhos.extend(linha.keys())
+        novos_pesos.extend(linha.values())
+        novos_offsets.append(len(novos_vizinhos))
+    return novos_offsets, novos_vizinhos, novos_pesos, novo_laco
+
+
+# ------------------------------------------------------------------
+# ITERAÇÃO DE POTÊNCIA EM LOTE (NUMPY): PAGERANK, HITS E KATZ
+# ------------------------------------------------------------------
+class OperadorEsparso:
+    """
+    Propagação ao longo das arestas: Y[v] = soma, sobre u -> v, de valor(u, v) * X[u].
+    X pode ser uma matriz n x k; as k colunas avançam em uma única varredura
+    (arestas ordenadas por destino + np.add.reduceat).
+    """
+    def __init__(self, n, origens, destinos, valores):
+        ordem = np.argsort(destinos, kind='stable')
+        self.n = n
+        self.origens = origens[ordem]
+        self.destinos = destinos[ordem]
+        self.valores = valores[ordem]
+        if len(self.destinos):
+            self.inicios = np.flatnonzero(np.r_[True, self.destinos[1:] != self.destinos[:-1]])
+        else:
+            self.inicios = np.zeros(0, dtype=np.int64)
+
+    def transposto(self):
+        """Operador no sentido inverso: Y[u] = soma, sobre u -> v, de valor(u, v) * X[v]."""
+        return OperadorEsparso(self.n, self.destinos, self.origens, self.valores)
+
+    def aplicar(self, X):
+        Y = np.zeros((self.n,) + X.shape[1:])
+        if len(self.inicios):
+            contribuicoes = X[self.origens] * self.valores.reshape((-1,) + (1,) * (X.ndim - 1))
+            Y[self.destinos[self.inicios]] = np.add.reduceat(contribuicoes, self.inicios, axis=0)
+        return Y
+
+
+def iteracao_de_potencia(passo, X0, max_iter=100, tol=1e-6, ao_iterar=None):
+    """
+    Núcleo comum dos rankings espectrais. Avança todas as colunas de X0 (n x k)
+    com X[:, ativas] = passo(X[:, ativas], ativas) até cada coluna convergir
+    (diferença L1 < tol). Colunas convergidas saem do lote e deixam de custar
+    trabalho. ao_iterar(iteração), se dado, é chamado a cada iteração.
+    Retorna (X, iterações de cada coluna, se cada coluna convergiu).
+    """
+    X = np.array(X0, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[:, None]
+    ativas = np.arange(X.shape[1])
+    iteracoes = np.zeros(X.shape[1], dtype=np.int64)
+
+    for iteracao in range(1, max_iter + 1):
+        if ativas.size == 0:
+            break
+        if ao_iterar is not None:
+            ao_iterar(iteracao)
+        novo = passo(X[:, ativas], ativas)
+        diff = np.abs(novo - X[:, ativas]).sum(axis=0)
+        X[:, ativas] = novo
+        iteracoes[ativas] += 1
+        ativas = ativas[~(diff < tol)]  # NaN (divergência) continua ativo
+
+    convergiu = np.ones(X.shape[1], dtype=bool)
+    convergiu[ativas] = False
+    return X, iteracoes, convergiu
+
+
+class MotorPageRank:
+    """
+    Matriz de transição esparsa, normalizada por linha (w / soma dos pesos de
+    saída, só pesos positivos), montada uma vez a partir de qualquer grafo.
+    Vários fatores de amortecimento avançam juntos no mesmo lote.
+    Reaproveite o mesmo motor para várias chamadas no mesmo grafo.
+    """
+    def __init__(self, grafo):
+        if np is None:
+            raise RuntimeError("O motor de PageRank vetorizado requer NumPy instalado.")
+        self.n = grafo.get_vertex_count()
+        self.grafo = grafo
+        origens, destinos, pesos = grafo._arestas_numpy()
+        positivas = pesos > 0
+        origens, destinos, pesos = origens[positivas], destinos[positivas], pesos[positivas]
+
+        soma_saida = np.bincount(origens, weights=pesos, minlength=self.n)
+        self.transicao = OperadorEsparso(self.n, origens, destinos, pesos / soma_saida[origens])
+        self.pendurados = soma_saida == 0.0
+
+    def _distribuicao(self, valores):
+        """Normaliza um dict {vértice: peso} ou sequência para um vetor que soma 1."""
+        if valores is None:
+            return np.full(self.n, 1.0 / self.n)
+        if isinstance(valores, dict):
+            vetor = np.zeros(self.n)
+            for v, peso in valores.items():
+                vetor[v] = peso
+        else:
+            vetor = np.array(valores, dtype=np.float64)
+            if vetor.shape != (self.n,):
+                raise ValueError(f"Vetor com {vetor.shape[0]} posições; esperado {self.n}.")
+        total = vetor.sum()
+        if total <= 0:
+            raise ValueError("A distribuição precisa ter soma positiva.")
+        return vetor / total
+
+    def calcular_lote(self, dampings, max_iter=100, tol=1e-6, personalizacao=None, rank_inicial=None):
+        """Retorna matriz n x len(dampings), uma coluna de PageRank por fator."""
+        dampings = np.asarray(dampings, dtype=np.float64)
+        if self.n == 0:
+            return np.zeros((0, len(dampings)))
+        teleporte = self._distribuicao(personalizacao)[:, None]
+        inicial = self._distribuicao(rank_inicial) if rank_inicial is not None else np.full(self.n, 1.0 / self.n)
+
+        def passo(R, ativas):
+            d = dampings[ativas]
+            massa_pendurada = R[self.pendurados].sum(axis=0)
+            return (1.0 - d) * teleporte + d * massa_pendurada * teleporte + d * self.transicao.aplicar(R)
+
+        X0 = np.repeat(inicial[:, None], len(dampings), axis=1)
+        R, iteracoes, _ = iteracao_de_potencia(passo, X0, max_iter, tol,
+                                               self.grafo._ao_iterar('pagerank_vetorizado', max_iter))
+        if self.grafo.instrumentacao is not None:
+            self.grafo.instrumentacao.contar('pagerank.iteracoes', int(iteracoes.max()))
+        somas = R.sum(axis=0)
+        return np.divide(R, somas, out=R, where=somas > 0)
+
+    def calcular(self, damping=0.85, max_iter=100, tol=1e-6, personalizacao=None, rank_inicial=None):
+        return self.calcular_lote([damping], max_iter, tol, personalizacao, rank_inicial)[:, 0]
+
+
+# ------------------------------------------------------------------
+# MÉTRICAS INCREMENTAIS (ATUALIZAÇÃO EM FLUXO)
+# ------------------------------------------------------------------
+class MetricasIncrementais:
+    """
+    Mantém densidade, reciprocidade, GMCE e PageRank de um grafo mutável
+    enquanto arestas chegam ou saem, sem recalcular do zero. Edite o grafo
+    por add_edge/remove_edge/set_edge_weight desta classe:
+
+    - graus, forças e pares recíprocos: O(1) por alteração;
+    - GMCE: acumulador S = Σ_v grau_entrada(v) · grau_saida(v); ao inserir
+      u -> v, S cresce grau_saida(v) + grau_entrada(u);
+    - PageRank: push local (Gauss-Southwell) com partida a quente. Mantém-se
+      y = (1-d)/n + d·Pᵀy, em que vértices pendurados apenas absorvem massa;
+      como teleporte e redistribuição pendurada são uniformes, y/Σy é o mesmo
+      PageRank de calcular_pagerank. Uma alteração em u muda a linha u de P
+      e corrige o resíduo só nos sucessores de u (O(grau)); o push a partir
+      deles é adiado até a próxima leitura, então rajadas de alterações
+      compartilham uma única propagação.
+
+    rank_inicial (PageRank já calculado) evita a carga inicial; sem ele, usa
+    o PageRank do próprio grafo, como top_pagerank.
+    """
+    def __init__(self, grafo, damping=0.85, tol=1e-6, rank_inicial=None):
+        self.grafo = grafo
+        self.damping = damping
+        n = self.num_vertices = grafo.get_vertex_count()
+        # Resíduo máximo por vértice: erro L1 total abaixo de tol / (1 - d)
+        self.limiar = tol / n if n else tol
+        self.graus_saida = [0] * n
+        self.graus_entrada = [0] * n
+        self.forca_saida = [0.0] * n
+        self.forca_entrada = [0.0] * n
+        self._saida_positiva = [0.0] * n
+        self.num_arestas = 0
+        self.soma_gmce = 0
+        self.pares_com_interacao = 0
+        self.pares_reciprocos = 0
+
+        for u in range(n):
+            for v, w in grafo.get_successors(u):
+                self.num_arestas += 1
+                self._contar_aresta(u, v, w, 1)
+                if u < v and grafo.has_edge(v, u):
+                    self.pares_reciprocos += 1
+        self.pares_com_interacao = self.num_arestas - self.pares_reciprocos
+        self.soma_gmce = sum(e * s for e, s in zip(self.graus_entrada, self.graus_saida))
+
+        self._linhas = [None] * n
+        self._pendentes = set()
+        self._iniciar_pagerank(rank_inicial, tol)
+
+    def _contar_aresta(self, u, v, w, sinal):
+        self.graus_saida[u] += sinal
+        self.graus_entrada[v] += sinal
+        self.forca_saida[u] += sinal * w
+        self.forca_entrada[v] += sinal * w
+        if w > 0:
+            self._saida_positiva[u] += sinal * w
+
+    def _iniciar_pagerank(self, rank, tol):
+        n, d = self.num_vertices, self.damping
+        if n == 0:
+            self.estimativa, self.residuo = [], []
+            return
+        if rank is None:
+            if np is not None and self.num_arestas >= LIMIAR_PAGERANK_VETORIZADO:
+                rank = self.grafo.calcular_pagerank_vetorizado(damping=d, tol=tol)
+            else:
+                rank = self.grafo.calcular_pagerank(damping=d, tol=tol)
+        # y = x · (1-d) / ((1-d) + d · massa pendurada de x)
+        pendurada = sum(x for x, soma in zip(rank, self._saida_positiva) if soma <= 0)
+        escala = (1.0 - d) / ((1.0 - d) + d * pendurada)
+        self.estimativa = [float(x) * escala for x in rank]
+        # Resíduo exato da estimativa: r = (1-d)/n - y + d·Pᵀy
+        self.residuo = [(1.0 - d) / n - y for y in self.estimativa]
+        for u in range(n):
+            fator = d * self.estimativa[u]
+            for v, p in self._transicoes(u):
+                self.residuo[v] += fator * p
+        self._empurrar(range(n))
+
+    def _transicoes(self, u):
+        """Linha u de P: [(v, probabilidade)], só pesos positivos (em cache)."""
+        linha = self._linhas[u]
+        if linha is None:
+            soma = self._saida_positiva[u]
+            linha = [] if soma <= 0 else [(v, w / soma) for v, w in self.grafo.get_successors(u) if w > 0]
+            self._linhas[u] = linha
+        return linha
+
+    def _alterar(self, u, mutacao):
+        """Aplica mutacao() (que muda só a linha u) e corrige o resíduo do PageRank."""
+        antes = self._transicoes(u)
+        mutacao()
+        self._linhas[u] = None
+        depois = self._transicoes(u)
+        # r = (1-d)/n - y + d·Pᵀy  =>  Δr = d · y[u] · (P'[u, :] - P[u, :])
+        fator = self.damping * self.estimativa[u]
+        if fator:
+            for linha, sinal in ((antes, -fator), (depois, fator)):
+                for v, p in linha:
+                    self.residuo[v] += sinal * p
+                    self._pendentes.add(v)
+
+    def _empurrar(self, candidatos):
+        limiar = self.limiar
+        residuo, estimativa, damping = self.residuo, self.estimativa, self.damping
+        fila = deque(v for v in candidatos if abs(residuo[v]) > limiar)
+        na_fila = set(fila)
+        empurroes = 0
+        while fila:
+            u = fila.popleft()
+            na_fila.discard(u)
+            delta = residuo[u]
+            residuo[u] = 0.0
+            estimativa[u] += delta
+            empurroes += 1
+            for v, p in self._transicoes(u):
+                residuo[v] += damping * delta * p
+                if abs(residuo[v]) > limiar and v not in na_fila:
+                    na_fila.add(v)
+                    fila.append(v)
+        if self.grafo.instrumentacao is not None:
+            self.grafo.instrumentacao.contar('pagerank.empurroes', empurroes)
+
+    def add_edge(self, u, v, weight=1.0):
+        """Insere u -> v (ou atualiza o peso, se já existir), como grafo.add_edge."""
+        if u == v or not (0 <= u < self.num_vertices and 0 <= v < self.num_vertices):
+            return
+        if self.grafo.has_edge(u, v):
+            self.set_edge_weight(u, v, weight)
+            return
+        # ΔS com os graus antes da inserção (u != v: fatores independentes)
+        self.soma_gmce += self.graus_saida[v] + self.graus_entrada[u]
+        if self.grafo.has_edge(v, u):
+            self.pares_reciprocos += 1
+        else:
+            self.pares_com_interacao += 1
+        self.num_arestas += 1
+
+        def mutacao():
+            self.grafo.add_edge(u, v, weight)
+            self._contar_aresta(u, v, self.grafo.get_edge_weight(u, v), 1)
+        self._alterar(u, mutacao)
+
+    def remove_edge(self, u, v):
+        if not self.grafo.has_edge(u, v):
+            return
+        if self.grafo.has_edge(v, u):
+            self.pares_reciprocos -= 1
+        else:
+            self.pares_com_interacao -= 1
+        self.num_arestas -= 1
+
+        def mutacao():
+            self._contar_aresta(u, v, self.grafo.get_edge_weight(u, v), -1)
+            self.grafo.remove_edge(u, v)
+        self._alterar(u, mutacao)
+        # ΔS com os graus já decrementados
+        self.soma_gmce -= self.graus_saida[v] + self.graus_entrada[u]
+
+    def set_edge_weight(self, u, v, weight):
+        if not self.grafo.has_edge(u, v):
+            return
+
+        def mutacao():
+            self._contar_aresta(u, v, self.grafo.get_edge_weight(u, v), -1)
+            self.grafo.set_edge_weight(u, v, weight)
+            self._contar_aresta(u, v, self.grafo.get_edge_weight(u, v), 1)
+        self._alterar(u, mutacao)
+
+    def calcular_densidade(self):
+        n = self.num_vertices
+        return self.num_arestas / (n * (n - 1)) if n > 1 else 0.0
+
+    def calcular_reciprocidade(self):
+        return self.pares_reciprocos / self.pares_com_interacao if self.pares_com_interacao else 0.0
+
+    def calcular_gmce(self):
+        return self.soma_gmce / self.num_vertices if self.num_vertices else 0.0
+
+    def calcular_pagerank(self):
+        """PageRank atual; antes, empurra os resíduos acumulados desde a última leitura."""
+        if self._pendentes:
+            pendentes, self._pendentes = self._pendentes, set()
+            self._empurrar(pendentes)
+        total = sum(self.estimativa)
+        return [y / total for y in self.estimativa] if total > 0 else list(self.estimativa)
+
+    def top_pagerank(self, k=10):
+        pr = self.calcular_pagerank()
+        rotulos = self.grafo.vertex_labels
+        pares = [(i, rotulos[i] if i < len(rotulos) else str(i), val) for i, val in enumerate(pr)]
+        pares.sort(key=lambda x: x[2], reverse=True)
+        return pares[:k]
+
+
+# ------------------------------------------------------------------
+# SNAPSHOT BINÁRIO (CSR) - CACHE DE INICIALIZAÇÃO
+# ------------------------------------------------------------------
+# Layout (ordem de bytes nativa, seções alinhadas em 8 bytes):
+#   cabeçalho | offsets int64[n+1] | targets int32[m] | weights float64[m] | rótulos utf-8 ('\n')
+SNAPSHOT_MAGIC = b'TGCCSR01'
+_SNAPSHOT_CABECALHO = struct.Struct('<8s1s7xqqq')  # magic, ordem de bytes, n, m, tamanho dos rótulos
+
+
+def _alinhar(posicao):
+    return (posicao + 7) & ~7
+
+
+def salvar_snapshot(grafo, caminho_arquivo):
+    """
+    Grava o grafo em formato CSR binário. A escrita é atômica
+    (arquivo temporário + os.replace) para nunca deixar um cache pela metade.
+    """
+    csr = grafo if isinstance(grafo, CSRGraph) else CSRGraph.from_graph(grafo)
+    n, m = csr.get_vertex_count(), csr.get_edge_count()
+    rotulos = '\n'.join(csr.vertex_labels).encode('utf-8')
+    ordem = b'L' if sys.byteorder == 'little' else b'B'
+
+    temporario = f"{caminho_arquivo}.{os.getpid()}.tmp"
+    with open(temporario, 'wb') as f:
+        f.write(_SNAPSHOT_CABECALHO.pack(SNAPSHOT_MAGIC, ordem, n, m, len(rotulos)))
+        for buffer in (csr.offsets, csr.targets, csr.weights):
+            f.write(buffer.tobytes())
+            f.write(b'\0' * (_alinhar(f.tell()) - f.tell()))
+        f.write(rotulos)
+    os.replace(temporario, caminho_arquivo)
+
+
+def carregar_snapshot(caminho_arquivo):
+    """
+    Abre um snapshot via memory map: os buffers do CSRGraph retornado são
+    memoryviews sobre o arquivo, então só os rótulos viram objetos Python.
+    Lança ValueError se o arquivo não for um snapshot compatível.
+    """
+    with open(caminho_arquivo, 'rb') as f:
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    dados = memoryview(mapa)
+    if len(dados) < _SNAPSHOT_CABECALHO.size:
+        raise ValueError("snapshot truncado")
+    magic, ordem, n, m, tam_rotulos = _SNAPSHOT_CABECALHO.unpack_from(dados)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("arquivo não é um snapshot CSR")
+    if ordem != (b'L' if sys.byteorder == 'little' else b'B'):
+        raise ValueError("snapshot gerado em máquina com outra ordem de bytes")
+
+    posicao = _SNAPSHOT_CABECALHO.size
+    secoes = []
+    for tipo, quantidade in (('q', n + 1), ('i', m), ('d', m)):
+        fim = posicao + quantidade * array(tipo).itemsize
+        secoes.append(dados[posicao:fim].cast(tipo))
+        posicao = _alinhar(fim)
+    if posicao + tam_rotulos != len(dados):
+        raise ValueError("snapshot truncado")
+
+    grafo = CSRGraph(n, *secoes)
+    texto = dados[posicao:].tobytes().decode('utf-8')
+    grafo.vertex_labels = texto.split('\n') if n > 0 else []
+    grafo._mmap = mapa  # mantém o mapeamento vivo enquanto o grafo existir
+    return grafo
+
+
+# ------------------------------------------------------------------
+# ARMAZÉM DE ARESTAS EM DISCO (OUT-OF-CORE)
+# ------------------------------------------------------------------
+# Uma pasta com vetores binários (ordem de bytes nativa) mapeados em memória:
+#   offsets.bin int64[n+1] | origens.bin int32[m] | destinos.bin int32[m] |
+#   pesos.bin float64[m] | rotulos.txt utf-8 ('\n') | armazem.json (n, m, formato)
+# As arestas ficam ordenadas por (origem, destino), como no CSR; as métricas
+# percorrem os vetores em blocos, então só vetores de tamanho n ficam na RAM.
+ARMAZEM_FORMATO = 'TGCARM01'
+ARESTAS_POR_BLOCO_ARMAZEM = 1 << 22
+_ARQUIVOS_ARMAZEM = (('offsets', 'int64'), ('origens', 'int32'), ('destinos', 'int32'), ('pesos', 'float64'))
+
+
+class ConstrutorArmazem:
+    """
+    Monta um ArmazemArestas com ordenação externa: as arestas recebidas vão
+    para arquivos temporários em blocos de arestas_por_bloco; finalizar()
+    conta os graus, espalha cada aresta na faixa da sua origem e ordena/agrega
+    cada faixa de vértices. A memória usada é O(n + arestas_por_bloco).
+    """
+    def __init__(self, pasta, arestas_por_bloco=ARESTAS_POR_BLOCO_ARMAZEM):
+        if np is None:
+            raise RuntimeError("O armazém de arestas em disco requer NumPy instalado.")
+        os.makedirs(pasta, exist_ok=True)
+        # Invalida um armazém anterior na mesma pasta até o novo ficar pronto
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(pasta, "armazem.json"))
+        self.pasta = pasta
+        self.arestas_por_bloco = arestas_por_bloco
+        self._buffers = (array('i'), array('i'), array('d'))
+        self._temporarios = [open(os.path.join(pasta, f"{nome}.bruto.tmp"), 'wb')
+                             for nome in ('origens', 'destinos', 'pesos')]
+        self._maior_id = -1
+        self._recebidas = 0
+
+    def adicionar(self, u, v, peso=1.0):
+        origens, destinos, pesos = self._buffers
+        origens.append(u)
+        destinos.append(v)
+        pesos.append(peso)
+        if len(origens) >= self.arestas_por_bloco:
+            self._descarregar()
+
+    def adicionar_bloco(self, origens, destinos, pesos):
+        """Versão vetorizada de adicionar para vetores de mesmo tamanho."""
+        self._descarregar()
+        origens = np.ascontiguousarray(origens, dtype=np.int32)
+        if len(origens) == 0:
+            return
+        self._maior_id = max(self._maior_id, int(origens.max()), int(np.max(destinos)))
+        self._recebidas += len(origens)
+        for arquivo, vetor, tipo in zip(self._temporarios, (origens, destinos, pesos), (np.int32, np.int32, np.float64)):
+            arquivo.write(np.ascontiguousarray(vetor, dtype=tipo).tobytes())
+
+    def _descarregar(self):
+        origens, destinos, pesos = self._buffers
+        if not origens:
+            return
+        self._maior_id = max(self._maior_id, max(origens), max(destinos))
+        self._recebidas += len(origens)
+        for arquivo, buffer in zip(self._temporarios, self._buffers):
+            arquivo.write(buffer.tobytes())
+            del buffer[:]
+
+    def finalizar(self, num_vertices=None, rotulos=None, renumeracao=None, agregacao='sum'):
+        """
+        Grava o armazém e o retorna aberto. Segue add_edge: laços e vértices
+        fora de [0, num_vertices) são descartados. Pares repetidos são
+        combinados por `agregacao` ('sum', 'count', 'max' ou 'last', na ordem
+        de chegada). renumeracao[id] (opcional) troca os ids antes da ordenação.
+        """
+        if agregacao not in ('sum', 'count', 'max', 'last'):
+            raise ValueError(f"Agregação desconhecida: {agregacao}")
+        self._descarregar()
+        for arquivo in self._temporarios:
+            arquivo.close()
+        n = self._maior_id + 1 if num_vertices is None else num_vertices
+        if renumeracao is not None:
+            renumeracao = np.asarray(renumeracao, dtype=np.int64)
+        bloco = self.arestas_por_bloco
+        caminho = lambda nome: os.path.join(self.pasta, nome)
+        brutos = [_mapear_vetor(caminho(f"{nome}.bruto.tmp"), tipo, self._recebidas)
+                  for nome, tipo in _ARQUIVOS_ARMAZEM[1:]]
+
+        def blocos_validos():
+            for inicio in range(0, self._recebidas, bloco):
+                u, v, w = (vetor[inicio:inicio + bloco] for vetor in brutos)
+                validas = (u != v) & (u >= 0) & (v >= 0) & (u < n) & (v < n)
+                u, v, w = u[validas].astype(np.int64), v[validas].astype(np.int64), w[validas]
+                if renumeracao is not None:
+                    u, v = renumeracao[u], renumeracao[v]
+                yield u, v, w
+
+        # 1. Graus de saída (com repetições) -> início da faixa de cada origem
+        faixas = np.zeros(n + 1, dtype=np.int64)
+        for u, _, _ in blocos_validos():
+            faixas[1:] += np.bincount(u, minlength=n)
+        np.cumsum(faixas, out=faixas)
+        total = int(faixas[-1])
+
+        # 2. Espalha cada aresta na faixa da origem, preservando a ordem de chegada
+        destinos_faixa = _vetor_temporario(caminho("destinos.faixa.tmp"), np.int32, total)
+        pesos_faixa = _vetor_temporario(caminho("pesos.faixa.tmp"), np.float64, total)
+        cursor = faixas[:-1].copy()
+        for u, v, w in blocos_validos():
+            if len(u) == 0:
+                continue
+            ordem = np.argsort(u, kind='stable')
+            u = u[ordem]
+            inicios = np.flatnonzero(np.r_[True, u[1:] != u[:-1]])
+            tamanhos = np.diff(np.r_[inicios, len(u)])
+            posicao_no_grupo = np.arange(len(u)) - np.repeat(inicios, tamanhos)
+            posicoes = cursor[u] + posicao_no_grupo
+            destinos_faixa[posicoes] = v[ordem]
+            pesos_faixa[posicoes] = w[ordem]
+            cursor[u[inicios]] += tamanhos
+        del brutos
+
+        # 3. Ordena cada faixa de vértices por destino, agrega repetidas e grava em sequência
+        graus = np.zeros(n + 1, dtype=np.int64)
+        with open(caminho("origens.bin.tmp"), 'wb') as f_origens, \
+                open(caminho("destinos.bin.tmp"), 'wb') as f_destinos, \
+                open(caminho("pesos.bin.tmp"), 'wb') as f_pesos:
+            a = 0
+            while a < n:
+                b = int(np.searchsorted(faixas, faixas[a] + bloco, side='right')) - 1
+                b = min(max(b, a + 1), n)
+                inicio, fim = int(faixas[a]), int(faixas[b])
+                if fim > inicio:
+                    u = np.repeat(np.arange(a, b, dtype=np.int64), np.diff(faixas[a:b + 1]))
+                    v = np.asarray(destinos_faixa[inicio:fim])
+                    w = np.asarray(pesos_faixa[inicio:fim])
+                    ordem = np.lexsort((v, u))
+                    u, v, w = u[ordem], v[ordem], w[ordem]
+                    grupos = np.flatnonzero(np.r_[True, (u[1:] != u[:-1]) | (v[1:] != v[:-1])])
+                    if agregacao == 'sum':
+                        w = np.add.reduceat(w, grupos)
+                    elif agregacao == 'max':
+                        w = np.maximum.reduceat(w, grupos)
+                    elif agregacao == 'count':
+                        w = np.diff(np.r_[grupos, len(u)]).astype(np.float64)
+                    else:
+                        w = w[np.r_[grupos[1:], len(u)] - 1]
+                    u, v = u[grupos], v[grupos]
+                    graus[a + 1:b + 1] = np.bincount(u - a, minlength=b - a)
+                    f_origens.write(u.astype(np.int32).tobytes())
+                    f_destinos.write(v.astype(np.int32).tobytes())
+                    f_pesos.write(w.astype(np.float64).tobytes())
+                a = b
+        del destinos_faixa, pesos_faixa
+        np.cumsum(graus, out=graus)
+
+        with open(caminho("offsets.bin.tmp"), 'wb') as f:
+            f.write(graus.tobytes())
+        with open(caminho("rotulos.txt.tmp"), 'w', encoding='utf-8', newline='\n') as f:
+            f.write('\n'.join(rotulos) if rotulos is not None else '')
+        for nome in ('offsets.bin', 'origens.bin', 'destinos.bin', 'pesos.bin', 'rotulos.txt'):
+            os.replace(caminho(nome + '.tmp'), caminho(nome))
+        for nome in ('origens.bruto.tmp', 'destinos.bruto.tmp', 'pesos.bruto.tmp',
+                     'destinos.faixa.tmp', 'pesos.faixa.tmp'):
+            os.remove(caminho(nome))
+
+        # armazem.json por último: sem ele a pasta não é um armazém válido
+        cabecalho = {'formato': ARMAZEM_FORMATO, 'ordem': sys.byteorder, 'n': n, 'm': int(graus[-1])}
+        with open(caminho("armazem.json.tmp"), 'w', encoding='utf-8') as f:
+            json.dump(cabecalho, f)
+        os.replace(caminho("armazem.json.tmp"), caminho("armazem.json"))
+        return ArmazemArestas(self.pasta)
+
+
+def _mapear_vetor(caminho_arquivo, tipo, quantidade):
+    """Vetor NumPy somente leitura sobre o arquivo mapeado (vazio se quantidade == 0)."""
+    if quantidade == 0:
+        return np.zeros(0, dtype=tipo)
+    with open(caminho_arquivo, 'rb') as f:
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return np.frombuffer(mapa, dtype=tipo, count=quantidade)
+
+
+def _vetor_temporario(caminho_arquivo, tipo, quantidade):
+    """Vetor gravável em disco (np.memmap) de `quantidade` posições."""
+    if quantidade == 0:
+        open(caminho_arquivo, 'wb').close()
+        return np.zeros(0, dtype=tipo)
+    return np.memmap(caminho_arquivo, dtype=tipo, mode='w+', shape=(quantidade,))
+
+
+class ArmazemArestas:
+    """
+    Grafo somente leitura em disco, para redes maiores que a memória.
+    Os vetores (offsets, origens, destinos, pesos) são mapeados do disco e as
+    métricas os percorrem em blocos de arestas_por_bloco, sem montar listas
+    de adjacência: só vetores de tamanho n (graus, ranks) ficam na RAM.
+    Monte com ConstrutorArmazem, ArmazemArestas.construir ou de_grafo.
+    Requer NumPy.
+    """
+    def __init__(self, pasta, arestas_por_bloco=ARESTAS_POR_BLOCO_ARMAZEM):
+        if np is None:
+            raise RuntimeError("O armazém de arestas em disco requer NumPy instalado.")
+        try:
+            with open(os.path.join(pasta, "armazem.json"), 'r', encoding='utf-8') as f:
+                cabecalho = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"pasta não contém um armazém de arestas: {e}")
+        if cabecalho.get('formato') != ARMAZEM_FORMATO:
+            raise ValueError("formato de armazém incompatível")
+        if cabecalho.get('ordem') != sys.byteorder:
+            raise ValueError("armazém gerado em máquina com outra ordem de bytes")
+
+        self.pasta = pasta
+        self.arestas_por_bloco = arestas_por_bloco
+        self.num_vertices = n = cabecalho['n']
+        self.num_arestas = m = cabecalho['m']
+        for nome, tipo in _ARQUIVOS_ARMAZEM:
+            caminho = os.path.join(pasta, f"{nome}.bin")
+            quantidade = n + 1 if nome == 'offsets' else m
+            if os.path.getsize(caminho) != quantidade * np.dtype(tipo).itemsize:
+                raise ValueError(f"armazém truncado: {nome}.bin")
+            setattr(self, nome, _mapear_vetor(caminho, tipo, quantidade))
+        with open(os.path.join(pasta, "rotulos.txt"), 'r', encoding='utf-8', newline='\n') as f:
+            texto = f.read()
+        self.vertex_labels = texto.split('\n') if texto else [str(i) for i in range(n)]
+        self.instrumentacao = None
+
+    @classmethod
+    def construir(cls, pasta, arestas, num_vertices=None, rotulos=None, agregacao='sum',
+                  arestas_por_bloco=ARESTAS_POR_BLOCO_ARMAZEM):
+        """Monta o armazém a partir de um iterável de (u, v, peso)."""
+        construtor = ConstrutorArmazem(pasta, arestas_por_bloco)
+        for u, v, w in arestas:
+            construtor.adicionar(u, v, w)
+        return construtor.finalizar(num_vertices, rotulos, agregacao=agregacao)
+
+    @classmethod
+    def de_grafo(cls, grafo, pasta, arestas_por_bloco=ARESTAS_POR_BLOCO_ARMAZEM):
+        """Grava qualquer AbstractGraph como armazém em disco."""
+        construtor = ConstrutorArmazem(pasta, arestas_por_bloco)
+        construtor.adicionar_bloco(*grafo._arestas_numpy())
+        return construtor.finalizar(grafo.get_vertex_count(), list(grafo.vertex_labels))
+
+    def get_vertex_count(self):
+        return self.num_vertices
+
+    def get_edge_count(self):
+        return self.num_arestas
+
+    def blocos(self, operacao=None):
+        """
+        Itera (origens, destinos, pesos) em fatias de até arestas_por_bloco
+        arestas. Com operacao, reporta progresso (e verifica o cancelamento)
+        a cada bloco.
+        """
+        instrumentacao = self.instrumentacao if operacao is not None else None
+        m = self.num_arestas
+        for inicio in range(0, m, self.arestas_por_bloco):
+            if instrumentacao is not None:
+                instrumentacao.progresso(operacao, inicio, m, forcar=True)
+            fim = inicio + self.arestas_por_bloco
+            yield self.origens[inicio:fim], self.destinos[inicio:fim], self.pesos[inicio:fim]
+        if instrumentacao is not None:
+            instrumentacao.progresso(operacao, m, m)
+
+    def get_successors(self, u):
+        inicio, fim = self.offsets[u], self.offsets[u + 1]
+        return list(zip(self.destinos[inicio:fim].tolist(), self.pesos[inicio:fim].tolist()))
+
+    def _localizar(self, origens, destinos):
+        """
+        Busca binária vetorizada de cada destinos[i] no segmento de origens[i].
+        Retorna a máscara das arestas origens[i] -> destinos[i] que existem.
+        """
+        origens = np.asarray(origens, dtype=np.int64)
+        destinos = np.asarray(destinos)
+        baixo = self.offsets[origens]
+        alto = self.offsets[origens + 1]
+        fim = alto.copy()
+        ativas = np.flatnonzero(baixo < alto)
+        while ativas.size:
+            meio = (baixo[ativas] + alto[ativas]) // 2
+            menor = self.destinos[meio] < destinos[ativas]
+            baixo[ativas[menor]] = meio[menor] + 1
+            alto[ativas[~menor]] = meio[~menor]
+            ativas = ativas[baixo[ativas] < alto[ativas]]
+        existe = baixo < fim
+        existe[existe] = self.destinos[baixo[existe]] == destinos[existe]
+        return existe
+
+    def has_edge(self, u, v):
+        return bool(self._localizar([u], [v])[0]) if 0 <= u < self.num_vertices else False
+
+    def graus(self, ponderado=False):
+        """(saída, entrada) de todos os vértices como vetores; ponderado soma os pesos."""
+        n = self.num_vertices
+        if not ponderado:
+            saida = np.diff(self.offsets)
+            entrada = np.zeros(n, dtype=np.int64)
+            for _, destinos, _ in self.blocos('graus'):
+                entrada += np.bincount(destinos, minlength=n)
+            return saida, entrada
+        saida, entrada = np.zeros(n), np.zeros(n)
+        for origens, destinos, pesos in self.blocos('graus'):
+            saida += np.bincount(origens, weights=pesos, minlength=n)
+            entrada += np.bincount(destinos, weights=pesos, minlength=n)
+        return saida, entrada
+
+    def calcular_densidade(self):
+        n = self.num_vertices
+        return self.num_arestas / (n * (n - 1)) if n > 1 else 0.0
+
+    def calcular_gmce(self):
+        # Σ_u Σ_{v ∈ suc(u)} grau_saida(v) = Σ_v grau_entrada(v) · grau_saida(v)
+        if self.num_vertices == 0:
+            return 0.0
+        saida, entrada = self.graus()
+        return float(np.dot(saida, entrada)) / self.num_vertices
+
+    def calcular_reciprocidade(self):
+        """Mesma definição de AbstractGraph.calcular_reciprocidade, em blocos."""
+        if self.num_arestas == 0:
+            return 0.0
+        arestas_reciprocas = 0
+        for origens, destinos, _ in self.blocos('calcular_reciprocidade'):
+            arestas_reciprocas += int(np.count_nonzero(self._localizar(destinos, origens)))
+        pares_reciprocos = arestas_reciprocas // 2
+        return pares_reciprocos / (self.num_arestas - pares_reciprocos)
+
+    def calcular_pagerank(self, damping=0.85, max_iter=100, tol=1e-6):
+        """
+        Mesmo PageRank de AbstractGraph.calcular_pagerank (só pesos positivos,
+        massa pendurada distribuída igualmente), com uma varredura em blocos
+        por iteração. Retorna um vetor NumPy.
+        """
+        n = self.num_vertices
+        if n == 0:
+            return np.zeros(0)
+        soma_saida = np.zeros(n)
+        for origens, _, pesos in self.blocos():
+            soma_saida += np.bincount(origens, weights=np.maximum(pesos, 0.0), minlength=n)
+        pendurados = soma_saida == 0.0
+        fator = np.divide(damping, soma_saida, out=np.zeros(n), where=~pendurados)
+
+        rank = np.full(n, 1.0 / n)
+        instrumentacao = self.instrumentacao
+        iteracoes = 0
+        for iteracoes in range(1, max_iter + 1):
+            if instrumentacao is not None:
+                instrumentacao.progresso('calcular_pagerank', iteracoes, max_iter)
+            novo = np.full(n, (1.0 - damping + damping * rank[pendurados].sum()) / n)
+            escala = rank * fator
+            for origens, destinos, pesos in self.blocos():
+                novo += np.bincount(destinos, weights=escala[origens] * np.maximum(pesos, 0.0), minlength=n)
+            diff = np.abs(novo - rank).sum()
+            rank = novo
+            if diff < tol:
+                break
+        if instrumentacao is not None:
+            instrumentacao.contar('pagerank.iteracoes', iteracoes)
+        return rank / rank.sum()
+
+    def top_pagerank(self, k=10, damping=0.85, max_iter=100, tol=1e-6):
+        """Top-k (id, rótulo, pagerank), como AbstractGraph.top_pagerank."""
+        pr = self.calcular_pagerank(damping, max_iter, tol)
+        k = min(k, len(pr))
+        melhores = np.argpartition(-pr, k - 1)[:k] if k else np.zeros(0, dtype=np.int64)
+        melhores = sorted(melhores.tolist(), key=lambda i: (-pr[i], i))
+        return [(i, self.vertex_labels[i], float(pr[i])) for i in melhores]
+
+    def como_grafo(self):
+        """CSRGraph sobre os mesmos arquivos mapeados (sem cópia), para as demais métricas."""
+        buffers = [memoryview(vetor).cast('B').cast(codigo) if len(vetor) else array(codigo)
+                   for vetor, codigo in ((self.offsets, 'q'), (self.destinos, 'i'), (self.pesos, 'd'))]
+        grafo = CSRGraph(self.num_vertices, *buffers)
+        grafo.vertex_labels = list(self.vertex_labels)
+        return grafo
+
+
+# ------------------------------------------------------------------
+# PROCESSAMENTO PARALELO (CSR EM MEMÓRIA COMPARTILHADA)
+# ------------------------------------------------------------------
+# O grafo é copiado uma única vez para um bloco de memória compartilhada;
+# cada processo do pool o abre como CSRGraph somente leitura no inicializador,
+# então as tarefas trafegam apenas intervalos de origens e listas de resultados.
+_GRAFO_TRABALHADOR = None
+_MEMORIA_TRABALHADOR = None
+
+
+def _layout_compartilhado(n, m):
+    """Posições (início, tipo, quantidade) de offsets, targets e weights no bloco."""
+    secoes, posicao = [], 0
+    for tipo, quantidade in (('q', n + 1), ('i', m), ('d', m)):
+        secoes.append((posicao, tipo, quantidade))
+        posicao = _alinhar(posicao + quantidade * array(tipo).itemsize)
+    return secoes, posicao
+
+
+def _publicar_csr(grafo):
+    """Copia o grafo (em CSR) para memória compartilhada. Retorna (bloco, descritor)."""
+    csr = grafo if isinstance(grafo, CSRGraph) else CSRGraph.from_graph(grafo)
+    n, m = csr.get_vertex_count(), csr.get_edge_count()
+    secoes, tamanho = _layout_compartilhado(n, m)
+    bloco = shared_memory.SharedMemory(create=True, size=max(tamanho, 1))
+    for (inicio, _, _), buffer in zip(secoes, (csr.offsets, csr.targets, csr.weights)):
+        dados = buffer.tobytes()
+        bloco.buf[inicio:inicio + len(dados)] = dados
+    return bloco, (bloco.name, n, m)
+
+
+def _abrir_csr_compartilhado(nome, n, m):
+    bloco = shared_memory.SharedMemory(name=nome)
+    secoes, _ = _layout_compartilhado(n, m)
+    buffers = [bloco.buf[inicio:inicio + quantidade * array(tipo).itemsize].cast(tipo)
+               for inicio, tipo, quantidade in secoes]
+    return bloco, CSRGraph(n, *buffers)
+
+
+def _iniciar_trabalhador(descritor, instrumentado=False):
+    global _GRAFO_TRABALHADOR, _MEMORIA_TRABALHADOR
+    _MEMORIA_TRABALHADOR, _GRAFO_TRABALHADOR = _abrir_csr_compartilhado(*descritor)
+    if instrumentado:
+        _GRAFO_TRABALHADOR.instrumentacao = Instrumentacao()
+
+
+def _executar_tarefa(tarefa, intervalo):
+    """Roda a tarefa no trabalhador e devolve (resultado, contadores acumulados no bloco)."""
+    resultado = tarefa(intervalo)
+    instrumentacao = _GRAFO_TRABALHADOR.instrumentacao
+    if instrumentacao is None:
+        return resultado, {}
+    contadores = instrumentacao.contadores
+    instrumentacao.limpar()
+    return resultado, contadores
+
+
+def _proximidades_do_bloco(intervalo):
+    inicio, fim = intervalo
+    return [_GRAFO_TRABALHADOR._proximidade_origem(i) for i in range(inicio, fim)]
+
+
+def _executar_em_paralelo(grafo, workers, tarefa, intervalos, operacao=None):
+    """
+    Roda tarefa(intervalo) no pool e devolve os resultados na ordem dos intervalos
+    (qualquer argumento serializável: faixas de origens, tuplas de vértices...).
+    Com instrumentação no grafo, os contadores dos trabalhadores são somados aos
+    do grafo e o progresso (em blocos concluídos) é reportado como `operacao`;
+    um cancelamento descarta os blocos ainda não iniciados.
+    """
+    instrumentacao = grafo.instrumentacao
+    bloco, descritor = _publicar_csr(grafo)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_trabalhador,
+                                 initargs=(descritor, instrumentacao is not None)) as pool:
+            futuros = [pool.submit(_executar_tarefa, tarefa, intervalo) for intervalo in intervalos]
+            resultados = []
+            try:
+                for feito, futuro in enumerate(futuros, start=1):
+                    resultado, contadores = futuro.result()
+                    resultados.append(resultado)
+                    if instrumentacao is not None:
+                        instrumentacao.combinar(contadores)
+                        instrumentacao.progresso(operacao or tarefa.__name__, feito, len(futuros), forcar=True)
+            except OperacaoCancelada:
+                pool.shutdown(cancel_futures=True)
+                raise
+            return resultados
+    finally:
+        bloco.close()
+        bloco.unlink()
+
+
+def _intermediacao_do_bloco(origens):
+    centralidade = [0.0] * _GRAFO_TRABALHADOR.get_vertex_count()
+    for origem in origens:
+        _GRAFO_TRABALHADOR._brandes_origem(origem, centralidade)
+    return centralidade
+
+
+def _intermediacao_em_paralelo(grafo, workers, origens):
+    tamanho = max(1, len(origens) // (workers * 4))
+    blocos = [tuple(origens[i:i + tamanho]) for i in range(0, len(origens), tamanho)]
+    centralidade = [0.0] * grafo.get_vertex_count()
+    for parcial in _executar_em_paralelo(grafo, workers, _intermediacao_do_bloco, blocos, 'calcular_intermediacao'):
+        for v, valor in enumerate(parcial):
+            centralidade[v] += valor
+    return centralidade
+
+
+def _dividir_origens(n, workers):
+    tamanho = max(1, n // (workers * 4))
+    return [(i, min(i + tamanho, n)) for i in range(0, n, tamanho)]
+
+
+def _proximidades_em_paralelo(grafo, workers):
+    n = grafo.get_vertex_count()
+    intervalos = _dividir_origens(n, workers)
+    proximidades = []
+    for parcial in _executar_em_paralelo(grafo, workers, _proximidades_do_bloco, intervalos,
+                                         'calcular_proximidade_por_no'):
+        proximidades.extend(parcial)
+    return proximidades
@@ -1,46 +1,302 @@
+import argparse
+import contextlib
 import csv
+import hashlib
+import io
+import json
 import os
 import sys
-from grafos import AdjacencyListGraph
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from grafos import (AdjacencyListGraph, ArmazemArestas, ConstrutorArmazem, Instrumentacao, carregar_snapshot,
+                    salvar_snapshot)
+
+PASTA_DADOS = "dados_coletados"
+PASTA_CACHE = ".cache"
+# Grafos padrão: (nome, arquivo em PASTA_DADOS, índice da coluna de peso)
+GRAFOS = [
+    ("grafo_1_comentarios", "grafo_1_comentarios.csv", 3),
+    ("grafo_2_fechamentos", "grafo_2_fechamentos.csv", 2),
+    ("grafo_3_pr_reviews", "grafo_3_pr_reviews.csv", 3),
+]
+# Processos usados no Dijkstra de todas as origens (None = todos os núcleos)
+WORKERS_PROXIMIDADE = None
+# Orçamento da proximidade aproximada (opção 6 do menu)
+AMOSTRAS_PROXIMIDADE = 200
+TEMPO_LIMITE_PROXIMIDADE = 10.0
+SEMENTE_AMOSTRAGEM = 42
+# Intermediação exata até este número de vértices; acima, origens amostradas
+LIMITE_INTERMEDIACAO_EXATA = 2000
+AMOSTRAS_INTERMEDIACAO = 500
+# Atributos de nó gravados na exportação para o Gephi (opção 7 do menu)
+ATRIBUTOS_EXPORTACAO = ('pagerank', 'grau_entrada', 'grau_saida', 'comunidade')
+# Coluna peso_total dos arquivos <grafo>_agregado.csv gerados pelo coleta.py
+INDICE_PESO_AGREGADO = 4
+
+# --- POLÍTICAS DE AGREGAÇÃO ---
+# Como combinar o peso quando o mesmo par (origem, destino) aparece em várias linhas.
+# Cada política é (valor_inicial(peso), combinar(atual, peso)).
+AGREGACOES = {
+    'sum':   (lambda peso: peso, lambda atual, peso: atual + peso),
+    'count': (lambda peso: 1.0,  lambda atual, peso: atual + 1.0),
+    'max':   (lambda peso: peso, max),
+    'last':  (lambda peso: peso, lambda atual, peso: peso),
+}
 
 # --- FUNÇÃO DE CARREGAMENTO ---
-def carregar_grafo(caminho_arquivo, indice_peso):
+def carregar_grafo(caminho_arquivo, indice_peso, agregacao='sum'):
+    """
+    Lê o CSV em uma única passada: interna os nomes de usuário à medida que
+    aparecem e agrega as interações repetidas de cada par conforme a política
+    escolhida (sum, count, max ou last). Linhas malformadas são reportadas
+    e ficam disponíveis em grafo.linhas_invalidas como (número_linha, motivo).
+    """
+    if agregacao not in AGREGACOES:
+        raise ValueError(f"Agregação desconhecida: {agregacao} (use {', '.join(AGREGACOES)})")
     if not os.path.exists(caminho_arquivo):
         print(f"ERRO: Arquivo não encontrado: {caminho_arquivo}")
         return None
 
-    # 1. Identificar vértices
-    usuarios = set()
-    with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+    valor_inicial, combinar = AGREGACOES[agregacao]
+    mapa_nome_id = {}
+    nomes = []
+    pesos = {}
+    linhas_invalidas = []
+
+    with open(caminho_arquivo, 'r', encoding='utf-8', newline='') as f:
         leitor = csv.reader(f)
         next(leitor, None)
-        for linha in leitor:
-            if len(linha) >= 2:
-                usuarios.add(linha[0])
-                usuarios.add(linha[1])
+        for num_linha, linha in enumerate(leitor, start=2):
+            if len(linha) < 2:
+                if linha:
+                    linhas_invalidas.append((num_linha, "menos de 2 colunas"))
+                continue
+
+            # 1. Internar os usuários (todo nome citado vira vértice)
+            ids = []
+            for nome in (linha[0], linha[1]):
+                i = mapa_nome_id.get(nome)
+                if i is None:
+                    i = mapa_nome_id[nome] = len(nomes)
+                    nomes.append(nome)
+                ids.append(i)
+
+            # 2. Validar o peso
+            if indice_peso >= len(linha):
+                linhas_invalidas.append((num_linha, f"coluna de peso {indice_peso} ausente"))
+                continue
+            try:
+                peso = float(linha[indice_peso])
+            except ValueError:
+                linhas_invalidas.append((num_linha, f"peso inválido: {linha[indice_peso]!r}"))
+                continue
 
-    lista_usuarios = sorted(list(usuarios))
-    num_vertices = len(lista_usuarios)
-    mapa_nome_id = {nome: i for i, nome in enumerate(lista_usuarios)}
+            # 3. Agregar a interação do par
+            chave = (ids[0], ids[1])
+            atual = pesos.get(chave)
+            pesos[chave] = valor_inicial(peso) if atual is None else combinar(atual, peso)
 
-    # 2. Instanciar
-    grafo = AdjacencyListGraph(num_vertices)
+    if linhas_invalidas:
+        print(f"AVISO: {len(linhas_invalidas)} linha(s) malformada(s) ignorada(s) em {caminho_arquivo}")
+        for num_linha, motivo in linhas_invalidas[:5]:
+            print(f"   linha {num_linha}: {motivo}")
+
+    # IDs em ordem alfabética dos nomes (mesma numeração das versões anteriores)
+    lista_usuarios = sorted(nomes)
+    novo_id = [0] * len(nomes)
+    for i, nome in enumerate(lista_usuarios):
+        novo_id[mapa_nome_id[nome]] = i
+
+    grafo = AdjacencyListGraph(len(lista_usuarios))
     grafo.vertex_labels = lista_usuarios
+    grafo.linhas_invalidas = linhas_invalidas
+    for (u, v), peso in pesos.items():
+        grafo.add_edge(novo_id[u], novo_id[v], peso)
+
+    return grafo
+
+# --- CACHE DE SNAPSHOTS BINÁRIOS ---
+def _hash_arquivo(caminho_arquivo):
+    h = hashlib.sha256()
+    with open(caminho_arquivo, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _gravar_meta(caminho_meta, meta):
+    temporario = f"{caminho_meta}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(temporario, caminho_meta)
+
+
+def _cache_valido(caminho_arquivo, caminho_meta, caminho_cache):
+    """
+    O cache vale enquanto o CSV não mudar: mtime/tamanho iguais reaproveitam
+    direto; se só o mtime mudou, o hash SHA-256 decide (e atualiza o meta).
+    """
+    info = os.stat(caminho_arquivo)
+    try:
+        with open(caminho_meta, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    if not meta or not os.path.exists(caminho_cache):
+        return False
+    if meta.get('csv_mtime_ns') == info.st_mtime_ns and meta.get('csv_tamanho') == info.st_size:
+        return True
+    if meta.get('csv_sha256') == _hash_arquivo(caminho_arquivo):
+        meta['csv_mtime_ns'], meta['csv_tamanho'] = info.st_mtime_ns, info.st_size
+        _gravar_meta(caminho_meta, meta)
+        return True
+    return False
+
+
+def _gravar_meta_csv(caminho_arquivo, caminho_meta, info):
+    _gravar_meta(caminho_meta, {
+        'csv_mtime_ns': info.st_mtime_ns,
+        'csv_tamanho': info.st_size,
+        'csv_sha256': _hash_arquivo(caminho_arquivo),
+    })
+
+
+def _base_cache(caminho_arquivo, indice_peso, agregacao):
+    pasta, nome = os.path.split(caminho_arquivo)
+    pasta_cache = os.path.join(pasta, PASTA_CACHE)
+    return pasta_cache, os.path.join(pasta_cache, f"{os.path.splitext(nome)[0]}.p{indice_peso}.{agregacao}")
+
+
+def carregar_grafo_em_cache(caminho_arquivo, indice_peso, agregacao='sum'):
+    """
+    Igual a carregar_grafo, mas reaproveita um snapshot CSR binário em
+    <pasta do CSV>/.cache/. O snapshot vale enquanto o CSV não mudar:
+    mtime/tamanho iguais reaproveitam direto; se só o mtime mudou, o hash
+    SHA-256 decide. Qualquer mudança de conteúdo refaz o cache.
+    Retorna um CSRGraph (somente leitura) mapeado em memória.
+    """
+    if not os.path.exists(caminho_arquivo):
+        print(f"ERRO: Arquivo não encontrado: {caminho_arquivo}")
+        return None
+
+    pasta_cache, base = _base_cache(caminho_arquivo, indice_peso, agregacao)
+    caminho_snapshot, caminho_meta = base + ".csr", base + ".json"
+    info = os.stat(caminho_arquivo)
+
+    if _cache_valido(caminho_arquivo, caminho_meta, caminho_snapshot):
+        try:
+            return carregar_snapshot(caminho_snapshot)
+        except (OSError, ValueError) as e:
+            print(f"AVISO: snapshot inválido ({e}), recarregando o CSV...")
+
+    grafo = carregar_grafo(caminho_arquivo, indice_peso, agregacao)
+    if grafo is None:
+        return None
+
+    try:
+        os.makedirs(pasta_cache, exist_ok=True)
+        salvar_snapshot(grafo, caminho_snapshot)
+        _gravar_meta_csv(caminho_arquivo, caminho_meta, info)
+        return carregar_snapshot(caminho_snapshot)
+    except OSError as e:
+        print(f"AVISO: não foi possível gravar o cache ({e}); usando o grafo em memória.")
+        return grafo
+
+
+def construir_armazem(caminho_arquivo, indice_peso, pasta_armazem, agregacao='sum'):
+    """
+    Versão de carregar_grafo para redes maiores que a memória: as linhas do
+    CSV vão direto para um ConstrutorArmazem (ordenação externa em disco) e
+    só o dicionário de nomes fica na RAM. Mesmas regras de validação, de
+    agregação e de numeração (ordem alfabética) que carregar_grafo.
+    Retorna o ArmazemArestas aberto, ou None se o arquivo não existir.
+    """
+    if not os.path.exists(caminho_arquivo):
+        print(f"ERRO: Arquivo não encontrado: {caminho_arquivo}")
+        return None
 
-    # 3. Preencher arestas
-    with open(caminho_arquivo, 'r', encoding='utf-8') as f:
+    construtor = ConstrutorArmazem(pasta_armazem)
+    mapa_nome_id = {}
+    nomes = []
+    invalidas = 0
+
+    with open(caminho_arquivo, 'r', encoding='utf-8', newline='') as f:
         leitor = csv.reader(f)
         next(leitor, None)
         for linha in leitor:
+            if len(linha) < 2:
+                invalidas += bool(linha)
+                continue
+            ids = []
+            for nome in (linha[0], linha[1]):
+                i = mapa_nome_id.get(nome)
+                if i is None:
+                    i = mapa_nome_id[nome] = len(nomes)
+                    nomes.append(nome)
+                ids.append(i)
             try:
-                u = mapa_nome_id[linha[0]]
-                v = mapa_nome_id[linha[1]]
                 peso = float(linha[indice_peso])
-                grafo.add_edge(u, v, peso)
-            except:
+            except (IndexError, ValueError):
+                invalidas += 1
                 continue
+            construtor.adicionar(ids[0], ids[1], peso)
 
-    return grafo
+    if invalidas:
+        print(f"AVISO: {invalidas} linha(s) malformada(s) ignorada(s) em {caminho_arquivo}")
+
+    lista_usuarios = sorted(nomes)
+    novo_id = [0] * len(nomes)
+    for i, nome in enumerate(lista_usuarios):
+        novo_id[mapa_nome_id[nome]] = i
+    return construtor.finalizar(len(nomes), lista_usuarios, novo_id, agregacao)
+
+
+def carregar_armazem_em_cache(caminho_arquivo, indice_peso, agregacao='sum'):
+    """
+    Como carregar_grafo_em_cache, mas o cache é um ArmazemArestas em
+    <pasta do CSV>/.cache/<nome>.armazem/, refeito quando o CSV muda.
+    """
+    if not os.path.exists(caminho_arquivo):
+        print(f"ERRO: Arquivo não encontrado: {caminho_arquivo}")
+        return None
+
+    _, base = _base_cache(caminho_arquivo, indice_peso, agregacao)
+    pasta_armazem, caminho_meta = base + ".armazem", base + ".armazem.json"
+    info = os.stat(caminho_arquivo)
+
+    if _cache_valido(caminho_arquivo, caminho_meta, pasta_armazem):
+        try:
+            return ArmazemArestas(pasta_armazem)
+        except (OSError, ValueError) as e:
+            print(f"AVISO: armazém inválido ({e}), recarregando o CSV...")
+
+    armazem = construir_armazem(caminho_arquivo, indice_peso, pasta_armazem, agregacao)
+    _gravar_meta_csv(caminho_arquivo, caminho_meta, info)
+    return armazem
+
+
+def imprimir_progresso(operacao, feito, total):
+    """Gancho de progresso do menu interativo."""
+    if feito == 0:
+        print(f"   > {operacao}: iniciando ({total} passos)...")
+    elif feito == total:
+        print(f"   > {operacao}: concluído.")
+    else:
+        print(f"     {operacao}: {feito}/{total}...")
+
+def _top_intermediacao(grafo, k=10, workers=WORKERS_PROXIMIDADE):
+    """
+    Top-k por intermediação; acima de LIMITE_INTERMEDIACAO_EXATA vértices usa
+    amostragem de origens. No modo lote use workers=1: a tarefa já roda num
+    processo do pool e não deve abrir outro.
+    """
+    amostras = AMOSTRAS_INTERMEDIACAO if grafo.get_vertex_count() > LIMITE_INTERMEDIACAO_EXATA else None
+    valores = grafo.calcular_intermediacao(amostras=amostras, semente=SEMENTE_AMOSTRAGEM, workers=workers)
+    ordem = sorted(range(len(valores)), key=valores.__getitem__, reverse=True)[:k]
+    return [(grafo.vertex_labels[v], valores[v]) for v in ordem]
 
 # --- MENU DE MÉTRICAS (Sub-menu) ---
 def menu_metricas(grafo, nome_grafo):
@@ -64,6 +320,11 @@ def menu_metricas(grafo, nome_grafo):
         print("3. Taxa de Reciprocidade (Colaboração Mútua)")
         print("4. Densidade da Rede (Detalhada)")
         print("5. PageRank (Influência / Importância dos usuários)")
+        print("6. Proximidade Aproximada (amostragem de pivôs, rápida)")
+        print("7. Exportar para Gephi (GEXF com PageRank, graus e comunidade)")
+        print("8. Componentes Conexas (e métricas só na componente gigante)")
+        print("9. Comunidades (Louvain e Propagação de Rótulos)")
+        print("10. Intermediação (Brandes: pontes entre sub-equipes)")
         print("0. Voltar ao Menu Principal")
         print("----------------------------------------------")
 
@@ -83,7 +344,7 @@ def menu_metricas(grafo, nome_grafo):
             print("\n--- Calculando Coeficiente de Proximidade (Dijkstra)... ---")
             print("Aviso: Isso pode levar alguns instantes (algoritmo complexo).")
             try:
-                resultado = grafo.calcular_coeficiente_proximidade()
+                resultado = grafo.calcular_coeficiente_proximidade(workers=WORKERS_PROXIMIDADE)
                 print(f">>> Resultado Proximidade Global: {resultado:.6f}")
                 print("Interpretação: Média de quão perto (em custo) cada nó está de todos os outros alcançáveis.")
             except AttributeError:
@@ -129,51 +390,383 @@ def menu_metricas(grafo, nome_grafo):
                 print("ERRO: Métodos 'calcular_pagerank/top_pagerank' não encontrados em grafos.py")
             input("\nPressione Enter para continuar...")
 
+        elif opcao == '6':
+            print("\n--- Estimando Coeficiente de Proximidade (amostragem)... ---")
+            resultado = grafo.estimar_coeficiente_proximidade(amostras=AMOSTRAS_PROXIMIDADE,
+                                                              tempo_limite=TEMPO_LIMITE_PROXIMIDADE,
+                                                              semente=SEMENTE_AMOSTRAGEM)
+            inf, sup = resultado['intervalo']
+            print(f">>> Proximidade Global estimada: {resultado['estimativa']:.6f}")
+            print(f"    Intervalo de confiança (95%): [{inf:.6f}, {sup:.6f}] com {resultado['amostras']} pivôs")
+            print("Interpretação: aproximação da opção 2 em segundos, útil para redes grandes.")
+            input("\nPressione Enter para continuar...")
+
+        elif opcao == '7':
+            caminho = input("Arquivo de saída [grafo.gexf.gz]: ").strip() or "grafo.gexf.gz"
+            incluir = input("Incluir proximidade por nó? (lento em redes grandes) [s/N]: ").strip().lower() == 's'
+            atributos = ATRIBUTOS_EXPORTACAO + (('proximidade',) if incluir else ())
+            print(f"--- Exportando para Gephi: {caminho} ---")
+            grafo.export_to_gephi(caminho, atributos, workers=WORKERS_PROXIMIDADE)
+            input("\nPressione Enter para continuar...")
+
+        elif opcao == '8':
+            print("\n--- Calculando Componentes Conexas... ---")
+            _, fracas = grafo.componentes_fracas()
+            _, fortes = grafo.componentes_fortes()
+            print(f">>> Componentes fracas: {len(fracas)} (maior: {max(fracas, default=0)} vértices)")
+            print(f">>> Componentes fortes: {len(fortes)} (maior: {max(fortes, default=0)} vértices)")
+            print("Interpretação: a componente gigante concentra a colaboração; o resto são grupos isolados.")
+            tipo = input("Analisar só a componente gigante? [f]raca, f[o]rte ou Enter para voltar: ").strip().lower()
+            if tipo in ('f', 'o'):
+                forte = tipo == 'o'
+                sub = grafo.subgrafo_componente_gigante(fortes=forte)
+                menu_metricas(sub, f"{nome_grafo} - componente gigante {'forte' if forte else 'fraca'}")
+            else:
+                input("\nPressione Enter para continuar...")
+
+        elif opcao == '9':
+            print("\n--- Detectando Comunidades... ---")
+            for nome, (ids, modularidade) in (("Louvain", grafo.calcular_comunidades_louvain()),
+                                              ("Propagação de rótulos", grafo.calcular_comunidades_propagacao())):
+                tamanhos = sorted(Counter(ids).values(), reverse=True)
+                print(f">>> {nome}: {len(tamanhos)} comunidades, modularidade {modularidade:.4f}")
+                print(f"    Maiores: {', '.join(str(t) for t in tamanhos[:5])} vértices")
+            print("Interpretação: modularidade acima de ~0.3 indica grupos de colaboração bem definidos.")
+            print("A exportação para o Gephi (opção 7) inclui a comunidade do Louvain de cada usuário.")
+            input("\nPressione Enter para continuar...")
+
+        elif opcao == '10':
+            print("\n--- Calculando Intermediação (Brandes)... ---")
+            top = _top_intermediacao(grafo)
+            print("Top 10 usuários por intermediação:")
+            for pos, (label, valor) in enumerate(top, start=1):
+                print(f"{pos:02d}. {label} -> {valor:.6f}")
+            print("Interpretação: nós com alta intermediação ligam grupos que, sem eles, quase não interagem.")
+            input("\nPressione Enter para continuar...")
+
         elif opcao == '0':
             break
         else:
             print("Opção inválida!")
 
+def especificacoes_padrao(agregacao='sum', pasta=PASTA_DADOS):
+    """
+    (caminho, índice do peso) de cada grafo em GRAFOS. Com agregação 'sum',
+    prefere o <grafo>_agregado.csv (uma linha por par, peso já somado) quando
+    ele existe e não é mais antigo que o log de eventos.
+    """
+    especificacoes = []
+    for _, arquivo, indice in GRAFOS:
+        caminho = os.path.join(pasta, arquivo)
+        agregado = os.path.splitext(caminho)[0] + '_agregado.csv'
+        if agregacao == 'sum' and os.path.exists(agregado) and (
+                not os.path.exists(caminho) or os.path.getmtime(agregado) >= os.path.getmtime(caminho)):
+            especificacoes.append((agregado, INDICE_PESO_AGREGADO))
+        else:
+            especificacoes.append((caminho, indice))
+    return especificacoes
+
+class _SaidaPorThread:
+    """
+    Substituto de sys.stdout que desvia para um buffer o que a thread atual
+    imprimir dentro de capturar(); as demais threads escrevem normalmente.
+    Evita que avisos da pré-carga apareçam no meio do prompt do menu.
+    """
+    def __init__(self, original):
+        self.original = original
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def capturar(self):
+        self._local.buffer = io.StringIO()
+        try:
+            yield self._local.buffer
+        finally:
+            self._local.buffer = None
+
+    def write(self, texto):
+        buffer = getattr(self._local, 'buffer', None)
+        return (self.original if buffer is None else buffer).write(texto)
+
+    def __getattr__(self, nome):
+        return getattr(self.original, nome)
+
+
+class CarregadorGrafos:
+    """
+    Carrega cada grafo só quando é pedido pela primeira vez. Cada grafo tem
+    sua própria trava: quem pede um grafo espera apenas pela carga dele,
+    seja feita agora ou já em andamento na thread de pré-carga.
+    Falhas de carga ficam registradas em erro(indice), e as mensagens da
+    pré-carga em mensagens(indice), para o menu mostrar quando o grafo é escolhido.
+    """
+    def __init__(self, especificacoes):
+        self.especificacoes = list(especificacoes)
+        self._grafos = [None] * len(self.especificacoes)
+        self._erros = [None] * len(self.especificacoes)
+        self._mensagens = [''] * len(self.especificacoes)
+        self._carregados = [False] * len(self.especificacoes)
+        self._travas = [threading.Lock() for _ in self.especificacoes]
+
+    def carregado(self, indice):
+        return self._carregados[indice]
+
+    def erro(self, indice):
+        return self._erros[indice]
+
+    def mensagens(self, indice):
+        """Saída da pré-carga deste grafo (devolvida uma única vez)."""
+        texto, self._mensagens[indice] = self._mensagens[indice], ''
+        return texto
+
+    def obter(self, indice, saida=None):
+        """
+        Grafo da especificação `indice`, ou None se não pôde ser carregado
+        (o motivo fica em erro(indice)). Com saida (um _SaidaPorThread), as
+        mensagens da carga são guardadas em vez de impressas.
+        """
+        with self._travas[indice]:
+            if not self._carregados[indice]:
+                caminho, indice_peso = self.especificacoes[indice]
+                with saida.capturar() if saida is not None else contextlib.nullcontext() as buffer:
+                    try:
+                        grafo = carregar_grafo_em_cache(caminho, indice_peso=indice_peso)
+                    except Exception as e:
+                        grafo = None
+                        self._erros[indice] = f"{type(e).__name__}: {e}"
+                if buffer is not None:
+                    self._mensagens[indice] = buffer.getvalue()
+                if grafo is not None:
+                    grafo.instrumentacao = Instrumentacao(ao_progresso=imprimir_progresso)
+                elif self._erros[indice] is None:
+                    self._erros[indice] = "arquivo ausente ou inválido"
+                self._grafos[indice] = grafo
+                self._carregados[indice] = True
+            return self._grafos[indice]
+
+    def pre_carregar(self, saida=None):
+        """Carrega em segundo plano, na ordem, os grafos ainda não pedidos."""
+        def carregar_todos():
+            for indice in range(len(self.especificacoes)):
+                self.obter(indice, saida)
+
+        thread = threading.Thread(target=carregar_todos, name="pre-carga-grafos", daemon=True)
+        thread.start()
+        return thread
+
+
 # --- MENU PRINCIPAL ---
-def main():
-    pasta = "dados_coletados"
-    print("\n--- INICIALIZANDO SISTEMA ---")
-    print("Carregando grafos na memória, aguarde...")
+# Opções do menu principal: (tecla, rótulo no menu, nome no menu de métricas)
+OPCOES_GRAFOS = [
+    ('1', "Grafo 1: Comentários (Issues/PRs)", "Grafo 1 (Comentários)"),
+    ('2', "Grafo 2: Fechamento de Issues", "Grafo 2 (Fechamentos)"),
+    ('3', "Grafo 3: Reviews e Merges", "Grafo 3 (Reviews)"),
+]
 
-    g1 = carregar_grafo(os.path.join(pasta, "grafo_1_comentarios.csv"), indice_peso=3)
-    g2 = carregar_grafo(os.path.join(pasta, "grafo_2_fechamentos.csv"), indice_peso=2)
-    g3 = carregar_grafo(os.path.join(pasta, "grafo_3_pr_reviews.csv"), indice_peso=3)
 
-    if not g1 or not g2 or not g3:
+def main(pasta=PASTA_DADOS):
+    print("\n--- INICIALIZANDO SISTEMA ---")
+
+    especificacoes = especificacoes_padrao(pasta=pasta)
+    if not all(os.path.exists(caminho) for caminho, _ in especificacoes):
         print("ERRO CRÍTICO: Não foi possível carregar os arquivos CSV.")
-        print("Verifique se a pasta 'dados_coletados' existe e se rodou o 'coleta.py'.")
+        print(f"Verifique se a pasta '{pasta}' existe e se rodou o 'coleta.py'.")
         return
 
+    # O menu aparece já; os grafos são carregados em segundo plano
+    carregador = CarregadorGrafos(especificacoes)
+    saida = _SaidaPorThread(sys.stdout)
+    sys.stdout = saida
+    carregador.pre_carregar(saida)
+
     while True:
         os.system('cls' if os.name == 'nt' else 'clear')
         print(f"\n==============================================")
         print(f"      ANÁLISE DE REDES - XCODEGEN")
         print(f"==============================================")
         print("Selecione o Grafo para trabalhar:")
-        print("1. Grafo 1: Comentários (Issues/PRs)")
-        print("2. Grafo 2: Fechamento de Issues")
-        print("3. Grafo 3: Reviews e Merges")
+        for indice, (tecla, rotulo, _) in enumerate(OPCOES_GRAFOS):
+            situacao = "" if carregador.carregado(indice) else "  (carregando...)"
+            print(f"{tecla}. {rotulo}{situacao}")
         print("0. Sair")
         print("----------------------------------------------")
 
         escolha = input("Opção: ")
 
-        if escolha == '1':
-            menu_metricas(g1, "Grafo 1 (Comentários)")
-        elif escolha == '2':
-            menu_metricas(g2, "Grafo 2 (Fechamentos)")
-        elif escolha == '3':
-            menu_metricas(g3, "Grafo 3 (Reviews)")
+        selecionado = next((i for i, (tecla, _, _) in enumerate(OPCOES_GRAFOS) if tecla == escolha), None)
+        if selecionado is not None:
+            if not carregador.carregado(selecionado):
+                print("Carregando o grafo, aguarde...")
+            grafo = carregador.obter(selecionado)
+            print(carregador.mensagens(selecionado), end='')
+            if grafo is None:
+                print(f"ERRO: Não foi possível carregar este grafo ({carregador.erro(selecionado)}).")
+                input("\nPressione Enter para continuar...")
+                continue
+            menu_metricas(grafo, OPCOES_GRAFOS[selecionado][2])
         elif escolha == '0':
             print("Encerrando ferramenta. Até logo!")
             sys.exit()
         else:
             print("Opção inválida, tente novamente.")
 
+# --- MODO LOTE (SEM MENU) ---
+# Métricas calculadas no modo lote; os valores precisam ser serializáveis em JSON.
+METRICAS_LOTE = ('gmce', 'proximidade', 'reciprocidade', 'densidade', 'pagerank', 'componentes', 'comunidades',
+                 'intermediacao')
+# Métricas que percorrem o armazém em disco em blocos (--armazem)
+METRICAS_ARMAZEM = ('gmce', 'reciprocidade', 'densidade', 'pagerank')
+
+_GRAFOS_DO_PROCESSO = {}
+
+
+def _calcular_metrica(grafo, metrica):
+    if metrica == 'gmce':
+        return grafo.calcular_gmce()
+    if metrica == 'proximidade':
+        return grafo.calcular_coeficiente_proximidade()
+    if metrica == 'reciprocidade':
+        return grafo.calcular_reciprocidade()
+    if metrica == 'densidade':
+        return grafo.calcular_densidade()
+    if metrica == 'pagerank':
+        return [{'id': vid, 'usuario': label, 'pagerank': score}
+                for vid, label, score in grafo.top_pagerank(k=10)]
+    if metrica == 'componentes':
+        _, fracas = grafo.componentes_fracas()
+        _, fortes = grafo.componentes_fortes()
+        return {'fracas': len(fracas), 'maior_fraca': max(fracas, default=0),
+                'fortes': len(fortes), 'maior_forte': max(fortes, default=0)}
+    if metrica == 'intermediacao':
+        return [{'usuario': label, 'intermediacao': valor} for label, valor in _top_intermediacao(grafo, workers=1)]
+    if metrica == 'comunidades':
+        resultado = {}
+        for nome, (ids, modularidade) in (('louvain', grafo.calcular_comunidades_louvain()),
+                                          ('propagacao', grafo.calcular_comunidades_propagacao())):
+            resultado[nome] = {'comunidades': max(ids, default=-1) + 1, 'modularidade': modularidade}
+        return resultado
+    raise ValueError(f"Métrica desconhecida: {metrica}")
+
+
+def _tarefa_lote(caminho_arquivo, indice_peso, agregacao, metrica, armazem=False):
+    """Executada no pool: carrega (uma vez por processo) o grafo e mede uma métrica."""
+    chave = (caminho_arquivo, indice_peso, agregacao, armazem)
+    if chave not in _GRAFOS_DO_PROCESSO:
+        carregar = carregar_armazem_em_cache if armazem else carregar_grafo_em_cache
+        _GRAFOS_DO_PROCESSO[chave] = carregar(caminho_arquivo, indice_peso, agregacao)
+    grafo = _GRAFOS_DO_PROCESSO[chave]
+    grafo.instrumentacao = Instrumentacao()
+
+    inicio = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = {'valor': _calcular_metrica(grafo, metrica)}
+    except Exception as e:
+        resultado = {'erro': f"{type(e).__name__}: {e}"}
+    resultado['tempo_s'] = time.perf_counter() - inicio
+    resultado['contadores'] = grafo.instrumentacao.contadores
+    return resultado
+
+
+def executar_lote(especificacoes, caminho_saida, workers=None, metricas=METRICAS_LOTE, agregacao='sum',
+                  armazem=False):
+    """
+    Calcula todas as métricas de todos os grafos sem interação, distribuindo
+    cada par (grafo, métrica) em um pool de processos, e grava um relatório
+    único em JSON (ou CSV, se caminho_saida terminar em .csv) com o tempo de
+    cada métrica. especificacoes: lista de (caminho_csv, índice_peso).
+    armazem=True usa o ArmazemArestas em disco (só METRICAS_ARMAZEM).
+    Retorna o relatório (dict).
+    """
+    relatorio = {'gerado_em': time.strftime('%Y-%m-%dT%H:%M:%S'), 'workers': workers or os.cpu_count(),
+                 'agregacao': agregacao, 'armazem': armazem, 'grafos': []}
+    carregar = carregar_armazem_em_cache if armazem else carregar_grafo_em_cache
+
+    # Carrega no processo principal primeiro: valida os arquivos e deixa o
+    # snapshot pronto, para que os processos do pool só leiam o cache.
+    for caminho, indice in especificacoes:
+        inicio = time.perf_counter()
+        grafo = carregar(caminho, indice, agregacao)
+        entrada = {'arquivo': caminho, 'indice_peso': indice,
+                   'tempo_carga_s': time.perf_counter() - inicio, 'metricas': {}}
+        if grafo is None:
+            entrada['erro'] = "arquivo não encontrado"
+        else:
+            entrada['vertices'] = grafo.get_vertex_count()
+            entrada['arestas'] = grafo.get_edge_count()
+        relatorio['grafos'].append(entrada)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = {}
+        for entrada in relatorio['grafos']:
+            if 'erro' in entrada:
+                continue
+            for metrica in metricas:
+                futuro = pool.submit(_tarefa_lote, entrada['arquivo'], entrada['indice_peso'], agregacao, metrica,
+                                     armazem)
+                futuros[futuro] = (entrada, metrica)
+        for futuro, (entrada, metrica) in futuros.items():
+            entrada['metricas'][metrica] = futuro.result()
+
+    if caminho_saida.lower().endswith('.csv'):
+        with open(caminho_saida, 'w', newline='', encoding='utf-8') as f:
+            escritor = csv.writer(f)
+            escritor.writerow(['arquivo', 'vertices', 'arestas', 'metrica', 'valor', 'erro', 'tempo_s'])
+            for entrada in relatorio['grafos']:
+                if 'erro' in entrada:
+                    escritor.writerow([entrada['arquivo'], '', '', '', '', entrada['erro'], ''])
+                for metrica, r in entrada['metricas'].items():
+                    valor = r.get('valor')
+                    if isinstance(valor, (list, dict)):
+                        valor = json.dumps(valor, ensure_ascii=False)
+                    escritor.writerow([entrada['arquivo'], entrada.get('vertices'), entrada.get('arestas'),
+                                       metrica, valor, r.get('erro', ''), f"{r['tempo_s']:.6f}"])
+    else:
+        with open(caminho_saida, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+    return relatorio
+
+
+def _especificacao_csv(texto):
+    """Converte 'caminho.csv:indice' em (caminho, indice)."""
+    caminho, separador, indice = texto.rpartition(':')
+    if not separador or not indice.isdigit():
+        raise argparse.ArgumentTypeError(f"use CAMINHO:INDICE_PESO (recebido: {texto})")
+    return caminho, int(indice)
+
+
+def ler_argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="Análise de redes de colaboração do GitHub.")
+    parser.add_argument('--lote', action='store_true',
+                        help="calcula todas as métricas sem menu e grava um relatório")
+    parser.add_argument('--csv', action='append', type=_especificacao_csv, metavar='CAMINHO:INDICE_PESO',
+                        help="grafo a analisar (repetível); padrão: os três CSVs de --pasta")
+    parser.add_argument('--pasta', default=PASTA_DADOS,
+                        help="pasta com os CSVs do coleta.py (ex.: dados_organizacao para os grafos mesclados)")
+    parser.add_argument('--saida', default='relatorio_metricas.json',
+                        help="arquivo do relatório (.json ou .csv)")
+    parser.add_argument('--workers', type=int, default=None, help="processos no pool (padrão: núcleos)")
+    parser.add_argument('--metricas', default=','.join(METRICAS_LOTE),
+                        help=f"lista separada por vírgulas entre: {', '.join(METRICAS_LOTE)}")
+    parser.add_argument('--agregacao', default='sum', choices=sorted(AGREGACOES))
+    parser.add_argument('--armazem', action='store_true',
+                        help="com --lote, processa em disco grafos maiores que a memória "
+                             f"(métricas: {', '.join(METRICAS_ARMAZEM)})")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    main()
+    args = ler_argumentos()
+    if args.lote:
+        especificacoes = args.csv or especificacoes_padrao(args.agregacao, args.pasta)
+        metricas = [m.strip() for m in args.metricas.split(',') if m.strip()]
+        if args.armazem and args.metricas == ','.join(METRICAS_LOTE):
+            metricas = list(METRICAS_ARMAZEM)
+        invalidas = [m for m in metricas if m not in (METRICAS_ARMAZEM if args.armazem else METRICAS_LOTE)]
+        if invalidas:
+            sys.exit(f"Métrica(s) desconhecida(s): {', '.join(invalidas)}")
+        executar_lote(especificacoes, args.saida, args.workers, metricas, args.agregacao, args.armazem)
+        print(f"Relatório gravado em {args.saida}")
+    else:
+        main(args.pasta)
@@ -0,0 +1,165 @@
+"""
+Servidor HTTP local que imita os endpoints REST do GitHub usados pelo
+coleta.py (repositório, issues, comentários, PRs e revisões). Permite
+simular limite de API (403 com X-RateLimit-Reset ou 429 com Retry-After)
+e falhas transitórias (502) em caminhos escolhidos.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ESTADOS_REVISAO = ['APPROVED', 'COMMENTED', 'CHANGES_REQUESTED', 'DISMISSED']
+
+
+def gerar_repositorio(num_issues=60):
+    """
+    Dados determinísticos: a cada 3 números um é PR. Retorna
+    {'issues': {numero: dict}, 'comentarios': {numero: [login]}, 'revisoes': {numero: [(login, estado)]}}.
+    """
+    issues, comentarios, revisoes = {}, {}, {}
+    for n in range(1, num_issues + 1):
+        pr = n % 3 == 0
+        issues[n] = {
+            'autor': f"autor{n % 7}",
+            'fechada_por': f"mant{n % 2}",
+            'pr': pr,
+            'atualizada': f"2024-01-{1 + n % 28:02d}T00:{n // 60:02d}:{n % 60:02d}Z",
+            'merge_por': ("mant0" if n % 2 == 0 else None) if pr else None,
+        }
+        comentarios[n] = [f"com{(n + i) % 5}" for i in range(n % 4)]
+        if pr:
+            revisoes[n] = [(f"rev{(n + i) % 4}", ESTADOS_REVISAO[i % 4]) for i in range(n % 5)]
+    return {'issues': issues, 'comentarios': comentarios, 'revisoes': revisoes}
+
+
+class ServidorGithubFalso:
+    """
+    Uso: with ServidorGithubFalso(dados, limitar={...}) as servidor: ... servidor.url
+    - limitar: {caminho: 403 ou 429}; a primeira requisição ao caminho responde com limite
+    - falhar: {caminho: vezes}; responde 502 nas primeiras `vezes` requisições
+    - repositorio: único 'dono/nome' servido; os demais respondem 404
+    """
+    def __init__(self, dados, limitar=None, falhar=None, espera_limite=1, repositorio='o/r'):
+        self.dados = dados
+        self.repositorio = repositorio
+        self.limitar = dict(limitar or {})
+        self.falhar = dict(falhar or {})
+        self.espera_limite = espera_limite
+        self.requisicoes = []
+        self.limites_enviados = []
+        self._lock = threading.Lock()
+        self._servidor = ThreadingHTTPServer(('127.0.0.1', 0), self._tratador())
+        self.url = f"http://127.0.0.1:{self._servidor.server_address[1]}"
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    # --- representação JSON ---
+    def _usuario(self, login):
+        return {'login': login, 'id': sum(map(ord, login)), 'url': f"{self.url}/users/{login}"}
+
+    def _issue(self, n, completa=False):
+        dados = self.dados['issues'][n]
+        corpo = {'number': n, 'id': n, 'url': f"{self.url}/repos/o/r/issues/{n}", 'state': 'closed',
+                 'user': self._usuario(dados['autor']), 'comments': len(self.dados['comentarios'][n]),
+                 'updated_at': dados['atualizada'],
+                 'pull_request': {'url': f"{self.url}/repos/o/r/pulls/{n}"} if dados['pr'] else None}
+        if completa:
+            corpo['closed_by'] = self._usuario(dados['fechada_por'])
+        return corpo
+
+    def _pr(self, n, completo=False):
+        dados = self.dados['issues'][n]
+        corpo = {'number': n, 'id': n, 'url': f"{self.url}/repos/o/r/pulls/{n}", 'state': 'closed',
+                 'user': self._usuario(dados['autor']), 'updated_at': dados['atualizada']}
+        if completo:
+            corpo['merged'] = dados['merge_por'] is not None
+            corpo['merged_by'] = self._usuario(dados['merge_por']) if dados['merge_por'] else None
+        return corpo
+
+    def _responder(self, caminho, consulta):
+        """(status, corpo, cabeçalhos) da requisição GET."""
+        with self._lock:
+            self.requisicoes.append(caminho)
+            if caminho in self.limitar:
+                codigo = self.limitar.pop(caminho)
+                self.limites_enviados.append(caminho)
+                if codigo == 429:
+                    return 429, {'message': 'Too Many Requests'}, {'Retry-After': str(self.espera_limite)}
+                reset = int(time.time()) + self.espera_limite
+                return 403, {'message': 'API rate limit exceeded'}, {'X-RateLimit-Remaining': '0',
+                                                                      'X-RateLimit-Reset': str(reset)}
+            if self.falhar.get(caminho, 0) > 0:
+                self.falhar[caminho] -= 1
+                return 502, {'message': 'Bad Gateway'}, {}
+
+        partes = caminho.strip('/').split('/')
+        pagina = int(consulta.get('page', ['1'])[0])
+        por_pagina = int(consulta.get('per_page', ['30'])[0])
+        fatia = lambda itens: itens[(pagina - 1) * por_pagina:pagina * por_pagina]
+        issues = self.dados['issues']
+
+        if partes[:1] != ['repos'] or '/'.join(partes[1:3]) != self.repositorio:
+            return 404, {'message': 'Not Found'}, {}
+        resto = partes[3:]
+        if not resto:
+            return 200, {'id': 1, 'name': partes[2], 'full_name': f"{partes[1]}/{partes[2]}",
+                         'url': f"{self.url}/repos/o/r"}, {}
+        if resto == ['issues']:
+            itens = [self._issue(n) for n in issues]
+            since = consulta.get('since', [None])[0]
+            if since:
+                itens = [i for i in itens if i['updated_at'] >= since]
+            itens.sort(key=lambda i: (i['updated_at'], i['number']),
+                       reverse=consulta.get('direction', ['desc'])[0] == 'desc')
+            return 200, fatia(itens), {}
+        if resto == ['pulls']:
+            itens = [self._pr(n) for n, d in issues.items() if d['pr']]
+            itens.sort(key=lambda i: (i['updated_at'], i['number']),
+                       reverse=consulta.get('direction', ['desc'])[0] == 'desc')
+            return 200, fatia(itens), {}
+        if len(resto) >= 2 and resto[1].isdigit() and int(resto[1]) in issues:
+            n = int(resto[1])
+            if resto[0] == 'issues' and len(resto) == 2:
+                return 200, self._issue(n, completa=True), {}
+            if resto[0] == 'issues' and resto[2:] == ['comments']:
+                itens = [{'id': n * 10 + i, 'user': self._usuario(login), 'body': '...'}
+                         for i, login in enumerate(self.dados['comentarios'][n])]
+                return 200, fatia(itens), {}
+            if resto[0] == 'pulls' and len(resto) == 2 and issues[n]['pr']:
+                return 200, self._pr(n, completo=True), {}
+            if resto[0] == 'pulls' and resto[2:] == ['reviews'] and issues[n]['pr']:
+                itens = [{'id': n * 10 + i, 'user': self._usuario(login), 'state': estado}
+                         for i, (login, estado) in enumerate(self.dados['revisoes'][n])]
+                return 200, fatia(itens), {}
+        return 404, {'message': 'Not Found'}, {}
+
+    def _tratador(self):
+        servidor = self
+
+        class Tratador(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                status, corpo, cabecalhos = servidor._responder(url.path, parse_qs(url.query))
+                dados = json.dumps(corpo).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(dados)))
+                for nome, valor in cabecalhos.items():
+                    self.send_header(nome, valor)
+                self.end_headers()
+                self.wfile.write(dados)
+
+        return Tratador
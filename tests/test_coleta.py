@@ -0,0 +1,116 @@
+import contextlib
+import csv
+import io
+import os
+
+import pytest
+
+import coleta
+from stub_github import ServidorGithubFalso, gerar_repositorio
+
+
+def _linhas_esperadas(dados):
+    """Linhas dos três grafos segundo as regras de _processar_issue/_processar_pr."""
+    g1, g2, g3 = [], [], []
+    for n, issue in dados['issues'].items():
+        dono = issue['autor']
+        if not issue['pr'] and issue['fechada_por'] != dono:
+            g2.append([issue['fechada_por'], dono, '3', str(n)])
+        for login in dados['comentarios'][n]:
+            if login != dono:
+                g1.append([login, dono, 'pr' if issue['pr'] else 'issue', '2', str(n)])
+        if issue['pr']:
+            if issue['merge_por'] and issue['merge_por'] != dono:
+                g3.append([issue['merge_por'], dono, 'MERGE', '5', str(n)])
+            for login, estado in dados['revisoes'][n]:
+                if login != dono and estado in ('APPROVED', 'CHANGES_REQUESTED', 'COMMENTED'):
+                    g3.append([login, dono, estado, '4', str(n)])
+    return [sorted(g) for g in (g1, g2, g3)]
+
+
+def _ler(caminho):
+    with open(caminho, newline='', encoding='utf-8') as f:
+        return sorted(list(csv.reader(f))[1:])
+
+
+@pytest.fixture
+def coleta_local(monkeypatch):
+    monkeypatch.setattr(coleta, 'MAX_WORKERS', 4)
+
+    def executar(servidor, pasta, repo='o/r', **kwargs):
+        monkeypatch.setattr(coleta, 'GITHUB_API_URL', servidor.url)
+        with contextlib.redirect_stdout(io.StringIO()) as saida:
+            ok = coleta.coletar_dados(repo, str(pasta), **kwargs)
+        return ok, saida.getvalue()
+
+    return executar
+
+
+def test_coleta_concorrente_sem_perdas_apos_limite(coleta_local, tmp_path):
+    dados = gerar_repositorio(60)
+    limitar = {'/repos/o/r/issues/7/comments': 403, '/repos/o/r/pulls/9/reviews': 429,
+               '/repos/o/r/issues': 403}
+    with ServidorGithubFalso(dados, limitar=limitar, falhar={'/repos/o/r/issues/10/comments': 1}) as servidor:
+        ok, saida = coleta_local(servidor, tmp_path, incremental=False, modo_saida='eventos')
+
+    assert ok
+    assert sorted(servidor.limites_enviados) == sorted(limitar)
+    assert "Limite da API atingido" in saida
+    assert "falharam" not in saida
+    esperadas = _linhas_esperadas(dados)
+    for arquivo, linhas in zip(coleta.ARQUIVOS_GRAFOS, esperadas):
+        assert _ler(os.path.join(tmp_path, arquivo)) == linhas
+
+
+def test_erro_do_cliente_nao_e_repetido(coleta_local, tmp_path):
+    with ServidorGithubFalso(gerar_repositorio(5)) as servidor:
+        ok, saida = coleta_local(servidor, tmp_path, repo='o/inexistente', incremental=False)
+
+    assert not ok
+    assert servidor.requisicoes == ['/repos/o/inexistente']
+    assert "nova tentativa" not in saida
+
+
+def test_coleta_incremental_nao_duplica(coleta_local, tmp_path):
+    dados = gerar_repositorio(30)
+    with ServidorGithubFalso(dados) as servidor:
+        assert coleta_local(servidor, tmp_path, incremental=True, modo_saida='eventos')[0]
+        assert coleta_local(servidor, tmp_path, incremental=True, modo_saida='eventos')[0]
+
+    for arquivo, linhas in zip(coleta.ARQUIVOS_GRAFOS, _linhas_esperadas(dados)):
+        assert _ler(os.path.join(tmp_path, arquivo)) == linhas
+
+
+def test_checkpoints_frequentes_acrescentam_sem_perder_linhas(coleta_local, tmp_path, monkeypatch):
+    monkeypatch.setattr(coleta, 'INTERVALO_CHECKPOINT', 7)
+    dados = gerar_repositorio(60)
+    with ServidorGithubFalso(dados) as servidor:
+        assert coleta_local(servidor, tmp_path, incremental=True, modo_saida='ambos')[0]
+
+    for arquivo, linhas in zip(coleta.ARQUIVOS_GRAFOS, _linhas_esperadas(dados)):
+        assert _ler(os.path.join(tmp_path, arquivo)) == linhas
+
+
+def test_dataset_acrescenta_itens_novos_e_reescreve_so_no_upsert(tmp_path, monkeypatch):
+    caminho = os.path.join(tmp_path, 'g.csv')
+    dataset = coleta.DatasetIncremental(caminho, ['origem', 'destino', 'peso', 'numero'], 3, 2, tipo_padrao='X')
+    trocas = []
+    replace = os.replace
+    monkeypatch.setattr(coleta.os, 'replace', lambda a, b: (trocas.append(b), replace(a, b)))
+
+    dataset.registrar(1, [['a', 'b', '1', '1']])
+    dataset.gravar()
+    dataset.registrar(2, [['b', 'c', '1', '2'], ['c', 'a', '1', '2']])
+    dataset.gravar()
+    assert trocas == []
+
+    dataset.registrar(1, [['a', 'c', '5', '1']])
+    dataset.gravar()
+    assert trocas == [caminho]
+    assert _ler(caminho) == [['a', 'c', '5', '1'], ['b', 'c', '1', '2'], ['c', 'a', '1', '2']]
+
+    # Uma nova instância (nova execução) também reconhece as chaves gravadas
+    reaberto = coleta.DatasetIncremental(caminho, dataset.cabecalho, 3, 2, tipo_padrao='X')
+    reaberto.registrar(2, [])
+    reaberto.gravar()
+    assert _ler(caminho) == [['a', 'c', '5', '1']]
@@ -0,0 +1,71 @@
+import pytest
+
+from grafos import (AdjacencyListGraph, AdjacencyMatrixGraph, ArmazemArestas, CSRGraph, Instrumentacao,
+                    OperacaoCancelada, TokenCancelamento)
+
+
+def _grafo_lista(num_vertices, arestas):
+    grafo = AdjacencyListGraph(num_vertices)
+    for u, v, peso in arestas:
+        grafo.add_edge(u, v, peso)
+    return grafo
+
+
+@pytest.fixture(params=['lista', 'csr'])
+def construir(request):
+    def criar(num_vertices, arestas):
+        grafo = _grafo_lista(num_vertices, arestas)
+        return CSRGraph.from_graph(grafo) if request.param == 'csr' else grafo
+    return criar
+
+
+def test_intermediacao_com_ciclo_de_peso_zero(construir):
+    grafo = construir(3, [(1, 2, 0.0), (2, 1, 0.0), (0, 1, 1.0)])
+    assert grafo.calcular_intermediacao(normalizar=False) == [0.0, 1.0, 0.0]
+
+
+def test_intermediacao_amostrada_sem_semente_nao_fica_no_cache():
+    grafo = _grafo_lista(6, [(u, (u + 1) % 6, 1.0) for u in range(6)])
+    grafo.calcular_intermediacao(amostras=3)
+    assert not grafo._cache_metricas
+    primeira = grafo.calcular_intermediacao(amostras=3, semente=7)
+    assert grafo.calcular_intermediacao(amostras=3, semente=7) is primeira
+
+
+def test_gephi_aceita_um_nome_de_atributo(tmp_path):
+    grafo = _grafo_lista(3, [(0, 1, 1.0), (1, 2, 1.0)])
+    caminho = tmp_path / 'grafo.gexf'
+    grafo.export_to_gephi(str(caminho), atributos='pagerank')
+    conteudo = caminho.read_text(encoding='utf-8')
+    assert 'title="pagerank"' in conteudo
+    assert conteudo.count('<attvalue ') == 3
+
+
+@pytest.mark.parametrize('classe', [AdjacencyListGraph, AdjacencyMatrixGraph, CSRGraph])
+@pytest.mark.parametrize('metrica', ['calcular_pagerank', 'calcular_gmce', 'calcular_reciprocidade',
+                                     'componentes_fracas', 'componentes_fortes'])
+def test_metricas_respeitam_token_cancelado(classe, metrica):
+    arestas = [(u, (u * 7 + 1) % 50, 1.0) for u in range(50)]
+    if classe is CSRGraph:
+        grafo = CSRGraph.from_graph(_grafo_lista(50, arestas))
+    else:
+        grafo = classe(50)
+        for u, v, peso in arestas:
+            grafo.add_edge(u, v, peso)
+    token = TokenCancelamento()
+    token.cancelar()
+    grafo.instrumentacao = Instrumentacao(cancelamento=token)
+    with pytest.raises(OperacaoCancelada):
+        getattr(grafo, metrica)()
+
+
+@pytest.mark.parametrize('metrica', ['calcular_gmce', 'calcular_reciprocidade'])
+def test_armazem_respeita_token_cancelado(tmp_path, metrica):
+    pytest.importorskip('numpy')
+    grafo = _grafo_lista(50, [(u, (u * 7 + 1) % 50, 1.0) for u in range(50)])
+    armazem = ArmazemArestas.de_grafo(grafo, str(tmp_path / 'armazem'), arestas_por_bloco=16)
+    token = TokenCancelamento()
+    token.cancelar()
+    armazem.instrumentacao = Instrumentacao(cancelamento=token)
+    with pytest.raises(OperacaoCancelada):
+        getattr(armazem, metrica)()